@@ -5,9 +5,14 @@ Implements sophisticated AI - powered risk analysis for Professional tier featur
 
 from __future__ import annotations
 
+import contextlib
 import logging
+import os
+import pickle
+import threading
 from dataclasses import dataclass
 from datetime import UTC, datetime
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 import numpy as np
@@ -50,6 +55,16 @@ except Exception:
 
 logger = logging.getLogger(__name__)
 
+# Bump when the features, training data or model settings change; persisted
+# models saved under another version are ignored and retrained.
+MODEL_VERSION = "2"
+
+# Trained models are cached here (override with AI_MODEL_DIR)
+MODEL_DIR = Path(
+    os.getenv("AI_MODEL_DIR")
+    or Path(__file__).resolve().parent.parent / "data" / "models",
+)
+
 
 @dataclass
 class RiskFactors:
@@ -80,12 +95,72 @@ class AdvancedRiskScore:
 class AdvancedAIRiskEngine:
     """AI - powered advanced risk scoring engine."""
 
-    def __init__(self) -> None:
+    def __init__(self, model_dir: Path | str | None = None) -> None:
         self.isolation_forest: Any = None
         self.risk_classifier: Any = None
         self.scaler: Any = None
         self.is_trained = False
-        self._initialize_models()
+        self.model_path = Path(model_dir or MODEL_DIR) / (
+            f"advanced_ai_risk-v{MODEL_VERSION}.pkl"
+        )
+        if not self._load_models():
+            self._initialize_models()
+            self._save_models()
+
+    @staticmethod
+    def _sklearn_version() -> str:
+        with contextlib.suppress(Exception):
+            import importlib
+
+            return str(importlib.import_module("sklearn").__version__)
+        return "unknown"
+
+    def _load_models(self) -> bool:
+        """Load persisted models; False when missing, stale or unreadable.
+
+        The file is only ever written by ``_save_models`` into the
+        (operator-controlled) model directory.
+        """
+        try:
+            with self.model_path.open("rb") as fh:
+                payload = pickle.load(fh)  # nosec: B301 - trusted local model cache
+        except FileNotFoundError:
+            return False
+        except Exception:
+            logger.warning("Unreadable AI model cache %s", self.model_path)
+            return False
+        if (
+            not isinstance(payload, dict)
+            or payload.get("version") != MODEL_VERSION
+            or payload.get("sklearn") != self._sklearn_version()
+        ):
+            return False
+        self.scaler = payload["scaler"]
+        self.isolation_forest = payload["isolation_forest"]
+        self.risk_classifier = payload["risk_classifier"]
+        self.is_trained = True
+        logger.info("Advanced AI risk models loaded from %s", self.model_path)
+        return True
+
+    def _save_models(self) -> None:
+        """Persist the trained models (best effort, atomic rename)."""
+        payload = {
+            "version": MODEL_VERSION,
+            "sklearn": self._sklearn_version(),
+            "scaler": self.scaler,
+            "isolation_forest": self.isolation_forest,
+            "risk_classifier": self.risk_classifier,
+        }
+        tmp = self.model_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.model_path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp.open("wb") as fh:
+                pickle.dump(payload, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(self.model_path)
+        except Exception:
+            logger.warning("Could not persist AI models to %s", self.model_path)
+            with contextlib.suppress(OSError):
+                tmp.unlink()
 
     def _initialize_models(self) -> None:
         """Initialize AI models with synthetic training data."""
@@ -121,55 +196,32 @@ class AdvancedAIRiskEngine:
     def _generate_training_data(self) -> tuple[Any, Any]:
         """Generate synthetic training data."""
         _ensure_numpy()
-        np.random.seed(42)
+        rng = np.random.default_rng(42)
         n_samples = 10000
 
-        # Generate features: amount, frequency, time_hour, geo_risk, etc.
-        features = []
-        labels = []
-
-        for _ in range(n_samples):
-            # Transaction amount (log - scaled)
-            amount = np.random.lognormal(mean=3, sigma=2)
-
-            # Frequency (transactions per day)
-            frequency = np.random.exponential(scale=5)
-
-            # Time of day (0 - 23)
-            hour = np.random.randint(0, 24)
-
-            # Geographical risk (0 - 1)
-            geo_risk = np.random.beta(2, 8)
-
-            # Address age (days)
-            addr_age = np.random.exponential(scale=180)
-
-            # Network centrality (0 - 1)
-            centrality = np.random.beta(3, 7)
-
-            feature_vector = [amount, frequency, hour, geo_risk, addr_age, centrality]
-
-            # Simple risk labeling logic
-            risk_score = (
-                (amount > 10000) * 0.3
-                + (frequency > 20) * 0.2
-                + (hour < 6 or hour > 22) * 0.1
-                + geo_risk * 0.2
-                + (addr_age < 7) * 0.15
-                + centrality * 0.05
-            )
-
-            if risk_score > 0.7:
-                label = 3  # HIGH
-            elif risk_score > 0.4:
-                label = 2  # MEDIUM
-            else:
-                label = 1  # LOW
-
-            features.append(feature_vector)
-            labels.append(label)
+        # Features: amount, frequency, time_hour, geo_risk, addr_age, centrality
+        amount = rng.lognormal(mean=3, sigma=2, size=n_samples)
+        frequency = rng.exponential(scale=5, size=n_samples)  # per day
+        hour = rng.integers(0, 24, size=n_samples)
+        geo_risk = rng.beta(2, 8, size=n_samples)
+        addr_age = rng.exponential(scale=180, size=n_samples)  # days
+        centrality = rng.beta(3, 7, size=n_samples)
+        features = np.column_stack(
+            [amount, frequency, hour, geo_risk, addr_age, centrality],
+        )
 
-        return np.array(features), np.array(labels)
+        # Simple risk labeling logic
+        risk_score = (
+            (amount > 10000) * 0.3
+            + (frequency > 20) * 0.2
+            + ((hour < 6) | (hour > 22)) * 0.1
+            + geo_risk * 0.2
+            + (addr_age < 7) * 0.15
+            + centrality * 0.05
+        )
+        # 3 = HIGH, 2 = MEDIUM, 1 = LOW
+        labels = np.select([risk_score > 0.7, risk_score > 0.4], [3, 2], default=1)
+        return features, labels
 
     def analyze_transaction(
         self,
@@ -177,6 +229,22 @@ class AdvancedAIRiskEngine:
         user_history: list[dict[str, Any]] | None = None,
     ) -> AdvancedRiskScore:
         """Perform advanced AI risk analysis on a transaction."""
+        return self.analyze_transactions_batch(
+            [transaction_data],
+            [user_history or []],
+        )[0]
+
+    def analyze_transactions_batch(
+        self,
+        transactions: list[dict[str, Any]],
+        histories: list[list[dict[str, Any]]] | None = None,
+    ) -> list[AdvancedRiskScore]:
+        """Score many transactions with one pass through each model.
+
+        ``histories`` (one list per transaction, default empty) is aligned
+        with ``transactions``. The scaler, isolation forest and classifier
+        each run once over the whole feature matrix.
+        """
         _ensure_numpy()
 
         if (
@@ -187,65 +255,64 @@ class AdvancedAIRiskEngine:
         ):
             msg = "AI models not trained or not initialized"
             raise RuntimeError(msg)
-
-        # Extract features from transaction
-        features = self._extract_features(transaction_data, user_history or [])
-
-        # Scale features
-        if self.scaler is None:
-            msg = "Scaler not initialized"
-            raise RuntimeError(msg)
-        features_scaled = self.scaler.transform([features])
-
-        # Get anomaly score
-        if self.isolation_forest is None:
-            msg = "Isolation forest not initialized"
-            raise RuntimeError(msg)
-        anomaly_score = self.isolation_forest.decision_function(features_scaled)[0]
-        is_anomaly = self.isolation_forest.predict(features_scaled)[0] == -1
-
-        # Get risk classification
-        if self.risk_classifier is None:
-            msg = "Risk classifier not initialized"
-            raise RuntimeError(msg)
-        risk_proba = self.risk_classifier.predict_proba(features_scaled)[0]
-
-        # Calculate overall risk score
-        overall_score = self._calculate_overall_score(
-            anomaly_score,
-            risk_proba,
+        if not transactions:
+            return []
+        if histories is None:
+            histories = [[] for _ in transactions]
+        elif len(histories) != len(transactions):
+            msg = "histories must align with transactions"
+            raise ValueError(msg)
+
+        # Extract and scale features for the whole batch
+        features = [
+            self._extract_features(tx, history or [])
+            for tx, history in zip(transactions, histories, strict=True)
+        ]
+        features_scaled = self.scaler.transform(np.asarray(features, dtype=float))
+
+        # IsolationForest.predict() is decision_function() < 0; reuse the scores
+        anomaly_scores = self.isolation_forest.decision_function(features_scaled)
+        risk_probas = self.risk_classifier.predict_proba(features_scaled)
+
+        now = datetime.now(UTC)
+        results = []
+        for tx, history, feats, anomaly_score, risk_proba in zip(
+            transactions,
+            histories,
             features,
-            transaction_data,
-        )
-
-        # Determine risk level
-        risk_level = self._determine_risk_level(overall_score)
-
-        # Extract detailed risk factors
-        risk_factors = self._analyze_risk_factors(
-            features,
-            transaction_data,
-            user_history or [],
-        )
-
-        # Generate AI insights and recommendations
-        insights = self._generate_ai_insights(
-            transaction_data,
-            risk_factors,
-            anomaly_score,
-            is_anomaly,
-        )
-        recommendations = self._generate_recommendations(risk_level, risk_factors)
-
-        return AdvancedRiskScore(
-            overall_score=overall_score,
-            confidence=max(risk_proba),
-            risk_level=risk_level,
-            factors=risk_factors,
-            recommendations=recommendations,
-            ai_insights=insights,
-            timestamp=datetime.now(UTC),
-        )
+            anomaly_scores,
+            risk_probas,
+            strict=True,
+        ):
+            overall_score = self._calculate_overall_score(
+                anomaly_score,
+                risk_proba,
+                feats,
+                tx,
+            )
+            risk_level = self._determine_risk_level(overall_score)
+            risk_factors = self._analyze_risk_factors(feats, tx, history or [])
+            insights = self._generate_ai_insights(
+                tx,
+                risk_factors,
+                anomaly_score,
+                bool(anomaly_score < 0),
+            )
+            results.append(
+                AdvancedRiskScore(
+                    overall_score=overall_score,
+                    confidence=max(risk_proba),
+                    risk_level=risk_level,
+                    factors=risk_factors,
+                    recommendations=self._generate_recommendations(
+                        risk_level,
+                        risk_factors,
+                    ),
+                    ai_insights=insights,
+                    timestamp=now,
+                ),
+            )
+        return results
 
     def _extract_features(
         self,
@@ -493,16 +560,41 @@ class AdvancedAIRiskEngine:
 
 
 _advanced_ai_engine: AdvancedAIRiskEngine | None = None
+_engine_lock = threading.Lock()
 
 
 def _get_advanced_ai_engine() -> AdvancedAIRiskEngine:
-    """Lazily create the AdvancedAIRiskEngine on first use."""
+    """Lazily create the AdvancedAIRiskEngine on first use.
+
+    Concurrent first callers wait for a single load/train instead of each
+    building their own models.
+    """
     global _advanced_ai_engine
     if _advanced_ai_engine is None:
-        _advanced_ai_engine = AdvancedAIRiskEngine()
+        with _engine_lock:
+            if _advanced_ai_engine is None:
+                _advanced_ai_engine = AdvancedAIRiskEngine()
     return _advanced_ai_engine
 
 
+def preload_models() -> threading.Thread:
+    """Load (or train and persist) the models in a daemon thread.
+
+    Called at startup so the first request does not pay for it; failures
+    (e.g. sklearn not installed) are logged and left to surface on use.
+    """
+
+    def _load() -> None:
+        try:
+            _get_advanced_ai_engine()
+        except Exception:
+            logger.warning("Advanced AI model preload failed", exc_info=True)
+
+    thread = threading.Thread(target=_load, name="ai-model-preload", daemon=True)
+    thread.start()
+    return thread
+
+
 def get_advanced_risk_score(
     transaction_data: dict[str, Any],
     user_history: list[dict[str, Any]] | None = None,
@@ -512,6 +604,15 @@ def get_advanced_risk_score(
     return engine.analyze_transaction(transaction_data, user_history)
 
 
+def get_advanced_risk_scores(
+    transactions: list[dict[str, Any]],
+    histories: list[list[dict[str, Any]]] | None = None,
+) -> list[AdvancedRiskScore]:
+    """Get advanced AI risk scores for many transactions in one batch."""
+    engine = _get_advanced_ai_engine()
+    return engine.analyze_transactions_batch(transactions, histories)
+
+
 def is_professional_feature_available(user_tier: str) -> bool:
     """Check if user has access to professional AI features."""
     return user_tier.lower() in ["professional", "enterprise"]
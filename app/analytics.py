@@ -4,13 +4,15 @@ Provides enhanced analytics, insights, and dashboard functionality.
 
 from __future__ import annotations
 
+import contextlib
+import math
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from typing import TYPE_CHECKING, Any
 
 
 def _ensure_numpy() -> None:
-    if "np" in globals():
+    if globals().get("np") is not None:
         return
     try:
         import importlib
@@ -33,7 +35,7 @@ def _ensure_pandas() -> None:
     This defers heavy import-time work and avoids circular-import issues
     that can occur during test collection when import order is sensitive.
     """
-    if "pd" in globals():
+    if globals().get("pd") is not None:
         return
     try:
         import importlib
@@ -83,59 +85,178 @@ class AdvancedAnalytics:
         self.risk_thresholds = {"low": 0.33, "medium": 0.66, "high": 1.0}
 
     def generate_comprehensive_metrics(self, days: int = 30) -> AnalyticsMetrics:
-        """Generate comprehensive analytics metrics for the dashboard."""
-        # Get data from the last N days
-        cutoff = datetime.now(UTC).replace(tzinfo=None) - timedelta(days=days)
-        rows = store.list_all(limit=50000)
-
-        # If there are no rows, return empty metrics without importing pandas
-        if not rows:
-            return self._empty_metrics()
-
-        # Import pandas only when data is present and a DataFrame is required
-        _ensure_pandas()
-        df = pd.DataFrame(rows)
-        df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-        # Use a direct function reference to keep the line short
-        df["risk_score"] = df.apply(self._get_risk_score, axis=1)
-        df["amount"] = pd.to_numeric(df["amount"], errors="coerce").fillna(0)
+        """Generate comprehensive analytics metrics for the dashboard.
+
+        With the default risk thresholds everything is read from the
+        store's pre-aggregated rollups. Custom thresholds fall back to SQL
+        aggregates over the ``days`` window, with the address-level metrics
+        pulling (slim) rows into pandas.
+        """
+        since = store.normalize_timestamp(datetime.now(UTC) - timedelta(days=days))
+        rt = self.risk_thresholds
+        if (rt["low"], rt["medium"]) == (
+            store.ROLLUP_RISK_LOW,
+            store.ROLLUP_RISK_MEDIUM,
+        ):
+            return self._metrics_from_rollups(since)
 
-        # Filter by date range
-        recent_df = df[df["timestamp"] >= cutoff] if not df.empty else df
+        agg = store.window_aggregates(since, rt["low"], rt["medium"])
+        totals = agg["totals"]
 
-        if recent_df.empty:
+        # Nothing in the window: return empty metrics without importing pandas
+        if not totals["n"]:
             return self._empty_metrics()
 
-        # Precompute commonly-used metrics to keep call-site short
-        total_transactions = len(recent_df)
-        total_volume = float(recent_df["amount"].sum())
-        avg_risk_score = float(recent_df["risk_score"].mean())
-        rt = self.risk_thresholds
-        high_risk_count = int((recent_df["risk_score"] >= rt["medium"]).sum())
-        medium_risk_count = int(
-            (
-                (recent_df["risk_score"] >= rt["low"])
-                & (recent_df["risk_score"] < rt["medium"])
-            ).sum(),
+        columns = self._stream_columns(
+            since=since,
+            fields=("from_addr", "to_addr", "amount", "risk_score"),
         )
-        low_risk_count = int((recent_df["risk_score"] < rt["low"]).sum())
+        _ensure_pandas()
+        recent_df = pd.DataFrame(columns)
+        recent_df["risk_score"] = self._risk_scores(recent_df)
+        recent_df["amount"] = pd.to_numeric(
+            recent_df["amount"],
+            errors="coerce",
+        ).fillna(0)
 
         return AnalyticsMetrics(
-            total_transactions=total_transactions,
-            total_volume=total_volume,
-            avg_risk_score=avg_risk_score,
-            high_risk_count=high_risk_count,
-            medium_risk_count=medium_risk_count,
-            low_risk_count=low_risk_count,
+            total_transactions=int(totals["n"]),
+            total_volume=float(totals["volume"] or 0),
+            avg_risk_score=float(totals["avg_risk"] or 0),
+            high_risk_count=int(totals["high"] or 0),
+            medium_risk_count=int(totals["medium"] or 0),
+            low_risk_count=int(totals["low"] or 0),
             unique_addresses=self._count_unique_addresses(recent_df),
             top_risk_addresses=self._get_top_risk_addresses(recent_df),
-            risk_trend=self._calculate_risk_trend(recent_df),
-            category_distribution=self._get_category_distribution(recent_df),
-            hourly_activity=self._get_hourly_activity(recent_df),
+            risk_trend=self._risk_trend_from_daily(agg["daily"]),
+            category_distribution=agg["categories"],
+            hourly_activity=self._hourly_activity_from_rows(agg["hourly"]),
             network_analysis=self._analyze_network_patterns(recent_df),
             anomaly_score=self._calculate_anomaly_score(recent_df),
         )
 
+    def _metrics_from_rollups(self, since: str) -> AnalyticsMetrics:
+        """Build the metrics from rollups: O(buckets), no pandas."""
+        agg = store.rollup_aggregates(since)
+        totals = agg["totals"]
+        if not totals["n"]:
+            return self._empty_metrics()
+
+        addresses = store.rollup_address_stats(since, limit=10)
+        return AnalyticsMetrics(
+            total_transactions=int(totals["n"]),
+            total_volume=float(totals["volume"]),
+            avg_risk_score=float(totals["avg_risk"] or 0),
+            high_risk_count=int(totals["high"]),
+            medium_risk_count=int(totals["medium"]),
+            low_risk_count=int(totals["low"]),
+            unique_addresses=addresses["unique_addresses"],
+            top_risk_addresses=[
+                {
+                    "address": r["address"],
+                    "transaction_count": int(r["n"]),
+                    "total_volume": float(r["volume"] or 0),
+                    "avg_risk": float(r["avg_risk"] or 0),
+                    "max_risk": max(float(r["max_risk"] or 0), 0.0),
+                }
+                for r in addresses["top_risk_addresses"]
+            ],
+            risk_trend=self._risk_trend_from_daily(agg["daily"]),
+            category_distribution=agg["categories"],
+            hourly_activity=self._hourly_activity_from_rows(agg["hourly"]),
+            network_analysis=self._network_from_rollups(since),
+            anomaly_score=self._anomaly_from_totals(since, totals),
+        )
+
+    @staticmethod
+    def _network_from_rollups(since: str) -> dict[str, Any]:
+        """``_analyze_network_patterns`` output from the edge rollup."""
+        stats = store.rollup_network_stats(since, limit=5)
+        connections, senders = stats["connections"], stats["senders"]
+        return {
+            "total_connections": connections,
+            "unique_senders": senders,
+            "hub_addresses": [
+                {"address": r["address"], "connection_count": int(r["n"])}
+                for r in stats["hubs"]
+            ],
+            "avg_connections_per_address": (connections / senders if senders else 0),
+        }
+
+    @staticmethod
+    def _anomaly_from_totals(since: str, totals: dict[str, Any]) -> float:
+        """``_calculate_anomaly_score`` from rollup sums.
+
+        Mean and standard deviation come from the amount sums; only the
+        count of amounts beyond two deviations touches txs, in SQL.
+        """
+        n = int(totals["n"])
+        if n < 2:
+            return 0.0
+        mean = float(totals["volume"]) / n
+        std = math.sqrt(max(float(totals["volume_sq"]) / n - mean * mean, 0.0))
+        if std <= 0:
+            return 0.0
+        return store.count_amount_outliers(since, mean, 2 * std) / n
+
+    @staticmethod
+    def _stream_columns(
+        *,
+        since: str | None = None,
+        limit: int | None = None,
+        fields: tuple[str, ...] | None = None,
+    ) -> dict[str, list[Any]]:
+        """Stream matching rows from the store into column lists.
+
+        Rows arrive in fetchmany batches and each dict is dropped once its
+        values are appended, so only the (selected) columns stay in memory.
+        """
+        columns: dict[str, list[Any]] = {}
+        with contextlib.closing(store.iter_txs(since=since, limit=limit)) as rows:
+            for n, row in enumerate(rows):
+                for key in fields or row.keys():
+                    col = columns.get(key)
+                    if col is None:
+                        col = columns[key] = [None] * n
+                    col.append(row.get(key))
+        return columns
+
+    @staticmethod
+    def _risk_trend_from_daily(daily: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Shape SQL per-day aggregates like ``_calculate_risk_trend`` output."""
+        return [
+            {
+                "date": str(r["day"]),
+                "avg_risk": float(r["avg_risk"] or 0),
+                "max_risk": float(r["max_risk"] or 0),
+                "transaction_count": int(r["n"]),
+                "total_volume": float(r["volume"] or 0),
+            }
+            for r in sorted(daily, key=lambda r: str(r["day"]))
+        ]
+
+    @staticmethod
+    def _hourly_activity_from_rows(
+        hourly: list[dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        """Expand SQL per-hour aggregates to all 24 hours of the day."""
+        by_hour: dict[int, dict[str, Any]] = {}
+        for r in hourly:
+            with contextlib.suppress(TypeError, ValueError):
+                by_hour[int(r["hour"])] = r
+        activity = []
+        for hour in range(24):
+            row = by_hour.get(hour)
+            activity.append(
+                {
+                    "hour": hour,
+                    "avg_risk": float(row["avg_risk"] or 0) if row else 0.0,
+                    "total_volume": float(row["volume"] or 0) if row else 0.0,
+                    "transaction_count": int(row["n"]) if row else 0,
+                },
+            )
+        return activity
+
     def _get_risk_score(self, row: Any) -> float:
         """Extract risk score from row with fallback."""
         _ensure_pandas()
@@ -147,60 +268,99 @@ class AdvancedAnalytics:
         except (ValueError, TypeError):
             return 0.0
 
+    def _risk_scores(self, df: Any) -> Any:
+        """Column-wise ``_get_risk_score``: numeric scores, 0.0 when missing."""
+        _ensure_pandas()
+        for name in ("risk_score", "score"):
+            if name in df.columns:
+                return pd.to_numeric(df[name], errors="coerce").fillna(0.0)
+        return pd.Series(0.0, index=df.index)
+
+    @staticmethod
+    def _address_column(df: Any, name: str) -> Any:
+        """Address column with missing/empty values normalized to NA."""
+        if name not in df.columns:
+            return pd.Series(pd.NA, index=df.index, dtype="object")
+        col = df[name]
+        return col.where(col.notna() & (col != ""))
+
+    def _address_long(self, df: Any) -> Any:
+        """One row per (transaction, side) with an address: melt of from/to.
+
+        ``seen`` orders rows as a row-by-row walk would (from before to), so
+        ties can be broken by first appearance.
+        """
+        _ensure_numpy()
+        n = len(df)
+        amounts = (
+            pd.to_numeric(df["amount"], errors="coerce")
+            if "amount" in df.columns
+            else pd.Series(0.0, index=df.index)
+        )
+        risks = self._risk_scores(df)
+        positions = np.arange(n) * 2
+        long = pd.DataFrame(
+            {
+                "address": pd.concat(
+                    [
+                        self._address_column(df, "from_addr"),
+                        self._address_column(df, "to_addr"),
+                    ],
+                    ignore_index=True,
+                ),
+                "amount": np.concatenate([amounts.to_numpy(), amounts.to_numpy()]),
+                "risk": np.concatenate([risks.to_numpy(), risks.to_numpy()]),
+                "seen": np.concatenate([positions, positions + 1]),
+            },
+        )
+        return long[long["address"].notna()]
+
     def _count_unique_addresses(self, df: Any) -> int:
         """Count unique addresses in the dataset."""
         _ensure_pandas()
-        addresses = set()
-        for _, row in df.iterrows():
-            if row.get("from_addr"):
-                addresses.add(row["from_addr"])
-            if row.get("to_addr"):
-                addresses.add(row["to_addr"])
-        return len(addresses)
+        if df.empty:
+            return 0
+        return int(self._address_long(df)["address"].nunique())
 
     def _get_top_risk_addresses(self, df: Any, limit: int = 10) -> list[dict[str, Any]]:
         """Get top risk addresses with their metrics."""
         _ensure_pandas()
-        _ensure_numpy()
-        address_metrics = {}
-
-        for _, row in df.iterrows():
-            for addr_field in ["from_addr", "to_addr"]:
-                addr = row.get(addr_field)
-                if not addr:
-                    continue
-
-                if addr not in address_metrics:
-                    address_metrics[addr] = {
-                        "address": addr,
-                        "transaction_count": 0,
-                        "total_volume": 0,
-                        "avg_risk": 0,
-                        "max_risk": 0,
-                        "risk_scores": [],
-                    }
-
-                metrics = address_metrics[addr]
-                metrics["transaction_count"] += 1
-                metrics["total_volume"] += float(row.get("amount", 0))
-                risk_score = self._get_risk_score(row)
-                metrics["risk_scores"].append(risk_score)
-                metrics["max_risk"] = max(metrics["max_risk"], risk_score)
-
-        # Calculate averages and sort by risk
-        for metrics in address_metrics.values():
-            if metrics["risk_scores"]:
-                metrics["avg_risk"] = np.mean(metrics["risk_scores"])
-            del metrics["risk_scores"]  # Remove raw scores to save space
-
-        # Sort by average risk score and return top addresses
-        sorted_addresses = sorted(
-            address_metrics.values(),
-            key=lambda x: x["avg_risk"],
-            reverse=True,
-        )
+        if df.empty:
+            return []
 
-        return sorted_addresses[:limit]
+        long = self._address_long(df)
+        if long.empty:
+            return []
+        stats = long.groupby("address", sort=False).agg(
+            transaction_count=("risk", "size"),
+            total_volume=("amount", "sum"),
+            avg_risk=("risk", "mean"),
+            max_risk=("risk", "max"),
+            seen=("seen", "min"),
+        )
+        stats["max_risk"] = stats["max_risk"].clip(lower=0.0)
+
+        # Sort by average risk score (first appearance breaks ties)
+        top = stats.sort_values(
+            ["avg_risk", "seen"],
+            ascending=[False, True],
+            kind="mergesort",
+        ).head(limit)
+
+        return [
+            {
+                "address": address,
+                "transaction_count": int(row.transaction_count),
+                "total_volume": float(row.total_volume),
+                "avg_risk": float(row.avg_risk),
+                "max_risk": float(row.max_risk),
+            }
+            for address, row in zip(
+                top.index,
+                top.itertuples(index=False),
+                strict=True,
+            )
+        ]
 
     def _calculate_risk_trend(self, df: Any) -> list[dict[str, Any]]:
         """Calculate risk trend over time."""
@@ -209,35 +369,28 @@ class AdvancedAnalytics:
             return []
 
         # Group by day and calculate daily metrics
-        df["date"] = df["timestamp"].dt.date
         daily_metrics = (
-            df.groupby("date")
-            .agg({"risk_score": ["mean", "max", "count"], "amount": "sum"})
-            .reset_index()
+            df.groupby(df["timestamp"].dt.date.rename("date"))
+            .agg(
+                avg_risk=("risk_score", "mean"),
+                max_risk=("risk_score", "max"),
+                transaction_count=("risk_score", "size"),
+                total_volume=("amount", "sum"),
+            )
+            .sort_index()
         )
 
-        daily_metrics.columns = [
-            "date",
-            "avg_risk",
-            "max_risk",
-            "transaction_count",
-            "total_volume",
+        return [
+            {
+                "date": day.isoformat(),
+                "avg_risk": float(avg_risk),
+                "max_risk": float(max_risk),
+                "transaction_count": int(count),
+                "total_volume": float(volume),
+            }
+            for day, avg_risk, max_risk, count, volume in daily_metrics.itertuples()
         ]
 
-        trend = []
-        for _, row in daily_metrics.iterrows():
-            trend.append(
-                {
-                    "date": row["date"].isoformat(),
-                    "avg_risk": float(row["avg_risk"]),
-                    "max_risk": float(row["max_risk"]),
-                    "transaction_count": int(row["transaction_count"]),
-                    "total_volume": float(row["total_volume"]),
-                },
-            )
-
-        return sorted(trend, key=lambda x: x["date"])
-
     def _get_category_distribution(self, df: Any) -> dict[str, int]:
         """Get distribution of transaction categories."""
         _ensure_pandas()
@@ -252,36 +405,26 @@ class AdvancedAnalytics:
         if df.empty:
             return []
 
-        df["hour"] = df["timestamp"].dt.hour
         hourly_stats = (
-            df.groupby("hour")
-            .agg({"risk_score": "mean", "amount": "sum"})
-            .reset_index()
+            df.groupby(df["timestamp"].dt.hour.rename("hour"))
+            .agg(
+                avg_risk=("risk_score", "mean"),
+                total_volume=("amount", "sum"),
+                transaction_count=("risk_score", "size"),
+            )
+            .reindex(range(24))
+            .fillna(0)
         )
 
-        activity = []
-        for hour in range(24):
-            hour_data = hourly_stats[hourly_stats["hour"] == hour]
-            if not hour_data.empty:
-                activity.append(
-                    {
-                        "hour": hour,
-                        "avg_risk": float(hour_data["risk_score"].iloc[0]),
-                        "total_volume": float(hour_data["amount"].iloc[0]),
-                        "transaction_count": len(df[df["hour"] == hour]),
-                    },
-                )
-            else:
-                activity.append(
-                    {
-                        "hour": hour,
-                        "avg_risk": 0.0,
-                        "total_volume": 0.0,
-                        "transaction_count": 0,
-                    },
-                )
-
-        return activity
+        return [
+            {
+                "hour": hour,
+                "avg_risk": float(avg_risk),
+                "total_volume": float(volume),
+                "transaction_count": int(count),
+            }
+            for hour, avg_risk, volume, count in hourly_stats.itertuples()
+        ]
 
     def _analyze_network_patterns(self, df: Any) -> dict[str, Any]:
         """Analyze network patterns and connections."""
@@ -293,37 +436,31 @@ class AdvancedAnalytics:
                 "centrality_metrics": {},
             }
 
-        # Create address interaction matrix
-        connections: dict[Any, set[Any]] = {}
-        for _, row in df.iterrows():
-            from_addr = row.get("from_addr")
-            to_addr = row.get("to_addr")
-
-            if from_addr and to_addr:
-                if from_addr not in connections:
-                    connections[from_addr] = set()
-                connections[from_addr].add(to_addr)
+        # Distinct sender -> receiver edges; senders keep first-seen order
+        edges = pd.DataFrame(
+            {
+                "from_addr": self._address_column(df, "from_addr"),
+                "to_addr": self._address_column(df, "to_addr"),
+            },
+        ).dropna()
+        out_degree = edges.drop_duplicates().groupby("from_addr", sort=False).size()
 
         # Calculate basic network metrics
-        vals = connections.values()
-        total_connections = sum(len(targets) for targets in vals)
+        total_connections = int(out_degree.sum())
+        unique_senders = len(out_degree)
 
         # Find addresses with most connections (hubs)
-        hub_addresses = sorted(
-            connections.items(),
-            key=lambda x: len(x[1]),
-            reverse=True,
-        )[:5]
+        hubs = out_degree.sort_values(ascending=False, kind="mergesort").head(5)
 
         return {
             "total_connections": total_connections,
-            "unique_senders": len(connections),
+            "unique_senders": unique_senders,
             "hub_addresses": [
-                {"address": addr, "connection_count": len(targets)}
-                for addr, targets in hub_addresses
+                {"address": addr, "connection_count": int(count)}
+                for addr, count in hubs.items()
             ],
             "avg_connections_per_address": (
-                total_connections / len(connections) if connections else 0
+                total_connections / unique_senders if unique_senders else 0
             ),
         }
 
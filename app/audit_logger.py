@@ -3,9 +3,14 @@
 
 from __future__ import annotations
 
+import atexit
+import contextlib
 import json
 import logging
 import os
+import queue
+import threading
+import time
 from datetime import UTC, datetime
 from enum import Enum
 from pathlib import Path
@@ -74,6 +79,245 @@ class AuditEvent(BaseModel):
     risk_score: float | None = None
 
 
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record; audit events are dumped here, off the
+    request path, when they reach the writer thread."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        log_entry: dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(
+                record.created,
+                tz=UTC,
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        # Add audit event data if present
+        audit_data = getattr(record, "audit_event", None)
+        if isinstance(audit_data, BaseModel):
+            audit_data = audit_data.model_dump()
+        if audit_data is not None:
+            log_entry["audit_event"] = audit_data
+
+        return json.dumps(log_entry, default=str)
+
+
+class AuditQueueHandler(logging.Handler):
+    """Hand audit records to a writer thread through a bounded queue.
+
+    ``emit`` only enqueues. The writer drains up to ``batch_size`` records
+    (or whatever arrived within ``flush_interval`` seconds), formats them,
+    writes them with a single flush and rotates the file once it exceeds
+    ``max_bytes``, keeping ``backup_count`` old files.
+
+    When the queue is full, ``overflow="drop"`` discards the new record and
+    ``overflow="block"`` waits up to ``block_timeout`` seconds for space
+    before discarding it. Both cases are counted in ``stats()``.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        *,
+        max_queue: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        overflow: str = "drop",
+        block_timeout: float = 0.05,
+    ) -> None:
+        super().__init__()
+        if overflow not in {"drop", "block"}:
+            msg = f"overflow must be 'drop' or 'block', not {overflow!r}"
+            raise ValueError(msg)
+        self.path = Path(path)
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.max_bytes = int(max_bytes)
+        self.backup_count = max(0, int(backup_count))
+        self.overflow = overflow
+        self.block_timeout = float(block_timeout)
+        self._queue: queue.Queue[logging.LogRecord | None] = queue.Queue(
+            maxsize=max(1, int(max_queue)),
+        )
+        self._stream: Any = None
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._counts = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "blocked": 0,
+            "batches": 0,
+            "rotations": 0,
+            "write_errors": 0,
+        }
+
+    # -- producer side -------------------------------------------------------
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            if self.overflow == "block":
+                self._counts["blocked"] += 1
+                try:
+                    self._queue.put(record, timeout=self.block_timeout)
+                except queue.Full:
+                    self._counts["dropped"] += 1
+                    return
+            else:
+                self._counts["dropped"] += 1
+                return
+        self._counts["enqueued"] += 1
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                thread = threading.Thread(
+                    target=self._run,
+                    name="audit-log-writer",
+                    daemon=True,
+                )
+                thread.start()
+                self._thread = thread
+
+    def flush(self) -> None:
+        """Wait (up to the default timeout) for queued records to be written."""
+        self.wait_drained()
+
+    def wait_drained(self, timeout: float | None = 5.0) -> bool:
+        """Wait until every queued record is written; False on ``timeout``."""
+        if self._thread is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def close(self) -> None:
+        """Drain the queue, stop the writer and close the file."""
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self.wait_drained()
+            with contextlib.suppress(queue.Full):
+                self._queue.put(None, timeout=1.0)
+            thread.join(timeout=5.0)
+        self._thread = None
+        self._close_stream()
+        super().close()
+
+    def stats(self) -> dict[str, Any]:
+        out: dict[str, Any] = dict(self._counts)
+        out.update(
+            {
+                "queued": self._queue.qsize(),
+                "capacity": self._queue.maxsize,
+                "overflow": self.overflow,
+                "path": str(self.path),
+            },
+        )
+        return out
+
+    # -- writer thread -------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while first is not None and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    record = (
+                        self._queue.get_nowait()
+                        if remaining <= 0
+                        else self._queue.get(timeout=remaining)
+                    )
+                except queue.Empty:
+                    break
+                batch.append(record)
+                if record is None:
+                    break
+            records = [r for r in batch if r is not None]
+            try:
+                if records:
+                    self._write(records)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if len(records) < len(batch):
+                return
+
+    def _write(self, records: list[logging.LogRecord]) -> None:
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record) + "\n")
+            except Exception:
+                self._counts["write_errors"] += 1
+        try:
+            stream = self._open_stream()
+            stream.write("".join(lines))
+            stream.flush()
+            self._counts["written"] += len(lines)
+            self._counts["batches"] += 1
+            if self.max_bytes > 0 and stream.tell() >= self.max_bytes:
+                self._rotate()
+        except Exception:
+            self._counts["write_errors"] += len(lines)
+            self._close_stream()
+
+    def _open_stream(self) -> Any:
+        if self._stream is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._stream = self.path.open("a", encoding="utf-8")
+        return self._stream
+
+    def _close_stream(self) -> None:
+        if self._stream is not None:
+            with contextlib.suppress(Exception):
+                self._stream.close()
+            self._stream = None
+
+    def _rotate(self) -> None:
+        """audit.log -> audit.log.1 -> ... -> audit.log.<backup_count>."""
+        self._close_stream()
+        if self.backup_count:
+            for i in range(self.backup_count - 1, 0, -1):
+                src = self.path.with_name(f"{self.path.name}.{i}")
+                if src.exists():
+                    src.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink(missing_ok=True)
+        self._counts["rotations"] += 1
+
+
+def _audit_file_handler(log_dir: Path) -> AuditQueueHandler:
+    """Build the audit file handler from AUDIT_LOG_* environment settings."""
+    return AuditQueueHandler(
+        log_dir / "audit.log",
+        max_queue=int(os.getenv("AUDIT_LOG_QUEUE_SIZE", "10000") or 10000),
+        batch_size=int(os.getenv("AUDIT_LOG_BATCH_SIZE", "256") or 256),
+        flush_interval=float(os.getenv("AUDIT_LOG_FLUSH_INTERVAL", "0.5") or 0.5),
+        max_bytes=int(os.getenv("AUDIT_LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+        backup_count=int(os.getenv("AUDIT_LOG_BACKUPS", "5") or 5),
+        overflow=(os.getenv("AUDIT_LOG_OVERFLOW") or "drop").strip().lower(),
+    )
+
+
 class AuditLogger:
     """Centralized audit logging system with structured logging and security focus."""
 
@@ -93,35 +337,16 @@ class AuditLogger:
         log_dir = Path("logs")
         log_dir.mkdir(exist_ok=True)
 
-        # JSON formatter for structured logging
-
-        class JSONFormatter(logging.Formatter):
-            def format(self, record: logging.LogRecord) -> str:
-                log_entry = {
-                    "timestamp": datetime.fromtimestamp(
-                        record.created,
-                        tz=UTC,
-                    ).isoformat(),
-                    "level": record.levelname,
-                    "logger": record.name,
-                    "message": record.getMessage(),
-                }
-
-                # Add audit event data if present
-                audit_data = getattr(record, "audit_event", None)
-                if audit_data is not None:
-                    log_entry["audit_event"] = audit_data
-
-                return json.dumps(log_entry, default=str)
-
-        # File handler for audit logs (honor TEST mode to keep CI output clean)
+        # Queue-backed file handler for audit logs (honor TEST mode to keep
+        # CI output clean); file I/O happens on the writer thread
         if (
             os.getenv("PYTEST_CURRENT_TEST") is None
             and os.getenv("DISABLE_AUDIT_FILE") != "1"
         ):
-            file_handler = logging.FileHandler(log_dir / "audit.log")
+            file_handler = _audit_file_handler(log_dir)
             file_handler.setFormatter(JSONFormatter())
             logger.addHandler(file_handler)
+            atexit.register(file_handler.close)
 
         # Console handler for development
         app_env = os.getenv("APP_ENV", os.getenv("ENVIRONMENT", "dev")).lower()
@@ -144,12 +369,26 @@ class AuditLogger:
         return logger
 
     def log_event(self, event: AuditEvent) -> None:
-        """Log an audit event."""
+        """Log an audit event (serialized later by the file writer)."""
         self.logger.info(
-            f"{event.event_type.value} - {event.outcome}",
-            extra={"audit_event": event.model_dump()},
+            "%s - %s",
+            event.event_type.value,
+            event.outcome,
+            extra={"audit_event": event},
         )
 
+    def _queue_handlers(self) -> list[AuditQueueHandler]:
+        return [h for h in self.logger.handlers if isinstance(h, AuditQueueHandler)]
+
+    def wait_drained(self, timeout: float | None = 5.0) -> bool:
+        """Block until queued audit records are on disk; False on ``timeout``."""
+        return all(h.wait_drained(timeout) for h in self._queue_handlers())
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth and enqueue/write/drop counters of the file writer."""
+        handlers = self._queue_handlers()
+        return handlers[0].stats() if handlers else {"enabled": False}
+
     def log_auth_success(
         self,
         user_id: str,
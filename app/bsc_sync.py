@@ -0,0 +1,72 @@
+"""Stream BscScan account history straight into ``txs``.
+
+``store_account_history`` consumes ``bscscan.stream_account_records`` (the
+three explorer lists decoded incrementally into slotted records), tags and
+scores each batch with the vectorized helpers and writes it through
+``store.save_tagged_many``. No pydantic/Decimal ``Transaction`` is built on
+this path and at most ``batch_size`` records are held at a time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from integrations import bscscan
+
+from . import store
+from .compliance import tag_category
+from .guardian import score_risk_batch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _rows(records: list[bscscan.BscTxRecord]) -> list[dict[str, Any]]:
+    """Convert normalized records into tagged ``txs`` rows."""
+    scores = score_risk_batch(records)
+    rows = []
+    for rec, (score, flags) in zip(records, scores, strict=True):
+        row = rec.to_row()
+        row["category"] = tag_category(rec)
+        row["risk_score"] = score
+        row["risk_flags"] = flags
+        rows.append(row)
+    return rows
+
+
+async def store_account_history(
+    address: str,
+    *,
+    limit: int = bscscan.DEFAULT_LIMIT,
+    api_key: str | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict[str, Any]:
+    """Fetch up to ``limit`` entries per BscScan list and store them.
+
+    Returns ``{"address", "stored", "batches"}``. Batches already written
+    stay written if a later fetch fails.
+    """
+    stored = batches = 0
+    batch: list[bscscan.BscTxRecord] = []
+
+    async def flush() -> None:
+        nonlocal stored, batches
+        rows = _rows(batch)
+        batch.clear()
+        stored += await asyncio.to_thread(store.save_tagged_many, rows)
+        batches += 1
+
+    async for rec in bscscan.stream_account_records(
+        address, limit=limit, api_key=api_key, max_buffered=batch_size
+    ):
+        batch.append(rec)
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+    logger.info("bsc sync %s: %d rows stored in %d batches", address, stored, batches)
+    return {"address": address, "stored": stored, "batches": batches}
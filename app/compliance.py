@@ -1,7 +1,9 @@
 # app / compliance.py
 from __future__ import annotations
 
+import bisect
 import re
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
 from decimal import Decimal
 from pathlib import Path
@@ -40,6 +42,100 @@ KEYWORD_PATTERNS: dict[str, list[Pattern[str]]] = {
     for cat, words in KEYWORDS.items()
 }
 
+_WORD_CHAR = re.compile(r"\w")
+
+
+class KeywordMatcher:
+    """All tagging keywords compiled into one case-insensitive scanner.
+
+    ``scan`` reports every (category, keyword) entry whose ``\\bword\\b``
+    pattern would match, in KEYWORD_PATTERNS order, from a single pass over
+    the memo. The zero-width lookahead tries every position so overlapping
+    keywords are found; longest-first alternation reports the longest word
+    starting there, and shorter keywords that are boundary-delimited
+    prefixes of it are recovered through a precomputed prefix map.
+    """
+
+    def __init__(self, keywords: dict[str, list[str]]) -> None:
+        self.entries: list[tuple[str, str]] = []
+        by_word: dict[str, list[int]] = {}
+        for cat, words in keywords.items():
+            for w in words:
+                w = str(w)
+                if not w:
+                    continue
+                by_word.setdefault(w.lower(), []).append(len(self.entries))
+                self.entries.append((cat, rf"\b{re.escape(w)}\b"))
+        self._prefixes = {
+            w: sorted(
+                i
+                for u, idx in by_word.items()
+                if w.startswith(u) and self._ends_on_boundary(w, len(u))
+                for i in idx
+            )
+            for w in by_word
+        }
+        ordered = sorted(by_word, key=lambda w: (-len(w), w))
+        self.pattern: Pattern[str] | None = (
+            re.compile(
+                r"(?=\b(" + "|".join(re.escape(w) for w in ordered) + r")\b)",
+                re.IGNORECASE,
+            )
+            if ordered
+            else None
+        )
+
+    @staticmethod
+    def _ends_on_boundary(word: str, end: int) -> bool:
+        if end >= len(word):
+            return True
+        return bool(_WORD_CHAR.match(word[end - 1])) != bool(
+            _WORD_CHAR.match(word[end]),
+        )
+
+    def _entries_for(self, hit: str) -> list[int]:
+        found = self._prefixes.get(hit.lower())
+        if found is not None:
+            return found
+        # Case folding under re.IGNORECASE can match text whose lower() differs
+        # from the keyword's (e.g. "K" for the Kelvin sign); resolve exactly.
+        return sorted(
+            i
+            for i, (_, pat) in enumerate(self.entries)
+            if re.match(pat, hit, re.IGNORECASE)
+        )
+
+    def scan(self, text: str) -> list[int]:
+        """Indices into ``entries`` that match ``text``, in entry order."""
+        if self.pattern is None or not text:
+            return []
+        hits: set[int] = set()
+        for m in self.pattern.finditer(text):
+            hits.update(self._entries_for(m.group(1)))
+        return sorted(hits)
+
+    def scan_many(self, texts: Sequence[str]) -> list[list[int]]:
+        """``scan`` for many memos with one pass over their NUL-joined text.
+
+        NUL is a non-word character that no keyword contains, so matches
+        never straddle memos and word boundaries are preserved.
+        """
+        out: list[set[int]] = [set() for _ in texts]
+        if self.pattern is None or not texts:
+            return [[] for _ in texts]
+        starts: list[int] = []
+        pos = 0
+        for t in texts:
+            starts.append(pos)
+            pos += len(t) + 1
+        for m in self.pattern.finditer("\x00".join(texts)):
+            row = bisect.bisect_right(starts, m.start()) - 1
+            out[row].update(self._entries_for(m.group(1)))
+        return [sorted(h) for h in out]
+
+
+KEYWORD_MATCHER = KeywordMatcher(KEYWORDS)
+
 
 # ----- Helpers -----
 
@@ -94,101 +190,107 @@ def _is_internal_transfer(tx, book: AddressBook | None) -> bool:
 # ----- Public API -----
 
 
-def tag_categories(tx, address_book: AddressBook | None = None) -> list[TagResult]:
-    """Multi - label: return every category that triggers, with score + reasons.
-    Compatible with any Transaction that has .memo, .fee, .amount, .direction.
-    """
-    memo = _norm(getattr(tx, "memo", None))
+_WEIGHTS = {
+    "keyword": 0.6,
+    "fee_signal": 1.0,
+    "direction_in": 0.4,
+    "direction_out": 0.4,
+    "internal_transfer": 1.0,
+}
+
+
+def _add_signal(
+    results: dict[str, TagResult],
+    category: str,
+    weight: float,
+    reason: str,
+) -> None:
+    found = results.get(category)
+    if found:
+        found.score += weight
+        found.reasons.append(TagReason(category, reason))
+    else:
+        results[category] = TagResult(
+            category=category,
+            score=weight,
+            reasons=[TagReason(category, reason)],
+        )
+
+
+def _tag_with_hits(
+    tx,
+    hits: list[int],
+    address_book: AddressBook | None,
+) -> list[TagResult]:
     fee = _as_decimal(getattr(tx, "fee", None))
     amount = _as_decimal(getattr(tx, "amount", None))
     direction = str(_norm(getattr(tx, "direction", None))).lower()
 
-    results: list[TagResult] = []
-
-    weights = {
-        "keyword": 0.6,
-        "fee_signal": 1.0,
-        "direction_in": 0.4,
-        "direction_out": 0.4,
-        "internal_transfer": 1.0,
-    }
+    # Keyed by category; dicts keep insertion order, which the final stable
+    # sort relies on to break score ties.
+    results: dict[str, TagResult] = {}
 
     # 1) Fees heuristic
     if fee > 0 and amount <= 0:
-        results.append(
-            TagResult(
-                category="fee",
-                score=weights["fee_signal"],
-                reasons=[TagReason("fee", "Positive fee + nonpositive amount")],
-            ),
+        _add_signal(
+            results,
+            "fee",
+            _WEIGHTS["fee_signal"],
+            "Positive fee + nonpositive amount",
         )
 
-    # 2) Keyword hits per category
-    for cat, patterns in KEYWORD_PATTERNS.items():
-        for pat in patterns:
-            if pat.search(memo):
-                found = next((r for r in results if r.category == cat), None)
-                if found:
-                    found.score += weights["keyword"]
-                    found.reasons.append(
-                        TagReason(cat, f"Keyword match: {pat.pattern}"),
-                    )
-                else:
-                    results.append(
-                        TagResult(
-                            category=cat,
-                            score=weights["keyword"],
-                            reasons=[TagReason(cat, f"Keyword match: {pat.pattern}")],
-                        ),
-                    )
+    # 2) Keyword hits per category (already in KEYWORD_PATTERNS order)
+    for i in hits:
+        cat, pattern = KEYWORD_MATCHER.entries[i]
+        _add_signal(results, cat, _WEIGHTS["keyword"], f"Keyword match: {pattern}")
 
     # 3) Internal transfers boost
     if _is_internal_transfer(tx, address_book):
-        found = next((r for r in results if r.category == "transfer"), None)
-        if found:
-            found.score += weights["internal_transfer"]
-            found.reasons.append(
-                TagReason("transfer", "Internal transfer (same owner)"),
-            )
-        else:
-            results.append(
-                TagResult(
-                    category="transfer",
-                    score=weights["internal_transfer"],
-                    reasons=[TagReason("transfer", "Internal transfer (same owner)")],
-                ),
-            )
+        _add_signal(
+            results,
+            "transfer",
+            _WEIGHTS["internal_transfer"],
+            "Internal transfer (same owner)",
+        )
 
     # 4) Direction soft signal
     if direction in {"in", "incoming", "credit"}:
-        found = next((r for r in results if r.category == "income"), None)
-        if found:
-            found.score += weights["direction_in"]
-            found.reasons.append(TagReason("income", "Direction suggests inbound"))
-        else:
-            results.append(
-                TagResult(
-                    category="income",
-                    score=weights["direction_in"],
-                    reasons=[TagReason("income", "Direction suggests inbound")],
-                ),
-            )
+        _add_signal(
+            results,
+            "income",
+            _WEIGHTS["direction_in"],
+            "Direction suggests inbound",
+        )
     elif direction in {"out", "outgoing", "debit"}:
-        found = next((r for r in results if r.category == "expense"), None)
-        if found:
-            found.score += weights["direction_out"]
-            found.reasons.append(TagReason("expense", "Direction suggests outbound"))
-        else:
-            results.append(
-                TagResult(
-                    category="expense",
-                    score=weights["direction_out"],
-                    reasons=[TagReason("expense", "Direction suggests outbound")],
-                ),
-            )
+        _add_signal(
+            results,
+            "expense",
+            _WEIGHTS["direction_out"],
+            "Direction suggests outbound",
+        )
+
+    return sorted(results.values(), key=lambda r: r.score, reverse=True)
 
-    results.sort(key=lambda r: r.score, reverse=True)
-    return results
+
+def tag_categories(tx, address_book: AddressBook | None = None) -> list[TagResult]:
+    """Multi - label: return every category that triggers, with score + reasons.
+    Compatible with any Transaction that has .memo, .fee, .amount, .direction.
+    """
+    memo = _norm(getattr(tx, "memo", None))
+    return _tag_with_hits(tx, KEYWORD_MATCHER.scan(memo), address_book)
+
+
+def tag_categories_batch(
+    txs: Iterable,
+    address_book: AddressBook | None = None,
+) -> list[list[TagResult]]:
+    """``tag_categories`` for many transactions; memos are scanned in one pass."""
+    txs = list(txs)
+    memos = [_norm(getattr(tx, "memo", None)) for tx in txs]
+    return [
+        _tag_with_hits(tx, hits, address_book)
+        for tx, hits in zip(txs, KEYWORD_MATCHER.scan_many(memos), strict=True)
+    ]
 
 
 def tag_category(tx, address_book: AddressBook | None = None) -> Category:
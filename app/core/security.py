@@ -15,7 +15,6 @@ Replaces: security.py, enterprise_security.py, enterprise_security_enhanced.py,
 
 from __future__ import annotations
 
-import hmac
 import logging
 import os
 import secrets
@@ -30,6 +29,8 @@ from fastapi import Header, HTTPException, Request, Response, status
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
 
+from app.security.api_keys import api_key_ring
+
 if TYPE_CHECKING:
     from collections.abc import Callable
 
@@ -45,8 +46,6 @@ load_dotenv(dotenv_path=DOTENV_PATH, override=False)
 # Data directory for secure storage
 _DATA_DIR = PROJECT_ROOT / "data"
 _DATA_DIR.mkdir(parents=True, exist_ok=True)
-_KEY_FILE = _DATA_DIR / "api_key.secret"
-_META_FILE = _DATA_DIR / "api_key.meta"
 
 # Security configuration (build in steps for clearer typing)
 _rate_limit_requests = int(os.getenv("RATE_LIMIT_REQUESTS", "100"))
@@ -237,35 +236,27 @@ def expected_api_key() -> str:
     1) ENV: X_API_KEY or API_KEY
     2) File: data/api_key.secret
     3) Generate new key.
+
+    Keys are served from the shared in-memory ``api_key_ring``; the
+    environment and key file are only re-checked every few seconds.
     """
-    # Try environment variables first
-    key = os.getenv("X_API_KEY") or os.getenv("API_KEY")
+    key = api_key_ring.primary()
     if key:
-        return key.strip()
-
-    # Try file-based key
-    if _KEY_FILE.exists():
-        try:
-            return _KEY_FILE.read_text().strip()
-        except Exception as e:
-            security_logger.warning(f"Failed to read API key file: {e}")
+        return key
 
     # Generate new key as fallback
     new_key = secrets.token_urlsafe(32)
     try:
-        _KEY_FILE.write_text(new_key)
-        _META_FILE.write_text(f"Generated: {datetime.now(UTC).isoformat()}\n")
+        api_key_ring.rotate(new_key, grace_seconds=0)
         security_logger.info("Generated new API key")
     except Exception as e:
         security_logger.exception(f"Failed to save API key: {e}")
-
-    return new_key
+        return new_key
+    return api_key_ring.primary()
 
 
 def enforce_api_key(x_api_key: str = Header(None, alias="X-API-Key")) -> bool:
     """FastAPI dependency for API key authentication."""
-    expected = expected_api_key()
-
     if not x_api_key:
         security_manager.log_security_event(
             SecurityEventType.UNAUTHORIZED_ACCESS,
@@ -276,7 +267,9 @@ def enforce_api_key(x_api_key: str = Header(None, alias="X-API-Key")) -> bool:
             detail="API key required",
         )
 
-    if not hmac.compare_digest(x_api_key, expected):
+    if not api_key_ring.configured():
+        expected_api_key()  # first use: generate and persist a key
+    if not api_key_ring.matches(x_api_key):
         security_manager.log_security_event(
             SecurityEventType.UNAUTHORIZED_ACCESS,
             {"reason": "Invalid API key"},
@@ -0,0 +1,397 @@
+"""Bounded, thread-safe DB connection pools used behind ``store._conn()``.
+
+Each backend gets its own pool subclass so health checks can be tailored:
+
+- ``SQLitePool`` verifies that the database file on disk is still the one the
+  connection was opened against (tests and tools frequently recreate files).
+- ``PostgresPool`` pings idle connections with ``SELECT 1`` and discards
+  connections the driver reports as closed/broken.
+
+Callers receive a ``PooledConnection`` proxy. It behaves like the underlying
+driver connection; ``close()`` returns the connection to the pool (rolling
+back any transaction left open) instead of tearing it down, so existing
+``con = _conn(); ...; con.close()`` call sites work unchanged.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no connection becomes available within the acquire timeout."""
+
+
+class _Entry:
+    """Bookkeeping for a raw connection owned by a pool."""
+
+    __slots__ = ("conn", "created_at", "last_used", "identity")
+
+    def __init__(self, conn: Any, identity: Any = None) -> None:
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+        self.identity = identity
+
+
+class PooledConnection:
+    """Proxy handed out by a pool; ``close()`` releases instead of closing."""
+
+    def __init__(self, pool: ConnectionPool, entry: _Entry) -> None:
+        self._pool = pool
+        self._entry: _Entry | None = entry
+        self._cursors: list[Any] = []
+
+    @property
+    def raw(self) -> Any:
+        if self._entry is None:
+            msg = "connection has been returned to the pool"
+            raise RuntimeError(msg)
+        return self._entry.conn
+
+    def cursor(self, *args: Any, **kwargs: Any) -> Any:
+        cur = self.raw.cursor(*args, **kwargs)
+        self._cursors.append(cur)
+        return cur
+
+    def execute(self, *args: Any, **kwargs: Any) -> Any:
+        cur = self.raw.execute(*args, **kwargs)
+        self._cursors.append(cur)
+        return cur
+
+    def close(self) -> None:
+        entry, self._entry = self._entry, None
+        if entry is None:
+            return
+        # Finalize outstanding statements so a reused SQLite connection does
+        # not keep an old read snapshot open.
+        for cur in self._cursors:
+            with contextlib.suppress(Exception):
+                cur.close()
+        self._cursors.clear()
+        self._pool._release(entry)
+
+    @property
+    def closed(self) -> bool:
+        return self._entry is None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.raw, name)
+
+    def __enter__(self) -> PooledConnection:
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        with contextlib.suppress(Exception):
+            if exc_type is None:
+                self.raw.commit()
+            else:
+                self.raw.rollback()
+        self.close()
+
+    def __del__(self) -> None:
+        # A caller dropped the proxy without closing it (typically an error
+        # path). Don't trust the connection state; hand it back for disposal.
+        # Finalizers may run while the pool lock is held, so only enqueue here.
+        entry = getattr(self, "_entry", None)
+        if entry is not None:
+            self._entry = None
+            self._pool._orphans.append(entry)
+
+
+class ConnectionPool:
+    """Generic bounded pool; subclasses provide backend-specific checks.
+
+    - ``max_size`` bounds open connections (idle + checked out).
+    - Idle connections are reused LIFO so the warmest connection is handed
+      out first; the oldest idle ones are reaped after ``idle_timeout``.
+    - Connections idle longer than ``health_check_interval`` are validated
+      before being handed out again.
+    """
+
+    backend = "generic"
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        *,
+        max_size: int = 10,
+        idle_timeout: float = 300.0,
+        acquire_timeout: float = 5.0,
+        health_check_interval: float = 30.0,
+        name: str = "",
+    ) -> None:
+        self._factory = factory
+        self.max_size = max(1, int(max_size))
+        self.idle_timeout = float(idle_timeout)
+        self.acquire_timeout = float(acquire_timeout)
+        self.health_check_interval = float(health_check_interval)
+        self.name = name
+        self._idle: deque[_Entry] = deque()
+        self._orphans: deque[_Entry] = deque()
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        self._stats = {
+            "created": 0,
+            "closed": 0,
+            "acquired": 0,
+            "reused": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+            "reaped": 0,
+            "discarded": 0,
+        }
+
+    # -- backend hooks ---------------------------------------------------------
+
+    def _identity(self) -> Any:
+        """Return a token describing what a new connection points at."""
+        return None
+
+    def _is_healthy(self, entry: _Entry, idle_for: float) -> bool:
+        return True
+
+    def _reset(self, conn: Any) -> None:
+        """Return a connection to a clean state before it goes back idle."""
+        conn.rollback()
+
+    # -- public API ------------------------------------------------------------
+
+    def acquire(self, timeout: float | None = None) -> PooledConnection:
+        """Check out a connection, creating one if the pool has room."""
+        deadline = time.monotonic() + (
+            self.acquire_timeout if timeout is None else timeout
+        )
+        while True:
+            self._drain_orphans()
+            stale: list[_Entry] = []
+            entry: _Entry | None = None
+            create = False
+            with self._cond:
+                if self._closed:
+                    msg = f"pool {self.name!r} is closed"
+                    raise RuntimeError(msg)
+                stale = self._collect_expired_locked()
+                if self._idle:
+                    entry = self._idle.pop()
+                    self._in_use += 1
+                elif self._in_use + len(self._idle) < self.max_size:
+                    self._in_use += 1
+                    create = True
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        msg = (
+                            f"timed out waiting for a connection from pool "
+                            f"{self.name!r} (max_size={self.max_size})"
+                        )
+                        raise PoolTimeoutError(msg)
+                    self._stats["waits"] += 1
+                    # Wake periodically: slots freed by garbage-collected
+                    # proxies are not signalled through the condition.
+                    self._cond.wait(min(remaining, 0.1))
+                    continue
+            self._close_entries(stale)
+
+            if create:
+                try:
+                    entry = _Entry(self._factory(), self._identity())
+                except Exception:
+                    with self._cond:
+                        self._in_use -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._stats["created"] += 1
+                    self._stats["acquired"] += 1
+                return PooledConnection(self, entry)
+
+            assert entry is not None
+            idle_for = time.monotonic() - entry.last_used
+            try:
+                healthy = self._is_healthy(entry, idle_for)
+            except Exception:
+                healthy = False
+            if not healthy:
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                self._discard(entry)
+                continue
+            with self._cond:
+                self._stats["acquired"] += 1
+                self._stats["reused"] += 1
+            return PooledConnection(self, entry)
+
+    def reap_idle(self) -> int:
+        """Close idle connections older than ``idle_timeout``; return count."""
+        with self._cond:
+            stale = self._collect_expired_locked()
+        self._close_entries(stale)
+        return len(stale)
+
+    def close(self) -> None:
+        """Close idle connections and refuse further checkouts.
+
+        Connections still checked out are closed when they are released.
+        """
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        self._close_entries(idle)
+
+    def stats(self) -> dict[str, Any]:
+        self._drain_orphans()
+        with self._cond:
+            out: dict[str, Any] = dict(self._stats)
+            out.update(
+                {
+                    "name": self.name,
+                    "backend": self.backend,
+                    "max_size": self.max_size,
+                    "in_use": self._in_use,
+                    "idle": len(self._idle),
+                },
+            )
+        return out
+
+    # -- internals -------------------------------------------------------------
+
+    def _release(self, entry: _Entry) -> None:
+        try:
+            self._reset(entry.conn)
+        except Exception:
+            self._discard(entry)
+            return
+        entry.last_used = time.monotonic()
+        with self._cond:
+            self._in_use -= 1
+            if self._closed:
+                to_close = [entry]
+            else:
+                self._idle.append(entry)
+                to_close = self._collect_expired_locked()
+            self._cond.notify()
+        self._close_entries(to_close)
+
+    def _discard(self, entry: _Entry) -> None:
+        with self._cond:
+            self._in_use -= 1
+            self._stats["discarded"] += 1
+            self._cond.notify()
+        self._close_entries([entry])
+
+    def _drain_orphans(self) -> None:
+        while self._orphans:
+            try:
+                entry = self._orphans.popleft()
+            except IndexError:
+                break
+            self._discard(entry)
+
+    def _collect_expired_locked(self) -> list[_Entry]:
+        if self.idle_timeout <= 0:
+            return []
+        cutoff = time.monotonic() - self.idle_timeout
+        expired: list[_Entry] = []
+        # Oldest idle connections sit on the left of the deque.
+        while self._idle and self._idle[0].last_used < cutoff:
+            expired.append(self._idle.popleft())
+        self._stats["reaped"] += len(expired)
+        return expired
+
+    def _close_entries(self, entries: list[_Entry]) -> None:
+        for entry in entries:
+            with contextlib.suppress(Exception):
+                entry.conn.close()
+        if entries:
+            with self._cond:
+                self._stats["closed"] += len(entries)
+
+
+class SQLitePool(ConnectionPool):
+    """Pool for a single SQLite database file."""
+
+    backend = "sqlite"
+
+    def __init__(self, factory: Callable[[], Any], path: str, **kwargs: Any) -> None:
+        self.path = path
+        super().__init__(factory, **kwargs)
+
+    def _file_identity(self) -> tuple[int, int] | None:
+        try:
+            st = Path(self.path).stat()
+        except OSError:
+            return None
+        return (st.st_dev, st.st_ino)
+
+    def _identity(self) -> Any:
+        return self._file_identity()
+
+    def _is_healthy(self, entry: _Entry, idle_for: float) -> bool:
+        # A deleted or replaced database file leaves the old connection bound
+        # to an orphaned inode; never hand such a connection out.
+        if entry.identity != self._file_identity():
+            return False
+        if idle_for >= self.health_check_interval:
+            entry.conn.execute("SELECT 1").fetchone()
+        return True
+
+    def _reset(self, conn: Any) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+
+
+class PostgresPool(ConnectionPool):
+    """Pool for a Postgres DSN (psycopg3 or psycopg2)."""
+
+    backend = "postgres"
+
+    def _is_healthy(self, entry: _Entry, idle_for: float) -> bool:
+        conn = entry.conn
+        if getattr(conn, "closed", False):
+            return False
+        if getattr(conn, "broken", False):
+            return False
+        if idle_for >= self.health_check_interval:
+            cur = conn.cursor()
+            try:
+                cur.execute("SELECT 1")
+                cur.fetchone()
+            finally:
+                with contextlib.suppress(Exception):
+                    cur.close()
+            conn.rollback()
+        return True
+
+
+def pool_settings_from_env() -> dict[str, Any]:
+    """Read pool sizing knobs from the environment (with safe defaults)."""
+
+    def _num(name: str, default: float) -> float:
+        try:
+            return float(os.getenv(name, str(default)))
+        except Exception:
+            return default
+
+    return {
+        "max_size": int(_num("DB_POOL_SIZE", 10)),
+        "idle_timeout": _num("DB_POOL_IDLE_TIMEOUT", 300.0),
+        "acquire_timeout": _num("DB_POOL_TIMEOUT", 5.0),
+        "health_check_interval": _num("DB_POOL_HEALTH_INTERVAL", 30.0),
+    }
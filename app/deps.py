@@ -1,5 +1,6 @@
+import os
 from collections.abc import Callable
-from typing import Any
+from typing import Any, cast
 
 from fastapi import Depends, HTTPException, Request, status
 from jwt import DecodeError, ExpiredSignatureError, InvalidTokenError
@@ -8,6 +9,7 @@ from . import store
 from .security_session import decode_jwt
 from .settings import get_settings
 from .store import UserDict
+from .ttl_cache import TTLCache
 
 
 class _LazySettings:
@@ -50,10 +52,62 @@ def _lookup_user_by_sub(sub: str) -> UserDict | dict[str, Any] | None:
     return None
 
 
+# Resolved principals keyed by (sub, token iat). Entries are short-lived and
+# tagged like store's user cache; store user writes invalidate them.
+_principal_cache = TTLCache(
+    maxsize=int(os.getenv("PRINCIPAL_CACHE_SIZE", "4096") or 4096),
+    ttl=float(os.getenv("PRINCIPAL_CACHE_TTL", "30") or 30),
+    name="principals",
+)
+
+
+def _invalidate_principals(tags: tuple[str, ...]) -> None:
+    _principal_cache.invalidate_tags(*tags)
+
+
+store.add_user_invalidation_hook(_invalidate_principals)
+
+
+def principal_cache_stats() -> dict[str, Any]:
+    """Return size and hit/miss counters for the principal cache."""
+    return _principal_cache.stats()
+
+
+def _resolve_principal(sub: str, iat: Any) -> UserDict | dict[str, Any] | None:
+    """`_lookup_user_by_sub` through the principal cache.
+
+    Callers get a shallow copy so per-request changes never leak into the
+    cached entry. Unknown subjects are not cached.
+    """
+    key = (sub, iat)
+    user = _principal_cache.get(key)
+    if user is None:
+        user = _lookup_user_by_sub(sub)
+        if not user:
+            return None
+        _principal_cache.set(key, user, tags=store._user_cache_tags(user))
+    return dict(user)
+
+
+# Per-request memo on request.state; None is a valid (anonymous) result.
+_UNRESOLVED = object()
+
+
 def current_user(request: Request) -> UserDict | dict[str, Any] | None:
     """Reads JWT from cookie 'session' or Authorization: Bearer <jwt>.
     Returns a user dict or None.
+
+    The result is resolved once per request and cached briefly per token.
     """
+    cached = getattr(request.state, "current_user", _UNRESOLVED)
+    if cached is not _UNRESOLVED:
+        return cast("UserDict | dict[str, Any] | None", cached)
+    user = _current_user_uncached(request)
+    request.state.current_user = user
+    return user
+
+
+def _current_user_uncached(request: Request) -> UserDict | dict[str, Any] | None:
     token: str | None = request.cookies.get("session")
 
     if not token:
@@ -69,7 +123,7 @@ def current_user(request: Request) -> UserDict | dict[str, Any] | None:
         sub = payload.get("sub")
         if not sub:
             return None
-        return _lookup_user_by_sub(str(sub))
+        return _resolve_principal(str(sub), payload.get("iat"))
     except (ExpiredSignatureError, InvalidTokenError, DecodeError):
         # invalid / expired token
         return None
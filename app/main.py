@@ -6,6 +6,7 @@ from __future__ import annotations
 
 import contextlib
 import importlib
+import inspect
 import os
 from contextlib import asynccontextmanager
 from datetime import UTC, datetime
@@ -142,8 +143,33 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     except Exception:
         logger.debug("dev.bootstrap_failed", exc_info=True)
     logger.info("startup.db_initialized")
+    # Warm the AI risk models off the request path (loaded from disk cache)
+    if getattr(settings, "app_env", "development") != "test":
+        with contextlib.suppress(Exception):
+            from .advanced_ai_risk import preload_models
+
+            preload_models()
+    # Cross-worker delivery for alerts raised in this process
+    with contextlib.suppress(Exception):
+        from .realtime_backplane import get_backplane
+
+        await get_backplane().start()
     yield
     logger.info("shutdown.begin", stage="shutdown")
+    with contextlib.suppress(Exception):
+        from .realtime_backplane import get_backplane
+
+        await get_backplane().close()
+    with contextlib.suppress(Exception):
+        from .audit_logger import audit_logger
+
+        audit_logger.wait_drained(timeout=2.0)
+    with contextlib.suppress(Exception):
+        from integrations.http import aclose_client
+
+        await aclose_client()
+    with contextlib.suppress(Exception):
+        store.close_pools()
 
 
 # Create FastAPI application
@@ -1262,7 +1288,10 @@ async def integrations_xrpl_fetch(account: str, limit: int = 10):
             parts = mod_path.split(".")
             mod = __import__(mod_path, fromlist=[parts[-1]])
             _fetch = mod.fetch_account_tx
-            return _fetch(account, limit=limit)
+            result = _fetch(account, limit=limit)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
         except Exception as e:
             last_exc = e
             continue
@@ -207,12 +207,21 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple in-memory rate limiting middleware."""
+    """In-memory per-IP rate limiting backed by the sharded ``RateLimiter``.
+
+    Each IP gets a token bucket of ``requests_per_minute`` tokens refilled
+    over a minute, so a request costs O(1) however many IPs are tracked.
+    """
 
     def __init__(self, app, requests_per_minute: int = 60) -> None:
         super().__init__(app)
+        from app.rate_limit import RateLimiter, RateLimitPolicy
+
         self.requests_per_minute = requests_per_minute
-        self.requests: dict[str, list[float]] = {}  # ip -> list of timestamps
+        self.policy = RateLimitPolicy(
+            "ip", capacity=requests_per_minute, per_minute=requests_per_minute
+        )
+        self.limiter = RateLimiter(self.policy, clock=time.time)
 
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         # Skip rate limiting for health checks
@@ -220,13 +229,8 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             return await call_next(request)
 
         client_ip = self._get_client_ip(request)
-        current_time = time.time()
-
-        # Clean old requests
-        self._clean_old_requests(current_time)
-
-        # Check rate limit
-        if self._is_rate_limited(client_ip, current_time):
+        decision = self.limiter.hit(client_ip, self.policy)
+        if not decision.allowed:
             logger.warning(
                 "Rate limit exceeded",
                 client_ip=client_ip,
@@ -236,10 +240,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 
             from app.exceptions import RateLimitException
 
-            raise RateLimitException(retry_after=60)
-
-        # Record request
-        self._record_request(client_ip, current_time)
+            raise RateLimitException(retry_after=decision.retry_after)
 
         return await call_next(request)
 
@@ -258,31 +259,16 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         return request.client.host if request.client else "unknown"
 
     def _clean_old_requests(self, current_time: float) -> None:
-        """Remove requests older than 1 minute."""
-        cutoff_time = current_time - 60  # 1 minute ago
-
-        for ip in list(self.requests):
-            self.requests[ip] = [
-                timestamp for timestamp in self.requests[ip] if timestamp > cutoff_time
-            ]
-
-            # Remove empty entries
-            if not self.requests[ip]:
-                del self.requests[ip]
+        """Drop buckets idle long enough to have refilled completely."""
+        self.limiter.evict_idle(current_time)
 
     def _is_rate_limited(self, ip: str, current_time: float) -> bool:
         """Check if IP is rate limited."""
-        if ip not in self.requests:
-            return False
-
-        return len(self.requests[ip]) >= self.requests_per_minute
+        return self.limiter.peek(ip, self.policy, current_time) < 1
 
     def _record_request(self, ip: str, current_time: float) -> None:
         """Record a request for the IP."""
-        if ip not in self.requests:
-            self.requests[ip] = []
-
-        self.requests[ip].append(current_time)
+        self.limiter.hit(ip, self.policy, now=current_time)
 
 
 def metrics_endpoint() -> PlainTextResponse:
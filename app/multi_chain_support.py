@@ -7,13 +7,29 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from dataclasses import asdict, dataclass
+import math
+import os
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+from dataclasses import asdict, dataclass, field
 from datetime import UTC, datetime, timedelta
 from enum import Enum
-from typing import Any
+from typing import Any, TypeVar
+
+from .ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Finalized transactions never change, so they are kept until evicted (LRU);
+# address histories grow with every new block and are only reused briefly.
+TX_CACHE_SIZE = int(os.getenv("MULTICHAIN_TX_CACHE_SIZE", "10000"))
+ADDRESS_CACHE_SIZE = int(os.getenv("MULTICHAIN_ADDRESS_CACHE_SIZE", "2048"))
+ADDRESS_CACHE_TTL = float(os.getenv("MULTICHAIN_ADDRESS_CACHE_TTL", "15"))
+# Budget for one chain in a cross-chain analysis; slower chains are reported
+# as partial instead of holding up the rest.
+CHAIN_ANALYSIS_TIMEOUT = float(os.getenv("MULTICHAIN_CHAIN_TIMEOUT", "10"))
+
 
 def _to_iso(timestamp: Any) -> str:
     """Safely convert timestamp-like values to ISO string.
@@ -111,6 +127,8 @@ class MultiChainAnalytics:
     chain_distribution: dict[str, dict[str, Any]]
     risk_metrics: dict[str, float]
     timestamp: datetime
+    # chain -> "timeout" / "error" for chains left out of the figures above
+    failed_chains: dict[str, str] = field(default_factory=dict)
 
 
 class MultiChainEngine:
@@ -120,6 +138,13 @@ class MultiChainEngine:
         self.chain_configs = self._initialize_chain_configs()
         self.rate_limiters: dict[SupportedChain, dict[str, Any]] = {}
         self._init_rate_limiting()
+        self._tx_cache = TTLCache(TX_CACHE_SIZE, math.inf, name="chain_tx")
+        self._address_cache = TTLCache(
+            ADDRESS_CACHE_SIZE, ADDRESS_CACHE_TTL, name="chain_address"
+        )
+        # Lookups currently being fetched; concurrent callers await the same task
+        self._inflight: dict[Hashable, asyncio.Future[Any]] = {}
+        self.coalesced = 0
 
     def _initialize_chain_configs(self) -> dict[SupportedChain, ChainInfo]:
         """Initialize blockchain configuration."""
@@ -227,34 +252,54 @@ class MultiChainEngine:
         chain: SupportedChain,
         tx_hash: str,
     ) -> ChainTransaction | None:
-        """Get transaction details from any supported chain."""
+        """Get transaction details from any supported chain.
+
+        Finalized transactions are served from cache; concurrent lookups of
+        the same hash share one upstream call.
+        """
+        key = (chain, tx_hash)
+        cached = self._tx_cache.get(key)
+        if cached is not None:
+            return cached
+        return await self._coalesce(
+            ("tx", *key), lambda: self._fetch_transaction(chain, tx_hash)
+        )
+
+    async def _fetch_transaction(
+        self,
+        chain: SupportedChain,
+        tx_hash: str,
+    ) -> ChainTransaction | None:
         if not self._check_rate_limit(chain):
             msg = f"Rate limit exceeded for {chain.value}"
             raise Exception(msg)
 
         try:
             if chain == SupportedChain.BITCOIN:
-                return await self._get_bitcoin_transaction(tx_hash)
-            if chain == SupportedChain.ETHEREUM:
-                return await self._get_ethereum_transaction(tx_hash)
-            if chain == SupportedChain.XRP:
-                return await self._get_xrp_transaction(tx_hash)
-            if chain == SupportedChain.POLYGON:
-                return await self._get_polygon_transaction(tx_hash)
-            if chain == SupportedChain.BSC:
-                return await self._get_bsc_transaction(tx_hash)
-            if chain == SupportedChain.CARDANO:
-                return await self._get_cardano_transaction(tx_hash)
-            if chain == SupportedChain.SOLANA:
-                return await self._get_solana_transaction(tx_hash)
-            if chain == SupportedChain.AVALANCHE:
-                return await self._get_avalanche_transaction(tx_hash)
-            msg = f"Unsupported chain: {chain}"
-            raise ValueError(msg)
+                tx = await self._get_bitcoin_transaction(tx_hash)
+            elif chain == SupportedChain.ETHEREUM:
+                tx = await self._get_ethereum_transaction(tx_hash)
+            elif chain == SupportedChain.XRP:
+                tx = await self._get_xrp_transaction(tx_hash)
+            elif chain == SupportedChain.POLYGON:
+                tx = await self._get_polygon_transaction(tx_hash)
+            elif chain == SupportedChain.BSC:
+                tx = await self._get_bsc_transaction(tx_hash)
+            elif chain == SupportedChain.CARDANO:
+                tx = await self._get_cardano_transaction(tx_hash)
+            elif chain == SupportedChain.SOLANA:
+                tx = await self._get_solana_transaction(tx_hash)
+            elif chain == SupportedChain.AVALANCHE:
+                tx = await self._get_avalanche_transaction(tx_hash)
+            else:
+                msg = f"Unsupported chain: {chain}"
+                raise ValueError(msg)
 
         except Exception as e:
             logger.exception(f"Error getting {chain.value} transaction {tx_hash}: {e}")
             return None
+        self._remember_if_final(tx)
+        return tx
 
     async def get_address_transactions(
         self,
@@ -262,80 +307,138 @@ class MultiChainEngine:
         address: str,
         limit: int = 100,
     ) -> list[ChainTransaction]:
-        """Get transactions for an address on any chain."""
+        """Get transactions for an address on any chain.
+
+        Results are cached for ``ADDRESS_CACHE_TTL`` seconds; concurrent
+        lookups of the same address share one upstream call.
+        """
+        cached = self._address_cache.get((chain, address, limit))
+        if cached is not None:
+            return list(cached)
+        txs = await self._coalesce(
+            ("address", chain, address, limit),
+            lambda: self._fetch_address_transactions(chain, address, limit),
+        )
+        return list(txs)
+
+    async def _fetch_address_transactions(
+        self,
+        chain: SupportedChain,
+        address: str,
+        limit: int,
+    ) -> list[ChainTransaction]:
         if not self._check_rate_limit(chain):
             msg = f"Rate limit exceeded for {chain.value}"
             raise Exception(msg)
 
         try:
             if chain == SupportedChain.BITCOIN:
-                return await self._get_bitcoin_address_transactions(address, limit)
-            if chain == SupportedChain.ETHEREUM:
-                return await self._get_ethereum_address_transactions(address, limit)
-            if chain == SupportedChain.XRP:
-                return await self._get_xrp_address_transactions(address, limit)
-            if chain == SupportedChain.POLYGON:
-                return await self._get_polygon_address_transactions(address, limit)
-            if chain == SupportedChain.BSC:
-                return await self._get_bsc_address_transactions(address, limit)
-            if chain == SupportedChain.CARDANO:
-                return await self._get_cardano_address_transactions(address, limit)
-            if chain == SupportedChain.SOLANA:
-                return await self._get_solana_address_transactions(address, limit)
-            if chain == SupportedChain.AVALANCHE:
-                return await self._get_avalanche_address_transactions(address, limit)
-            return []
+                txs = await self._get_bitcoin_address_transactions(address, limit)
+            elif chain == SupportedChain.ETHEREUM:
+                txs = await self._get_ethereum_address_transactions(address, limit)
+            elif chain == SupportedChain.XRP:
+                txs = await self._get_xrp_address_transactions(address, limit)
+            elif chain == SupportedChain.POLYGON:
+                txs = await self._get_polygon_address_transactions(address, limit)
+            elif chain == SupportedChain.BSC:
+                txs = await self._get_bsc_address_transactions(address, limit)
+            elif chain == SupportedChain.CARDANO:
+                txs = await self._get_cardano_address_transactions(address, limit)
+            elif chain == SupportedChain.SOLANA:
+                txs = await self._get_solana_address_transactions(address, limit)
+            elif chain == SupportedChain.AVALANCHE:
+                txs = await self._get_avalanche_address_transactions(address, limit)
+            else:
+                return []
 
         except Exception as e:
             logger.exception(
                 f"Error getting {chain.value} address transactions for {address}: {e}",
             )
             return []
+        self._address_cache.set(
+            (chain, address, limit),
+            txs,
+            tags=(f"address:{chain.value}:{address}",),
+        )
+        for tx in txs:
+            self._remember_if_final(tx)
+        return txs
+
+    async def _coalesce(self, key: Hashable, fetch: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fetch`` once for all concurrent callers asking for ``key``.
+
+        The fetch runs as its own task, so a caller that is cancelled (e.g. by
+        a timeout) does not cancel it for the others.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._fetch_done(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _fetch_done(self, key: Hashable, task: asyncio.Future[Any]) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller gave up
+
+    def _is_final(self, tx: ChainTransaction) -> bool:
+        info = self.chain_configs.get(tx.chain)
+        required = info.confirmations_required if info else 1
+        return tx.status == "confirmed" and tx.confirmations >= required
+
+    def _remember_if_final(self, tx: ChainTransaction | None) -> None:
+        if tx is not None and self._is_final(tx):
+            self._tx_cache.set((tx.chain, tx.tx_hash), tx)
+
+    def invalidate_address(self, chain: SupportedChain, address: str) -> int:
+        """Drop cached histories for ``address`` (e.g. after a new block alert)."""
+        return self._address_cache.invalidate_tags(f"address:{chain.value}:{address}")
+
+    def cache_stats(self) -> dict[str, Any]:
+        return {
+            "transactions": self._tx_cache.stats(),
+            "addresses": self._address_cache.stats(),
+            "inflight": len(self._inflight),
+            "coalesced": self.coalesced,
+        }
 
     async def analyze_cross_chain_activity(
         self,
         addresses: dict[SupportedChain, list[str]],
         days: int = 30,
+        timeout: float | None = None,
     ) -> MultiChainAnalytics:
-        """Analyze activity across multiple chains."""
-        all_transactions = []
+        """Analyze activity across multiple chains.
+
+        Chains are queried concurrently, each within ``timeout`` seconds
+        (``CHAIN_ANALYSIS_TIMEOUT`` by default); chains that time out or fail
+        are listed in ``failed_chains`` and the rest are still reported.
+        """
+        results = await asyncio.gather(
+            *(
+                self._analyze_chain(chain, addr_list, days, timeout)
+                for chain, addr_list in addresses.items()
+            )
+        )
+
+        all_transactions: list[ChainTransaction] = []
         chain_distribution = {}
+        failed_chains = {}
         total_value_usd = 0.0
         unique_addresses = set()
-
-        # Collect transactions from all chains
-        for chain, addr_list in addresses.items():
-            chain_txs = []
-            chain_value = 0.0
-
-            for address in addr_list:
-                txs = await self.get_address_transactions(chain, address, limit=1000)
-
-                # Filter by date range
-                cutoff_date = datetime.now(UTC) - timedelta(days=days)
-                # Only compare timestamps that are actual datetimes
-                recent_txs = [
-                    tx
-                    for tx in txs
-                    if isinstance(tx.timestamp, datetime)
-                    and tx.timestamp >= cutoff_date
-                ]
-
-                chain_txs.extend(recent_txs)
-                unique_addresses.add(address)
-
-                # Calculate USD value (mock conversion)
-                for tx in recent_txs:
-                    chain_value += tx.amount * self._get_mock_usd_price(chain)
-
-            all_transactions.extend(chain_txs)
-            total_value_usd += chain_value
-
-            chain_distribution[chain.value] = {
-                "transaction_count": len(chain_txs),
-                "total_value_usd": chain_value,
-                "average_tx_value": chain_value / len(chain_txs) if chain_txs else 0,
-                "addresses": len(addr_list),
+        for result in results:
+            if result["status"] != "ok":
+                failed_chains[result["chain"]] = result["status"]
+                continue
+            all_transactions.extend(result.pop("transactions"))
+            total_value_usd += result["total_value_usd"]
+            unique_addresses.update(result.pop("address_list"))
+            chain_distribution[result.pop("chain")] = {
+                k: v for k, v in result.items() if k != "status"
             }
 
         # Calculate cross - chain risk metrics
@@ -351,8 +454,84 @@ class MultiChainEngine:
             chain_distribution=chain_distribution,
             risk_metrics=risk_metrics,
             timestamp=datetime.now(UTC),
+            failed_chains=failed_chains,
         )
 
+    async def stream_cross_chain_activity(
+        self,
+        addresses: dict[SupportedChain, list[str]],
+        days: int = 30,
+        timeout: float | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield one summary per chain as soon as that chain finishes.
+
+        Same per-chain figures as ``chain_distribution`` plus ``chain`` and
+        ``status`` ("ok", "timeout" or "error"); fastest chains come first.
+        """
+        pending = [
+            asyncio.ensure_future(self._analyze_chain(chain, addr_list, days, timeout))
+            for chain, addr_list in addresses.items()
+        ]
+        try:
+            for next_done in asyncio.as_completed(pending):
+                result = await next_done
+                result.pop("transactions", None)
+                result.pop("address_list", None)
+                yield result
+        finally:
+            # Consumer stopped early: don't leave chain fetches running
+            for task in pending:
+                task.cancel()
+
+    async def _analyze_chain(
+        self,
+        chain: SupportedChain,
+        addr_list: list[str],
+        days: int,
+        timeout: float | None,
+    ) -> dict[str, Any]:
+        """Recent transactions and value for one chain, bounded by ``timeout``."""
+        budget = CHAIN_ANALYSIS_TIMEOUT if timeout is None else timeout
+        try:
+            per_address = await asyncio.wait_for(
+                asyncio.gather(
+                    *(
+                        self.get_address_transactions(chain, address, limit=1000)
+                        for address in addr_list
+                    )
+                ),
+                budget,
+            )
+        except TimeoutError:
+            logger.warning("Cross-chain analysis: %s timed out", chain.value)
+            return {"chain": chain.value, "status": "timeout"}
+        except Exception:
+            logger.exception("Cross-chain analysis: %s failed", chain.value)
+            return {"chain": chain.value, "status": "error"}
+
+        # Filter by date range
+        cutoff_date = datetime.now(UTC) - timedelta(days=days)
+        price = self._get_mock_usd_price(chain)
+        chain_txs = [
+            tx
+            for txs in per_address
+            for tx in txs
+            # Only compare timestamps that are actual datetimes
+            if isinstance(tx.timestamp, datetime) and tx.timestamp >= cutoff_date
+        ]
+        # Calculate USD value (mock conversion)
+        chain_value = sum(tx.amount * price for tx in chain_txs)
+        return {
+            "chain": chain.value,
+            "status": "ok",
+            "transaction_count": len(chain_txs),
+            "total_value_usd": chain_value,
+            "average_tx_value": chain_value / len(chain_txs) if chain_txs else 0,
+            "addresses": len(addr_list),
+            "transactions": chain_txs,
+            "address_list": addr_list,
+        }
+
     def get_supported_chains(self) -> list[dict[str, Any]]:
         """Get list of all supported chains with their info."""
         chains = []
@@ -675,9 +854,21 @@ async def get_address_transactions(
 async def analyze_cross_chain_activity(
     addresses: dict[SupportedChain, list[str]],
     days: int = 30,
+    timeout: float | None = None,
 ) -> MultiChainAnalytics:
     """Analyze cross - chain activity."""
-    return await multi_chain_engine.analyze_cross_chain_activity(addresses, days)
+    return await multi_chain_engine.analyze_cross_chain_activity(
+        addresses, days, timeout
+    )
+
+
+def stream_cross_chain_activity(
+    addresses: dict[SupportedChain, list[str]],
+    days: int = 30,
+    timeout: float | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Per-chain cross - chain activity summaries, as each chain completes."""
+    return multi_chain_engine.stream_cross_chain_activity(addresses, days, timeout)
 
 
 def get_supported_chains() -> list[dict[str, Any]]:
@@ -11,7 +11,7 @@ from .deps import require_user
 # project top-level `templates/` directory). Creating a Jinja2Templates
 # pointing at `app/templates` caused TemplateNotFound for paywall templates.
 from .main import templates
-from .security import expected_api_key
+from .security import paywall_api_key
 from .settings import settings
 
 # from .subscriptions import get_user_subscription  # not used here
@@ -33,13 +33,10 @@ def paywall(request: Request) -> Response:
 
 @router.post("/paywall/verify", include_in_schema=False)
 def paywall_verify(code: Annotated[str, Form()]) -> Response:
-    accepted = PAYWALL_CODE or (expected_api_key() or "").strip()
+    accepted = PAYWALL_CODE or paywall_api_key()
     if accepted and code.strip() == accepted:
-        api_key = (expected_api_key() or "").strip()
-        target = "/dashboard"
-        if api_key:
-            target = f"/dashboard?key={api_key}"
-        resp = RedirectResponse(url=target, status_code=303)
+        # Never put an API key in the URL (history, logs, referrers)
+        resp = RedirectResponse(url="/dashboard", status_code=303)
         resp.set_cookie(
             "cw_paid",
             "1",
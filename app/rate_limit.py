@@ -1,22 +1,32 @@
 """Lightweight in-memory rate limiting middleware (optional).
 
-Activated when ENABLE_RATE_LIMIT=true. This is a coarse, process-local
-implementation intended as a scaffold; for production scale replace
-with a distributed limiter (Redis, Memcached, etc.).
+Activated when ENABLE_RATE_LIMIT=true. Limits are process-local token
+buckets held by a sharded ``RateLimiter``; with REDIS_URL set the shared
+Redis limiter in ``rate_limit_redis`` is used instead.
+
+Environment variables:
+- RATE_LIMIT_CAPACITY / RATE_LIMIT_PER_MINUTE   Default policy.
+- RATE_LIMIT_USER_CAPACITY / _PER_MINUTE        Policy for verified clients.
+- RATE_LIMIT_ROUTES="/auth/login=5/10,..."      Per-route prefix policies.
+- RATE_LIMIT_MAX_CLIENTS=100000                 Bound on tracked buckets.
 """
 
 from __future__ import annotations
 
 import contextlib
+import hashlib
+import math
 import os
 import threading
 import time
-from typing import TYPE_CHECKING
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 
 from fastapi.responses import JSONResponse, Response
 
 if TYPE_CHECKING:
-    from collections.abc import Awaitable, Callable
+    from collections.abc import Awaitable, Callable, Iterable
 
     from fastapi import Request
 
@@ -57,6 +67,210 @@ class TokenBucket:
             return False
 
 
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Token bucket parameters: ``capacity`` burst, ``per_minute`` refill."""
+
+    name: str
+    capacity: int
+    per_minute: float
+
+    @property
+    def rate_per_sec(self) -> float:
+        return self.per_minute / 60.0
+
+    @property
+    def refill_seconds(self) -> float:
+        """Time for an empty bucket to fill up again."""
+        return self.capacity / self.rate_per_sec if self.per_minute > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int  # seconds until the next token (0 when allowed)
+
+    def headers(self) -> dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(max(self.retry_after, 1)),
+        }
+
+
+class _Shard:
+    __slots__ = ("buckets", "lock")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # (policy name, client key) -> [tokens, last refill]; least recently
+        # used first, so idle buckets collect at the front
+        self.buckets: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+
+
+class RateLimiter:
+    """Token buckets per (policy, client) spread over independently locked shards.
+
+    Each request touches one shard: a dict lookup, an LRU move and at most
+    ``EVICT_PER_HIT`` idle-bucket removals, so its cost does not depend on
+    how many clients are tracked. A bucket idle for longer than the slowest
+    policy's refill time is full again and is dropped without changing any
+    decision. ``max_keys`` bounds memory when that many clients are active at
+    once; beyond it the least recently seen bucket is dropped (and would
+    restart full).
+    """
+
+    EVICT_PER_HIT = 2
+
+    def __init__(
+        self,
+        default: RateLimitPolicy,
+        *,
+        routes: Iterable[tuple[str, RateLimitPolicy]] = (),
+        user: RateLimitPolicy | None = None,
+        shards: int = 64,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.default = default
+        self.user = user
+        # Longest prefix first so the most specific route policy wins
+        self.routes = sorted(routes, key=lambda r: len(r[0]), reverse=True)
+        n = 1
+        while n < max(1, shards):
+            n *= 2
+        self._shards = [_Shard() for _ in range(n)]
+        self._mask = n - 1
+        self._max_per_shard = max(1, max_keys // n)
+        policies = [default, *(p for _, p in self.routes)]
+        if user is not None:
+            policies.append(user)
+        self.idle_seconds = max(p.refill_seconds for p in policies)
+        self._clock = clock
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+    def policy_for(self, path: str, authenticated: bool = False) -> RateLimitPolicy:
+        """Route policy for ``path`` if any, else the user or default policy."""
+        for prefix, policy in self.routes:
+            if path.startswith(prefix):
+                return policy
+        if authenticated and self.user is not None:
+            return self.user
+        return self.default
+
+    def _shard(self, key: tuple[str, str]) -> _Shard:
+        return self._shards[hash(key) & self._mask]
+
+    def _evict_locked(self, shard: _Shard, now: float, budget: int | None) -> None:
+        buckets = shard.buckets
+        cutoff = now - self.idle_seconds
+        removed = 0
+        while buckets and (budget is None or removed < budget):
+            bucket = buckets[next(iter(buckets))]
+            if bucket[1] > cutoff:
+                break
+            buckets.popitem(last=False)
+            removed += 1
+        while len(buckets) > self._max_per_shard:
+            buckets.popitem(last=False)
+            removed += 1
+        self.evictions += removed
+
+    def _refill_locked(
+        self,
+        shard: _Shard,
+        key: tuple[str, str],
+        policy: RateLimitPolicy,
+        now: float,
+    ) -> list[float]:
+        bucket = shard.buckets.get(key)
+        if bucket is None:
+            bucket = shard.buckets[key] = [float(policy.capacity), now]
+        else:
+            shard.buckets.move_to_end(key)
+            elapsed = now - bucket[1]
+            if elapsed > 0:
+                bucket[0] = min(
+                    float(policy.capacity),
+                    bucket[0] + elapsed * policy.rate_per_sec,
+                )
+                bucket[1] = now
+        return bucket
+
+    def hit(
+        self,
+        client: str,
+        policy: RateLimitPolicy | None = None,
+        cost: float = 1.0,
+        now: float | None = None,
+    ) -> RateLimitDecision:
+        """Take ``cost`` tokens from ``client``'s bucket under ``policy``."""
+        policy = policy or self.default
+        now = self._clock() if now is None else now
+        key = (policy.name, client)
+        shard = self._shard(key)
+        with shard.lock:
+            bucket = self._refill_locked(shard, key, policy, now)
+            allowed = bucket[0] >= cost
+            if allowed:
+                bucket[0] -= cost
+            tokens = bucket[0]
+            self._evict_locked(shard, now, self.EVICT_PER_HIT)
+        retry_after = 0
+        if not allowed:
+            rate = policy.rate_per_sec
+            retry_after = math.ceil((cost - tokens) / rate) if rate > 0 else 60
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=policy.capacity,
+            remaining=int(max(tokens, 0)),
+            retry_after=retry_after,
+        )
+
+    def peek(
+        self,
+        client: str,
+        policy: RateLimitPolicy | None = None,
+        now: float | None = None,
+    ) -> float:
+        """Tokens ``client`` has available right now (without consuming)."""
+        policy = policy or self.default
+        now = self._clock() if now is None else now
+        key = (policy.name, client)
+        shard = self._shard(key)
+        with shard.lock:
+            bucket = shard.buckets.get(key)
+            if bucket is None:
+                return float(policy.capacity)
+            elapsed = max(0.0, now - bucket[1])
+            return min(
+                float(policy.capacity), bucket[0] + elapsed * policy.rate_per_sec
+            )
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Drop every idle bucket (a full sweep; not needed on the hot path)."""
+        now = self._clock() if now is None else now
+        before = self.evictions
+        for shard in self._shards:
+            with shard.lock:
+                self._evict_locked(shard, now, None)
+        return self.evictions - before
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "clients": len(self),
+            "shards": len(self._shards),
+            "max_keys": self._max_per_shard * len(self._shards),
+            "idle_seconds": self.idle_seconds,
+            "evictions": self.evictions,
+        }
+
+
 def _rate_limit_config() -> tuple[int, float]:
     cap = int(os.getenv("RATE_LIMIT_CAPACITY", "60"))  # burst
     per_minute = int(os.getenv("RATE_LIMIT_PER_MINUTE", "120"))
@@ -64,23 +278,104 @@ def _rate_limit_config() -> tuple[int, float]:
     return cap, rate_per_sec
 
 
+def _parse_route_policies(spec: str) -> list[tuple[str, RateLimitPolicy]]:
+    """Parse ``"/auth/login=5/10,/api/=120/600"`` (prefix=capacity/per_minute)."""
+    routes = []
+    for item in spec.split(","):
+        prefix, _, limits = item.strip().partition("=")
+        capacity, _, per_minute = limits.partition("/")
+        if not prefix or not capacity:
+            continue
+        try:
+            policy = RateLimitPolicy(
+                name=f"route:{prefix}",
+                capacity=int(capacity),
+                per_minute=float(per_minute or capacity),
+            )
+        except ValueError:
+            continue
+        routes.append((prefix, policy))
+    return routes
+
+
+def limiter_from_env() -> RateLimiter:
+    """Build the process limiter from RATE_LIMIT_* environment variables."""
+    capacity, rate_per_sec = _rate_limit_config()
+    default = RateLimitPolicy("default", capacity, rate_per_sec * 60)
+    user = None
+    if os.getenv("RATE_LIMIT_USER_CAPACITY"):
+        user_capacity = int(os.getenv("RATE_LIMIT_USER_CAPACITY", "0"))
+        user = RateLimitPolicy(
+            "user",
+            user_capacity,
+            float(os.getenv("RATE_LIMIT_USER_PER_MINUTE", str(user_capacity * 2))),
+        )
+    return RateLimiter(
+        default,
+        routes=_parse_route_policies(os.getenv("RATE_LIMIT_ROUTES", "")),
+        user=user,
+        shards=int(os.getenv("RATE_LIMIT_SHARDS", "64")),
+        max_keys=int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000")),
+    )
+
+
+def _verified_api_key(request: Request) -> str | None:
+    key = request.headers.get("x-api-key")
+    if not key:
+        return None
+    try:
+        from .security import api_key_matches
+
+        return key if api_key_matches(key) else None
+    except Exception:
+        return None
+
+
+def _verified_subject(request: Request) -> str | None:
+    # Signature and expiry check only (no DB lookup), so the middleware
+    # never blocks the event loop resolving the principal.
+    token = request.cookies.get("session")
+    if not token:
+        auth = request.headers.get("authorization", "")
+        if auth.lower().startswith("bearer "):
+            token = auth[7:].strip()
+    if not token:
+        return None
+    try:
+        from .security_session import decode_jwt
+
+        sub = decode_jwt(token).get("sub")
+    except Exception:
+        return None
+    return str(sub) if sub else None
+
+
+def client_identity(request: Request) -> tuple[str, bool]:
+    """Rate-limit key for ``request`` and whether it is authenticated.
+
+    Only verified credentials get their own bucket and the user policy: an
+    active API key is keyed by its digest, a session cookie or bearer token
+    with a valid signature by its subject (so users behind one NAT do not
+    share a bucket). Anything else, including unverifiable credentials, is
+    keyed by the remote address, so rotating made-up tokens cannot mint
+    fresh buckets or evict real clients.
+    """
+    key = _verified_api_key(request)
+    if key:
+        digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+        return f"cred:{digest}", True
+    subject = _verified_subject(request)
+    if subject:
+        return f"user:{subject}", True
+    return f"ip:{request.client.host if request.client else 'unknown'}", False
+
+
 def add_rate_limiter(app) -> None:
     if os.getenv("ENABLE_RATE_LIMIT", "false").lower() not in {"1", "true", "yes"}:
         return
 
-    capacity, refill_rate = _rate_limit_config()
-    buckets: dict[str, TokenBucket] = {}
-    lock = threading.Lock()
-
-    def get_bucket(key: str) -> TokenBucket:
-        b = buckets.get(key)
-        if b is None:
-            with lock:
-                b = buckets.get(key)
-                if b is None:
-                    b = TokenBucket(capacity, refill_rate)
-                    buckets[key] = b
-        return b
+    limiter = limiter_from_env()
+    app.state.rate_limiter = limiter
 
     @app.middleware("http")
     async def _apply_rate_limit(
@@ -88,25 +383,14 @@ def add_rate_limiter(app) -> None:
         call_next: Callable[[Request], Awaitable[Response]],
     ) -> Response:
         # Never rate-limit metrics endpoint to keep observability reliable
-        try:
-            if request.url.path in ("/metrics", "/csp/report"):
-                return await call_next(request)
-        except Exception:
-            pass
-        # Simple key: remote IP (fall back to 'unknown')
-        client_host = request.client.host if request.client else "unknown"
-        bucket = get_bucket(client_host)
-        allowed = bucket.consume(1.0)
-        # Compute simple header values
-        remaining = int(max(bucket.tokens, 0)) if allowed else 0
-        reset_sec = 1  # coarse estimate; precise reset depends on token math
-        base_headers = {
-            "X-RateLimit-Limit": str(int(bucket.capacity)),
-            "X-RateLimit-Remaining": str(remaining),
-            "X-RateLimit-Reset": str(reset_sec),
-        }
+        path = request.url.path
+        if path in ("/metrics", "/csp/report"):
+            return await call_next(request)
+        client, authenticated = client_identity(request)
+        decision = limiter.hit(client, limiter.policy_for(path, authenticated))
+        base_headers = decision.headers()
 
-        if not allowed:
+        if not decision.allowed:
             # Metrics: record denied
             with contextlib.suppress(Exception):
                 inc_rate_limit_denied("memory")
@@ -116,7 +400,7 @@ def add_rate_limiter(app) -> None:
                     "error": "rate_limited",
                     "detail": "Too many requests; please slow down.",
                 },
-                headers={"Retry-After": str(reset_sec), **base_headers},
+                headers={"Retry-After": str(decision.retry_after), **base_headers},
             )
         resp = await call_next(request)
         # Metrics: record allowed
@@ -11,28 +11,43 @@ Environment variables:
 - RATE_LIMIT_CAPACITY=60          Burst size (bucket capacity).
 - RATE_LIMIT_PER_MINUTE=120       Sustained refill rate.
 - RATE_LIMIT_PREFIX=klerno:rl     Key namespace prefix.
+- RATE_LIMIT_LEASE_SIZE=1         Tokens leased per round-trip (1 = no leasing).
+- RATE_LIMIT_LEASE_TTL=1.0        Seconds a local lease stays usable.
 
-This design avoids per-request round trips beyond a single EVALSHA (or EVAL on
-first use). The Lua script stores a floating token count and last timestamp in
-Unix ms. It refills tokens based on elapsed time and the configured rate.
+Policies (user / per-route) and client keys follow ``app.rate_limit``: only a
+verified API key or session gets its own bucket, everything else is keyed by
+the remote address. Calls go through the
+``redis.asyncio`` client so the event loop never blocks on Redis. Each call
+is a single EVALSHA; the Lua script stores a floating token count and last
+timestamp in Unix ms, refills based on elapsed time and grants up to the
+requested number of whole tokens.
 """
 
 from __future__ import annotations
 
+import asyncio
 import contextlib
+import math
 import os
 import time
+from collections import OrderedDict
+from dataclasses import replace
 from typing import TYPE_CHECKING, Any
 
 from fastapi.responses import JSONResponse, Response
 
+from .rate_limit import (
+    RateLimitDecision,
+    RateLimitPolicy,
+    client_identity,
+    limiter_from_env,
+)
+
 if TYPE_CHECKING:
     from collections.abc import Awaitable, Callable
 
     from fastapi import Request
 
-    from ._typing_shims import IRedisLike
-
 # Optional metrics helpers; import guarded to avoid hard dependency
 try:  # pragma: no cover - import side effects not critical to tests
     from .metrics import inc_rate_limit_allowed, inc_rate_limit_denied
@@ -45,20 +60,22 @@ except Exception:  # pragma: no cover
         return
 
 
-redis: Any | None = None
+redis_asyncio: Any | None = None
 try:  # pragma: no cover - optional dependency
-    import redis as _redis
+    import redis.asyncio as _redis_asyncio
 
-    redis = _redis
+    redis_asyncio = _redis_asyncio
 except Exception:  # pragma: no cover
-    redis = None
+    redis_asyncio = None
 
+# Grants up to ARGV[4] whole tokens (a single request asks for 1, a lease for
+# more) and returns {granted, tokens_left}.
 _LUA_SCRIPT = """
 local key = KEYS[1]
 local capacity = tonumber(ARGV[1])
 local refill_rate = tonumber(ARGV[2]) -- tokens per second
 local now_ms = tonumber(ARGV[3])
-local cost = tonumber(ARGV[4])
+local want = tonumber(ARGV[4])
 
 local data = redis.call('HMGET', key, 'tokens', 'ts')
 local tokens = tonumber(data[1])
@@ -76,37 +93,172 @@ else
     end
   end
 end
-local allowed = 0
-if tokens >= cost then
-  tokens = tokens - cost
-  allowed = 1
+local granted = math.min(want, math.floor(tokens))
+if granted < 0 then
+  granted = 0
 end
-redis.call('HMSET', key, 'tokens', tokens, 'ts', ts)
+tokens = tokens - granted
+redis.call('HSET', key, 'tokens', tokens, 'ts', ts)
 -- set TTL slightly above theoretical full refill time to expire idle buckets
 local ttl = math.ceil(math.max(30, capacity / refill_rate * 2))
 redis.call('EXPIRE', key, ttl)
-return {allowed, tokens}
+return {granted, tostring(tokens)}
 """
 
-_script_sha: str | None = None
 
+class RedisTokenBucket:
+    """Async client for the shared Redis token buckets.
+
+    With ``lease_size`` > 1 each worker takes up to that many tokens per
+    round-trip and serves requests from the local lease until it runs out or
+    is older than ``lease_ttl`` seconds; unused leased tokens are dropped, so
+    a lease can only make the limit stricter, never looser. A client that is
+    denied is not re-checked against Redis until its next token is due.
+    Concurrent refills for the same key share one round-trip.
+
+    Redis errors fail open (availability over strict enforcement).
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        lease_size: int = 1,
+        lease_ttl: float = 1.0,
+        max_local_keys: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.client = client
+        self.lease_size = max(1, int(lease_size))
+        self.lease_ttl = float(lease_ttl)
+        self.max_local_keys = max_local_keys
+        self._clock = clock
+        self._sha: str | None = None
+        # key -> [leased tokens, valid until (monotonic), remote tokens left, denied]
+        self._leases: OrderedDict[str, list[float]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[tuple[int, float]]] = {}
+        self.round_trips = 0
+        self.errors = 0
+
+    async def _run_script(self, key: str, args: list[Any]) -> Any:
+        if self._sha is None:
+            self._sha = await self.client.script_load(_LUA_SCRIPT)
+        try:
+            return await self.client.evalsha(self._sha, 1, key, *args)
+        except Exception as exc:
+            if "NOSCRIPT" not in str(exc).upper():
+                raise
+            # Script cache flushed (restart / failover): load it again
+            self._sha = await self.client.script_load(_LUA_SCRIPT)
+            return await self.client.evalsha(self._sha, 1, key, *args)
+
+    async def _fetch(
+        self, key: str, policy: RateLimitPolicy, want: int
+    ) -> tuple[int, float]:
+        self.round_trips += 1
+        now_ms = int(time.time() * 1000)
+        res = await self._run_script(
+            key, [policy.capacity, policy.rate_per_sec, now_ms, want]
+        )
+        return int(res[0]), float(res[1])
+
+    async def _refill(
+        self, key: str, policy: RateLimitPolicy, want: int
+    ) -> tuple[int, float]:
+        """One lease fetch per key for all concurrent callers.
+
+        The fetch runs as its own task, so a caller that is cancelled (e.g.
+        a client disconnect) does not cancel it, or fail it, for the others.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, policy, want))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._refill_done(key, t))
+        return await asyncio.shield(task)
+
+    def _refill_done(self, key: str, task: asyncio.Future[Any]) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller gave up
+
+    def _take_local(self, key: str, now: float) -> RateLimitDecision | None:
+        lease = self._leases.get(key)
+        if lease is None or lease[1] <= now:
+            return None
+        self._leases.move_to_end(key)
+        if lease[3]:
+            # Cached denial until the next token is due
+            return RateLimitDecision(False, 0, 0, max(1, math.ceil(lease[1] - now)))
+        if lease[0] < 1:
+            return None
+        lease[0] -= 1
+        return RateLimitDecision(True, 0, int(lease[0] + lease[2]), 0)
+
+    def _store_lease(
+        self, key: str, tokens: float, until: float, left: float, denied: bool
+    ) -> None:
+        self._leases[key] = [tokens, until, left, 1.0 if denied else 0.0]
+        self._leases.move_to_end(key)
+        while len(self._leases) > self.max_local_keys:
+            self._leases.popitem(last=False)
+
+    async def acquire(self, key: str, policy: RateLimitPolicy) -> RateLimitDecision:
+        """Take one token for ``key`` under ``policy``."""
+        leasing = self.lease_size > 1
+        while True:
+            now = self._clock()
+            if leasing:
+                local = self._take_local(key, now)
+                if local is not None:
+                    return replace(local, limit=policy.capacity)
+            waiting = leasing and key in self._inflight
+            try:
+                if leasing:
+                    granted, left = await self._refill(key, policy, self.lease_size)
+                else:
+                    granted, left = await self._fetch(key, policy, 1)
+            except Exception:
+                self.errors += 1
+                return RateLimitDecision(True, policy.capacity, policy.capacity, 0)
+            if waiting:
+                # Another request fetched the lease; take from it locally
+                continue
+            if granted < 1:
+                retry = (1 - left) / policy.rate_per_sec if policy.per_minute else 60
+                if leasing:
+                    self._store_lease(key, 0, now + max(retry, 0.001), left, True)
+                return RateLimitDecision(
+                    False, policy.capacity, 0, max(1, math.ceil(retry))
+                )
+            if leasing:
+                self._store_lease(key, granted - 1, now + self.lease_ttl, left, False)
+            return RateLimitDecision(True, policy.capacity, int(granted - 1 + left), 0)
 
-def _redis_client() -> IRedisLike | None:  # pragma: no cover - trivial
+    def stats(self) -> dict[str, Any]:
+        return {
+            "lease_size": self.lease_size,
+            "local_keys": len(self._leases),
+            "round_trips": self.round_trips,
+            "errors": self.errors,
+        }
+
+
+def _redis_client() -> Any | None:  # pragma: no cover - trivial
     url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-    if not redis:
+    if not redis_asyncio:
         return None
     try:
-        return redis.Redis.from_url(url, decode_responses=False)
+        return redis_asyncio.Redis.from_url(url, decode_responses=False)
     except Exception:
         return None
 
 
-def _rate_limit_config() -> tuple[int, float, str]:
-    capacity = int(os.getenv("RATE_LIMIT_CAPACITY", "60"))
-    per_minute = int(os.getenv("RATE_LIMIT_PER_MINUTE", "120"))
-    rate_per_sec = per_minute / 60.0
+def _rate_limit_config() -> tuple[str, int, float]:
     prefix = os.getenv("RATE_LIMIT_PREFIX", "klerno:rl")
-    return capacity, rate_per_sec, prefix
+    lease_size = int(os.getenv("RATE_LIMIT_LEASE_SIZE", "1") or 1)
+    lease_ttl = float(os.getenv("RATE_LIMIT_LEASE_TTL", "1.0") or 1.0)
+    return prefix, lease_size, lease_ttl
 
 
 def add_redis_rate_limiter(app) -> None:
@@ -117,37 +269,11 @@ def add_redis_rate_limiter(app) -> None:
     client = _redis_client()
     if not client:
         return
-    capacity, rate_per_sec, prefix = _rate_limit_config()
-    cost = 1.0
-
-    def _eval_bucket(remote: str) -> tuple[bool, float]:
-        global _script_sha
-        key = f"{prefix}:{remote}"
-        now_ms = int(time.time() * 1000)
-        # Redis-py eval / evalsha expects keys + args lists; we'll keep simple order
-        keys: list[str] = [key]
-        args: list[Any] = [capacity, rate_per_sec, now_ms, cost]
-        try:  # pragma: no cover - network integration
-            if _script_sha is None:
-                _script_sha = client.script_load(_LUA_SCRIPT)
-                res = client.evalsha(_script_sha, len(keys), *keys, *args)
-        except Exception:
-            try:
-                res = client.eval(_LUA_SCRIPT, len(keys), *keys, *args)
-                _script_sha = None
-            except Exception:
-                return True, float(capacity)  # fail-open (do not block traffic)
-        try:
-            allowed_flag = int(res[0]) if res else 0
-        except Exception:
-            return True, float(capacity)  # fail-open on unexpected structure
-        # res[1] is tokens remaining
-        remaining = 0.0
-        try:
-            remaining = float(res[1]) if res and len(res) > 1 else 0.0
-        except Exception:
-            remaining = 0.0
-        return (allowed_flag == 1), remaining
+    prefix, lease_size, lease_ttl = _rate_limit_config()
+    # Policies (default / user / per-route) are shared with the in-memory path
+    policies = limiter_from_env()
+    bucket = RedisTokenBucket(client, lease_size=lease_size, lease_ttl=lease_ttl)
+    app.state.redis_rate_limiter = bucket
 
     @app.middleware("http")
     async def _redis_rate_limit(
@@ -155,21 +281,14 @@ def add_redis_rate_limiter(app) -> None:
         call_next: Callable[[Request], Awaitable[Response]],
     ) -> Response:
         # Never rate-limit metrics endpoint to keep observability reliable
-        try:
-            if request.url.path in ("/metrics", "/csp/report"):
-                return await call_next(request)
-        except Exception:
-            pass
-        remote = request.client.host if request.client else "unknown"
-        allowed, remaining = _eval_bucket(remote)
-        # Coarse reset estimate; precise value would require ts exposure
-        reset_sec = 1
-        base_headers = {
-            "X-RateLimit-Limit": str(int(capacity)),
-            "X-RateLimit-Remaining": str(int(max(remaining, 0))),
-            "X-RateLimit-Reset": str(reset_sec),
-        }
-        if not allowed:
+        path = request.url.path
+        if path in ("/metrics", "/csp/report"):
+            return await call_next(request)
+        client_key, authenticated = client_identity(request)
+        policy = policies.policy_for(path, authenticated)
+        decision = await bucket.acquire(f"{prefix}:{policy.name}:{client_key}", policy)
+        base_headers = decision.headers()
+        if not decision.allowed:
             # Metrics: record denied
             with contextlib.suppress(Exception):
                 inc_rate_limit_denied("redis")
@@ -179,7 +298,7 @@ def add_redis_rate_limiter(app) -> None:
                     "error": "rate_limited",
                     "detail": "Too many requests; please slow down.",
                 },
-                headers={"Retry-After": "1", **base_headers},
+                headers={"Retry-After": str(decision.retry_after), **base_headers},
             )
         resp = await call_next(request)
         # Metrics: record allowed
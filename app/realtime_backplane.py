@@ -0,0 +1,310 @@
+"""Cross-worker pub/sub backplane for realtime delivery.
+
+Each worker process keeps its WebSocket connections in memory, so a
+message for a user, a room or everyone must reach every worker. A
+``Backplane`` carries routing messages between workers:
+
+- ``publish`` hands the message to this worker's subscribers immediately
+  and queues it for the other workers. Queued messages are flushed as one
+  envelope per ``batch_interval`` (or every ``max_batch`` messages), so a
+  burst of alerts costs one PUBLISH instead of one per message. The first
+  ``publish`` starts the background tasks if ``start()`` was never called.
+- Envelopes carry the sending worker's id; a worker ignores its own.
+- ``set_presence`` shares this worker's ``{user_id: connection_count}``.
+  Snapshots are re-sent every ``presence_interval`` and dropped after three
+  missed intervals, so ``presence()`` survives crashed workers.
+
+``RedisBackplane`` uses Redis pub/sub; ``LocalBackplane`` is the in-memory
+stand-in (backplanes sharing a ``LocalHub`` behave like separate workers).
+
+Environment variables:
+- REALTIME_BACKPLANE=local           "redis" to fan out through REDIS_URL.
+- REALTIME_BACKPLANE_CHANNEL=klerno:realtime
+"""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+redis_asyncio: Any | None = None
+try:  # pragma: no cover - optional dependency
+    import redis.asyncio as _redis_asyncio
+
+    redis_asyncio = _redis_asyncio
+except Exception:  # pragma: no cover
+    redis_asyncio = None
+
+Handler = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+class Backplane(abc.ABC):
+    """Local dispatch, batched fan-out to peers and cluster-wide presence.
+
+    Subclasses provide the transport: ``_send`` publishes one encoded
+    envelope and ``_listen`` feeds received envelopes to ``_receive``.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_interval: float = 0.005,
+        max_batch: int = 100,
+        presence_interval: float = 5.0,
+    ) -> None:
+        self.worker_id = uuid.uuid4().hex[:12]
+        self.batch_interval = batch_interval
+        self.max_batch = max_batch
+        self.presence_interval = presence_interval
+        self._handlers: list[Handler] = []
+        self._pending: list[dict[str, Any]] = []
+        self._presence: dict[str, int] = {}
+        self._presence_dirty = False
+        self._remote_presence: dict[str, tuple[float, dict[str, int]]] = {}
+        self._wake = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self.batches_sent = 0
+        self.messages_sent = 0
+        self.batches_received = 0
+
+    # ----- subscribers -----
+
+    def subscribe(self, handler: Handler) -> None:
+        self._handlers.append(handler)
+
+    def unsubscribe(self, handler: Handler) -> None:
+        with contextlib.suppress(ValueError):
+            self._handlers.remove(handler)
+
+    async def _dispatch(self, message: dict[str, Any]) -> None:
+        for handler in list(self._handlers):
+            try:
+                await handler(message)
+            except Exception:
+                logger.exception("Backplane handler failed for %s", message.get("op"))
+
+    # ----- publishing -----
+
+    async def publish(self, message: dict[str, Any]) -> None:
+        """Deliver ``message`` on this worker now and queue it for the others."""
+        await self._dispatch(message)
+        self._pending.append(message)
+        if len(self._pending) >= self.max_batch:
+            await self.flush()
+            return
+        if not self._running():
+            # Processes that never called start() (API, workers, scripts)
+            await self.start()
+        self._wake.set()
+
+    async def flush(self) -> None:
+        """Send queued messages (and changed presence) as one envelope."""
+        batch, self._pending = self._pending, []
+        if self._presence_dirty:
+            self._presence_dirty = False
+            batch.append({"op": "presence", "users": self._presence})
+        if not batch:
+            return
+        envelope = json.dumps(
+            {"origin": self.worker_id, "messages": batch}, default=str
+        )
+        await self._send(envelope)
+        self.batches_sent += 1
+        self.messages_sent += len(batch)
+
+    async def _receive(self, data: str | bytes) -> None:
+        envelope = json.loads(data)
+        origin = envelope.get("origin")
+        if origin == self.worker_id:
+            return
+        self.batches_received += 1
+        for message in envelope.get("messages") or []:
+            if message.get("op") == "presence":
+                self._remote_presence[origin] = (
+                    time.monotonic(),
+                    message.get("users") or {},
+                )
+            else:
+                await self._dispatch(message)
+
+    # ----- presence -----
+
+    def set_presence(self, users: dict[str, int]) -> None:
+        """Replace this worker's ``{user_id: connection_count}`` snapshot."""
+        self._presence = dict(users)
+        self._presence_dirty = True
+        self._wake.set()
+
+    def presence(self) -> dict[str, int]:
+        """Connection counts per user across every live worker."""
+        totals = dict(self._presence)
+        horizon = time.monotonic() - 3 * self.presence_interval
+        for worker, (seen, users) in list(self._remote_presence.items()):
+            if seen < horizon:
+                del self._remote_presence[worker]
+                continue
+            for user_id, count in users.items():
+                totals[user_id] = totals.get(user_id, 0) + count
+        return totals
+
+    # ----- lifecycle -----
+
+    async def _flusher(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.presence_interval)
+            except TimeoutError:
+                self._presence_dirty = True  # periodic refresh for peers
+            self._wake.clear()
+            await asyncio.sleep(self.batch_interval)  # let a batch build up
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Backplane flush failed")
+
+    def _running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    async def start(self) -> None:
+        if self._running():
+            return
+        # A fresh event: the previous one may belong to a closed loop
+        self._wake = asyncio.Event()
+        self._presence_dirty = True
+        self._tasks = [
+            asyncio.create_task(self._flusher()),
+            asyncio.create_task(self._listen()),
+        ]
+
+    async def close(self) -> None:
+        """Withdraw this worker's presence, flush and stop background tasks."""
+        self._presence = {}
+        self._presence_dirty = True
+        with contextlib.suppress(Exception):
+            await self.flush()
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "batches_sent": self.batches_sent,
+            "messages_sent": self.messages_sent,
+            "batches_received": self.batches_received,
+            "pending": len(self._pending),
+            "workers": len(self._remote_presence) + 1,
+        }
+
+    # ----- transport -----
+
+    @abc.abstractmethod
+    async def _send(self, data: str) -> None:
+        """Publish one encoded envelope to the other workers."""
+
+    async def _listen(self) -> None:
+        return None
+
+
+class LocalHub:
+    """In-memory stand-in for a pub/sub server shared by ``LocalBackplane``s."""
+
+    def __init__(self) -> None:
+        self.members: list[LocalBackplane] = []
+
+
+class LocalBackplane(Backplane):
+    """Single-process backplane; peers on the same ``LocalHub`` act as workers."""
+
+    def __init__(self, hub: LocalHub | None = None, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.hub = hub or LocalHub()
+        self.hub.members.append(self)
+
+    async def _send(self, data: str) -> None:
+        for peer in list(self.hub.members):
+            if peer is not self:
+                await peer._receive(data)
+
+    async def close(self) -> None:
+        await super().close()
+        with contextlib.suppress(ValueError):
+            self.hub.members.remove(self)
+
+
+class RedisBackplane(Backplane):
+    """Backplane over one Redis pub/sub channel (``redis.asyncio`` client)."""
+
+    def __init__(
+        self, client: Any, *, channel: str = "klerno:realtime", **kwargs: Any
+    ) -> None:
+        super().__init__(**kwargs)
+        self.client = client
+        self.channel = channel
+
+    async def _send(self, data: str) -> None:
+        await self.client.publish(self.channel, data)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for item in pubsub.listen():
+                    if item.get("type") != "message":
+                        continue
+                    try:
+                        await self._receive(item["data"])
+                    except Exception:
+                        logger.exception("Dropping malformed backplane envelope")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning(
+                    "Backplane subscription lost; reconnecting", exc_info=True
+                )
+                await asyncio.sleep(1.0)
+            finally:
+                with contextlib.suppress(Exception):
+                    await pubsub.unsubscribe(self.channel)
+                    await pubsub.aclose()
+
+
+def backplane_from_env() -> Backplane:
+    """Redis backplane when REALTIME_BACKPLANE=redis and Redis is usable."""
+    if os.getenv("REALTIME_BACKPLANE", "local").lower() == "redis":
+        url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        channel = os.getenv("REALTIME_BACKPLANE_CHANNEL", "klerno:realtime")
+        if redis_asyncio is not None:
+            try:
+                client = redis_asyncio.Redis.from_url(url)
+                return RedisBackplane(client, channel=channel)
+            except Exception:
+                logger.warning(
+                    "Redis backplane unavailable; using local", exc_info=True
+                )
+        else:
+            logger.warning("redis package not installed; using local backplane")
+    return LocalBackplane()
+
+
+_backplane: Backplane | None = None
+
+
+def get_backplane() -> Backplane:
+    """The process-wide backplane (created from the environment on first use)."""
+    global _backplane
+    if _backplane is None:
+        _backplane = backplane_from_env()
+    return _backplane
@@ -186,6 +186,58 @@ async def readiness() -> ReadyResponse | JSONResponse:
     return ReadyResponse(status="ready", db=db_status, uptime_seconds=uptime)
 
 
+@router.get(
+    "/status/db-pool",
+    tags=["operational"],
+    summary="Database connection pool statistics",
+    name="getDbPoolStatus",
+)
+async def db_pool_status() -> dict[str, Any]:
+    """Occupancy and lifetime counters for each DB connection pool."""
+    from .. import store
+
+    return {"pooling_enabled": store._pooling_enabled(), "pools": store.pool_stats()}
+
+
+@router.get(
+    "/status/store-cache",
+    tags=["operational"],
+    summary="Store query cache statistics",
+    name="getStoreCacheStatus",
+)
+async def store_cache_status() -> dict[str, Any]:
+    """Size, hit/miss and eviction counters for the store's query cache."""
+    from .. import store
+
+    return store.cache_stats()
+
+
+@router.get(
+    "/status/principal-cache",
+    tags=["operational"],
+    summary="Authenticated principal cache statistics",
+    name="getPrincipalCacheStatus",
+)
+async def principal_cache_status() -> dict[str, Any]:
+    """Size, hit/miss and eviction counters for current_user's cache."""
+    from ..deps import principal_cache_stats
+
+    return principal_cache_stats()
+
+
+@router.get(
+    "/status/audit-log",
+    tags=["operational"],
+    summary="Audit log writer statistics",
+    name="getAuditLogStatus",
+)
+async def audit_log_status() -> dict[str, Any]:
+    """Queue depth and enqueue/write/drop counters of the audit log writer."""
+    from ..audit_logger import audit_logger
+
+    return audit_logger.stats()
+
+
 @router.get(
     "/favicon.ico",
     tags=["assets"],
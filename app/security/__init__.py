@@ -1,45 +1,188 @@
-"""Security package shims.
+"""API key helpers backed by the in-memory key ring.
 
-Provide a couple of tiny compatibility helpers expected by legacy
-modules (tests and paywall.py import expected_api_key).
+Keys live in ``api_key_ring`` (see ``api_keys``): ENV X_API_KEY / API_KEY
+(comma-separated for old+new during rotation), else data/api_key.secret.
+The ring re-checks the environment and the file's mtime every few seconds,
+so request-time verification does no file I/O. The paywall's opt-in
+PAYWALL_API_KEY is separate (``paywall_api_key``) and never a ring key.
 """
 
+from __future__ import annotations
+
+import contextlib
+import os
+import secrets
+from pathlib import Path
 from typing import Any
 
-from . import encryption  # re-export for convenience
+from dotenv import find_dotenv, load_dotenv
+from fastapi import Header, HTTPException, Request, status
 
-__all__ = ["encryption", "enforce_api_key", "expected_api_key"]
+from . import encryption  # re-export for convenience
+from .api_keys import ApiKeyRing, api_key_ring
+
+__all__ = [
+    "ApiKeyRing",
+    "api_key_matches",
+    "api_key_ring",
+    "encryption",
+    "enforce_api_key",
+    "expected_api_key",
+    "generate_api_key",
+    "paywall_api_key",
+    "preview_api_key",
+    "rotate_api_key",
+]
+
+# --- Load .env robustly (works from OneDrive, nested folders, etc.) ---
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DOTENV_PATH = find_dotenv(usecwd=True) or str(PROJECT_ROOT / ".env")
+
+# Deferred initialization flag
+_env_loaded = False
+
+_META_FILE = api_key_ring.meta_file
+
+# Seconds a rotated-out key keeps working
+API_KEY_ROTATION_GRACE = int(os.getenv("API_KEY_ROTATION_GRACE", "3600") or 3600)
+
+
+def _ensure_env_loaded() -> None:
+    """Load environment from DOTENV_PATH once (deferred to runtime)."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    with contextlib.suppress(Exception):
+        # best-effort; failure to load env is non-fatal here
+        load_dotenv(dotenv_path=DOTENV_PATH, override=False)
+    _env_loaded = True
+
+
+def expected_api_key() -> str:
+    """Primary API key ("" when none is configured).
+
+    Priority: ENV X_API_KEY / API_KEY (first entry when comma-separated),
+    then data/api_key.secret.
+    """
+    _ensure_env_loaded()
+    return api_key_ring.primary()
 
 
-def expected_api_key() -> str | None:
-    """Return an API key expected by older code paths.
+def paywall_api_key() -> str:
+    """Opt-in paywall code from ENV PAYWALL_API_KEY ("" when unset).
 
-    Read from environment variable PAYWALL_API_KEY if set.
+    Kept apart from the API key ring: it unlocks the paywall only and is
+    never an API credential.
     """
-    import os
+    _ensure_env_loaded()
+    return (os.getenv("PAYWALL_API_KEY") or "").strip()
+
+
+def api_key_matches(presented: str | None) -> bool:
+    """Whether ``presented`` is any currently active key (no I/O)."""
+    _ensure_env_loaded()
+    return api_key_ring.matches(presented)
+
+
+def generate_api_key(nbytes: int = 32) -> str:
+    """Create a url-safe API key (admin can rotate)."""
+    return "sk-" + secrets.token_urlsafe(nbytes)
 
-    return os.getenv("PAYWALL_API_KEY")
 
+def api_key_last_updated() -> int | None:
+    if _META_FILE is None:
+        return None
+    try:
+        return int(_META_FILE.read_text(encoding="utf-8").strip())
+    except Exception:
+        return None
 
-def enforce_api_key(header_value: str | None) -> bool:
-    """Simple compatibility helper that verifies an API key header.
 
-    Old tests patch this function when they want to bypass API key checks.
+async def enforce_api_key(
+    request: Request,
+    x_api_key: str | None = Header(default=None),
+) -> bool:
+    """Authorize EITHER:
+      • x-api-key header that matches an active key, OR
+      • a valid session (so the web dashboard works without pasting a key).
+
+    Dev-friendly: if no key is configured at all, allow requests.
     """
-    expected = expected_api_key()
-    if expected is None:
-        # No API key required in test/dev environment
+    from ..audit_logger import AuditEventType, log_api_access, log_security_event
+
+    _ensure_env_loaded()
+
+    # 0) Dev mode: if no key configured, allow.
+    if not api_key_ring.configured():
+        log_api_access(str(request.url.path), request.method, None, False, request)
+        return True
+
+    # 1) Header path for external clients / integrations (current or
+    #    rotated-out key still inside its grace period).
+    if api_key_matches(x_api_key):
+        log_api_access(str(request.url.path), request.method, None, True, request)
+        return True
+
+    # 2) Session fallback for browser dashboard (valid JWT cookie).
+    user = None
+    with contextlib.suppress(Exception):
+        from ..deps import current_user
+
+        user = current_user(request)
+    if user:
+        log_api_access(
+            str(request.url.path),
+            request.method,
+            str(user.get("id")),
+            False,
+            request,
+        )
         return True
-    return header_value == expected
 
+    # 3) Log unauthorized access attempt and deny
+    log_security_event(
+        AuditEventType.API_ACCESS_DENIED,
+        {
+            "endpoint": str(request.url.path),
+            "method": request.method,
+            "has_api_key": bool(x_api_key),
+            "reason": "invalid_credentials",
+        },
+        request,
+    )
 
-def preview_api_key() -> dict[str, Any]:
-    """Return a minimal masked preview for an API key (compat shim).
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Unauthorized: missing or invalid API key / session",
+    )
 
-    Tests and admin endpoints import preview_api_key from app.security; provide
-    a lightweight implementation here that mirrors the behavior of the
-    original module.
+
+def rotate_api_key() -> str:
+    """Admin-only: generate and persist a new API key (file).
+
+    The previous key stays valid for ``API_KEY_ROTATION_GRACE`` seconds.
+    Includes audit logging.
     """
+    from ..audit_logger import AuditEvent, AuditEventType, audit_logger
+
+    key = generate_api_key()
+    previews = api_key_ring.rotate(key, grace_seconds=API_KEY_ROTATION_GRACE)
+
+    # Log the key rotation for security auditing
+    with contextlib.suppress(Exception):
+        audit_logger.log_event(
+            AuditEvent(
+                event_type=AuditEventType.API_KEY_ROTATION,
+                outcome="success",
+                details=previews,
+            ),
+        )
+
+    return key
+
+
+def preview_api_key() -> dict[str, Any]:
+    """Return masked preview + metadata (never the full key)."""
     key = expected_api_key()
     if not key:
         return {"configured": False}
@@ -47,17 +190,6 @@ def preview_api_key() -> dict[str, Any]:
     return {
         "configured": True,
         "preview": preview,
-        "updated_at": None,
-        "source": "env",
+        "updated_at": api_key_last_updated(),
+        "source": api_key_ring.source(),
     }
-
-
-def rotate_api_key() -> str:
-    """Generate and return a new API key string (compat shim).
-
-    This is a lightweight implementation used by admin/test code. It does not
-    persist the key to disk but returns a syntactically valid key.
-    """
-    import secrets
-
-    return "sk-" + secrets.token_urlsafe(32)
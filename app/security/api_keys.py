@@ -0,0 +1,210 @@
+"""In-memory API key ring with cheap change detection.
+
+Keys come from the first non-empty environment variable in ``env_vars``
+(comma-separated; the first entry is the primary key) or, failing that,
+from ``key_file``. The file holds the primary key on its first line and
+previous keys still inside their rotation grace period as
+``<key> <expires_epoch>`` lines below it.
+
+Verification never touches the filesystem: keys are held as SHA-256
+digests in a dict, so a lookup is one hash plus one dict probe whatever
+the number of active keys. The environment and the file's mtime/size are
+re-checked at most every ``refresh_interval`` seconds; ``reload()`` and
+``rotate()`` refresh immediately.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+__all__ = ["ApiKeyRing", "api_key_ring"]
+
+
+def _digest(key: str) -> bytes:
+    return hashlib.sha256(key.encode("utf-8")).digest()
+
+
+def _preview(key: str) -> str:
+    return (key[:4] + "..." + key[-4:]) if len(key) >= 8 else "***"
+
+
+class ApiKeyRing:
+    """Active API keys (primary plus rotated-out keys in their grace period)."""
+
+    def __init__(
+        self,
+        *,
+        env_vars: tuple[str, ...] = ("X_API_KEY", "API_KEY"),
+        key_file: Path | str,
+        meta_file: Path | str | None = None,
+        refresh_interval: float = 5.0,
+    ) -> None:
+        self.env_vars = env_vars
+        self.key_file = Path(key_file)
+        self.meta_file = Path(meta_file) if meta_file else None
+        self.refresh_interval = float(refresh_interval)
+        self._lock = threading.Lock()
+        # digest -> expiry (epoch seconds; inf for keys without one)
+        self._keys: dict[bytes, float] = {}
+        self._primary = ""
+        self._source = "none"
+        self._signature: tuple[Any, ...] | None = None
+        self._next_check = 0.0
+        self._loads = 0
+
+    # -- lookups -------------------------------------------------------------
+
+    def primary(self) -> str:
+        """The key clients should use now ("" when none is configured)."""
+        self._refresh_if_due()
+        return self._primary
+
+    def configured(self) -> bool:
+        self._refresh_if_due()
+        return bool(self._keys)
+
+    def source(self) -> str:
+        """Where the keys came from: "env", "file" or "none"."""
+        self._refresh_if_due()
+        return self._source
+
+    def matches(self, presented: str | None) -> bool:
+        """Whether ``presented`` is an active key (O(1), no I/O)."""
+        if not presented:
+            return False
+        self._refresh_if_due()
+        expires = self._keys.get(_digest(presented.strip()))
+        return expires is not None and expires > time.time()
+
+    def stats(self) -> dict[str, Any]:
+        self._refresh_if_due()
+        now = time.time()
+        return {
+            "source": self._source,
+            "active_keys": sum(1 for exp in self._keys.values() if exp > now),
+            "loads": self._loads,
+        }
+
+    # -- refresh -------------------------------------------------------------
+
+    def _refresh_if_due(self) -> None:
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        with self._lock:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.refresh_interval
+            self._load_locked(force=False)
+
+    def reload(self) -> None:
+        """Re-read the environment and key file now."""
+        with self._lock:
+            self._next_check = time.monotonic() + self.refresh_interval
+            self._load_locked(force=True)
+
+    def _file_signature(self) -> tuple[int, int] | None:
+        try:
+            st = self.key_file.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load_locked(self, *, force: bool) -> None:
+        env = tuple(os.getenv(name) or "" for name in self.env_vars)
+        signature = (env, self._file_signature())
+        if not force and signature == self._signature:
+            return
+        self._signature = signature
+
+        keys: dict[bytes, float] = {}
+        primary, source = "", "none"
+        env_value = next((v.strip() for v in env if v.strip()), "")
+        if env_value:
+            entries = [(k.strip(), math.inf) for k in env_value.split(",")]
+            source = "env"
+        else:
+            entries = self._read_file_entries()
+            source = "file" if entries else "none"
+        for key, expires in entries:
+            if not key:
+                continue
+            if not primary:
+                primary = key
+            digest = _digest(key)
+            keys[digest] = max(expires, keys.get(digest, 0.0))
+        self._keys, self._primary, self._source = keys, primary, source
+        self._loads += 1
+
+    def _read_file_entries(self) -> list[tuple[str, float]]:
+        try:
+            lines = self.key_file.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return []
+        entries: list[tuple[str, float]] = []
+        for i, line in enumerate(ln.strip() for ln in lines):
+            if not line:
+                continue
+            key, _, expires = line.partition(" ")
+            if i == 0 or not expires:
+                entries.append((key, math.inf))
+                continue
+            try:
+                entries.append((key, float(expires)))
+            except ValueError:
+                continue
+        return entries
+
+    # -- rotation ------------------------------------------------------------
+
+    def rotate(self, new_key: str, grace_seconds: float = 3600.0) -> dict[str, str]:
+        """Make ``new_key`` primary in the key file.
+
+        The previous file key (and earlier ones still in their grace period)
+        stay valid for ``grace_seconds`` so clients can switch over. Returns
+        masked previews of the old and new primary keys.
+        """
+        with self._lock:
+            now = time.time()
+            entries = self._read_file_entries()
+            old_primary = entries[0][0] if entries else ""
+            lines = [new_key]
+            if old_primary and grace_seconds > 0:
+                lines.append(f"{old_primary} {int(now + grace_seconds)}")
+            lines += [
+                f"{key} {int(expires)}"
+                for key, expires in entries[1:]
+                if now < expires < math.inf and key not in (new_key, old_primary)
+            ]
+            self.key_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.key_file.with_suffix(".tmp")
+            tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            with contextlib.suppress(OSError):
+                tmp.chmod(0o600)  # best effort hardening
+            tmp.replace(self.key_file)
+            if self.meta_file is not None:
+                self.meta_file.write_text(str(int(now)), encoding="utf-8")
+            self._next_check = time.monotonic() + self.refresh_interval
+            self._load_locked(force=True)
+        return {
+            "old_key_preview": _preview(old_primary) if old_primary else "none",
+            "new_key_preview": _preview(new_key),
+        }
+
+
+_DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+
+# Process-wide ring: X_API_KEY / API_KEY, else data/api_key.secret
+api_key_ring = ApiKeyRing(
+    env_vars=("X_API_KEY", "API_KEY"),
+    key_file=_DATA_DIR / "api_key.secret",
+    meta_file=_DATA_DIR / "api_key.meta",
+    refresh_interval=float(os.getenv("API_KEY_REFRESH_INTERVAL", "5") or 5),
+)
@@ -16,13 +16,15 @@
 # comments with a short rationale to keep Bandit signals actionable.
 
 import contextlib
+import functools
 import json
 import logging
 import os
 import sqlite3
+import threading
 import time
-from collections.abc import Callable, Iterable, Sequence
-from datetime import datetime
+from collections.abc import Callable, Generator, Iterable, Iterator, Sequence
+from datetime import UTC, date, datetime, timedelta
 from pathlib import Path
 from typing import Any, cast
 
@@ -35,11 +37,21 @@ except Exception:  # pragma: no cover
 
 from app._typing_shims import ISyncConnection
 from app.constants import CACHE_TTL
-
-# Simple in-memory cache for frequently accessed data
-# Add explicit type annotations to satisfy static checkers
-_cache: dict[str, Any] = {}
-_cache_expiry: dict[str, float] = {}
+from app.db_pool import (
+    ConnectionPool,
+    PostgresPool,
+    SQLitePool,
+    pool_settings_from_env,
+)
+from app.ttl_cache import TTLCache
+
+# Bounded in-memory cache for frequently accessed data. Entries are tagged
+# (e.g. "wallet:<addr>", "user:<id>") so writes invalidate only what changed.
+_cache = TTLCache(
+    maxsize=int(os.getenv("STORE_CACHE_SIZE", "2048") or 2048),
+    ttl=CACHE_TTL,
+    name="store",
+)
 
 # Typed runtime-only store for password reset tokens used by auth flows/tests.
 # This avoids dynamic attributes on the store module for type checkers.
@@ -68,28 +80,87 @@ def _get_cache_key(*args: Any) -> str:
 
 
 def _get_cached(key: str, ttl: int = CACHE_TTL) -> Any | None:
-    """Get cached value if not expired."""
-    if key in _cache:
-        if time.time() < _cache_expiry.get(key, 0):
-            return _cache[key]
-        # Expired, remove from cache
-        _cache.pop(key, None)
-        _cache_expiry.pop(key, None)
-    return None
+    """Get cached value if not expired (``ttl`` is fixed when the value is set)."""
+    return _cache.get(key)
 
 
-def _set_cache(key: str, value: Any, ttl: int = CACHE_TTL) -> None:
-    """Set cached value with expiry."""
-    _cache[key] = value
-    _cache_expiry[key] = time.time() + ttl
+def _set_cache(
+    key: str,
+    value: Any,
+    ttl: int = CACHE_TTL,
+    tags: Iterable[str] = (),
+) -> None:
+    """Set cached value with expiry and optional invalidation tags."""
+    _cache.set(key, value, ttl=ttl, tags=tags)
 
 
 def _clear_cache_pattern(pattern: str) -> None:
-    """Clear cache entries matching pattern."""
-    keys_to_remove = [k for k in _cache if pattern in k]
-    for key in keys_to_remove:
-        _cache.pop(key, None)
-        _cache_expiry.pop(key, None)
+    """Clear cache entries whose key contains ``pattern``."""
+    _clear_cache_patterns(pattern)
+
+
+def _clear_cache_patterns(*patterns: str) -> None:
+    """Clear cache entries matching any of the patterns in a single scan.
+
+    Prefer tag invalidation (``_cache.invalidate_tags``); this full scan is
+    kept for callers that still think in key substrings.
+    """
+    _cache.invalidate_where(lambda k: any(p in str(k) for p in patterns))
+
+
+def cache_stats() -> dict[str, Any]:
+    """Return size and hit/miss counters for the store cache."""
+    return _cache.stats()
+
+
+def _user_cache_tags(user: Any, email: str | None = None) -> list[str]:
+    """Invalidation tags for a cached user lookup result."""
+    tags = ["users"]
+    if email:
+        tags.append(f"email:{email.lower()}")
+    if isinstance(user, dict):
+        if user.get("id") is not None:
+            tags.append(f"user:{user['id']}")
+        if user.get("email"):
+            tags.append(f"email:{str(user['email']).lower()}")
+    return tags
+
+
+# Called with the tags of every user invalidation so caches outside this
+# module (e.g. app.deps' principal cache) can drop the same users. The
+# "users" tag means every user. Kept across importlib.reload(store) since
+# subscribers register once, at their own import.
+_user_invalidation_hooks: list[Callable[[tuple[str, ...]], None]] = globals().get(
+    "_user_invalidation_hooks", []
+)
+
+
+def add_user_invalidation_hook(hook: Callable[[tuple[str, ...]], None]) -> None:
+    """Register ``hook(tags)`` to run whenever cached users are invalidated."""
+    if hook not in _user_invalidation_hooks:
+        _user_invalidation_hooks.append(hook)
+
+
+def _notify_user_invalidation(tags: tuple[str, ...]) -> None:
+    for hook in list(_user_invalidation_hooks):
+        try:
+            hook(tags)
+        except Exception:
+            logger.warning("store.user_invalidation_hook_failed", exc_info=True)
+
+
+def _invalidate_user(
+    user_id: int | str | None = None,
+    email: str | None = None,
+) -> None:
+    """Drop cached lookups of one user (by id and/or email)."""
+    tags = []
+    if user_id is not None:
+        tags.append(f"user:{user_id}")
+    if email:
+        tags.append(f"email:{email.lower()}")
+    _cache.invalidate_tags(*tags)
+    _notify_user_invalidation(tuple(tags))
 
 
 # --- Config & detection ---
@@ -175,17 +246,22 @@ logger = logging.getLogger(__name__)
 # --- Connection factories -----------------------------------------------------
 
 
-def _sqlite_conn() -> ISyncConnection:
-    # honor DB_PATH and ensure directory exists
-    # Allow DATABASE_URL to override DB path at runtime. Tests may set this.
+def _sqlite_path() -> str:
+    """Return the SQLite file the store should use right now.
+
+    Allow DATABASE_URL to override DB path at runtime. Tests may set this.
+    """
     runtime_db = os.getenv("DATABASE_URL") or ""
     if runtime_db and runtime_db.startswith("sqlite://"):
         path = runtime_db.split("sqlite://", 1)[1].lstrip("/")
-        db_path = path or DB_PATH
-    else:
-        db_path = DB_PATH
+        return path or str(DB_PATH)
+    return str(DB_PATH)
+
 
-    # (no debug prints) ensure we don't leave unused imports behind
+def _sqlite_conn(db_path: str | None = None) -> ISyncConnection:
+    # honor DB_PATH and ensure directory exists
+    if db_path is None:
+        db_path = _sqlite_path()
 
     data_dir = Path(db_path).resolve().parent
     data_dir.mkdir(parents=True, exist_ok=True)
@@ -274,14 +350,109 @@ def _postgres_conn(retries: int | None = None, backoff: float | None = None) ->
     raise RuntimeError(msg)
 
 
+# --- Connection pooling -------------------------------------------------------
+
+# One pool per database target. SQLite pools are keyed by file path because
+# tests repoint DATABASE_URL at runtime; Postgres by DSN.
+_pools: dict[tuple[str, str], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _pooling_enabled() -> bool:
+    return os.getenv("DB_POOL_ENABLED", "true").strip().lower() not in {
+        "0",
+        "false",
+        "no",
+        "off",
+    }
+
+
+def _get_pool() -> ConnectionPool | None:
+    """Return the pool for the active database, creating it on first use.
+
+    Returns None when pooling is disabled or the target cannot be shared
+    (in-memory SQLite databases are private to each connection).
+    """
+    if not _pooling_enabled():
+        return None
+    if USING_POSTGRES:
+        key = ("postgres", DATABASE_URL)
+    else:
+        path = _sqlite_path()
+        if path == ":memory:" or path.startswith("file::memory:"):
+            return None
+        key = ("sqlite", path)
+
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            settings = pool_settings_from_env()
+            if USING_POSTGRES:
+                pool = PostgresPool(_postgres_conn, name="postgres", **settings)
+            else:
+                pool = SQLitePool(
+                    functools.partial(_sqlite_conn, key[1]),
+                    key[1],
+                    name=f"sqlite:{key[1]}",
+                    **settings,
+                )
+            _pools[key] = pool
+    return pool
+
+
+def close_pools() -> None:
+    """Close every pooled connection and forget the pools.
+
+    Called on schema (re)initialization and application shutdown; the next
+    `_conn()` call lazily creates a fresh pool.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        with contextlib.suppress(Exception):
+            pool.close()
+
+
+def pool_stats() -> list[dict[str, Any]]:
+    """Return counters and occupancy for each live connection pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
+
+
 def _conn() -> Any:
     """Return a DB connection:
     - Postgres if DATABASE_URL & psycopg2 are available
     - else SQLite.
+
+    Connections are checked out of a bounded per-database pool; calling
+    ``close()`` on the returned object hands it back for reuse.
     """
+    pool = _get_pool()
+    if pool is not None:
+        return pool.acquire()
     return _postgres_conn() if USING_POSTGRES else _sqlite_conn()
 
 
+@contextlib.contextmanager
+def _connection() -> Iterator[Any]:
+    """Check out a connection and always hand it back, even on errors.
+
+    A pooled connection that is never closed keeps its slot until garbage
+    collection; exception paths must not be allowed to leak them.
+    """
+    con = _conn()
+    try:
+        yield con
+    finally:
+        with contextlib.suppress(Exception):
+            con.close()
+
+
 def _ph() -> str:
     """Return the correct SQL placeholder for the active backend."""
     return "%s" if USING_POSTGRES else "?"
@@ -304,15 +475,10 @@ def wait_for_row(
     start = time.time()
     while True:
         try:
-            con = _conn()
-            cur = con.cursor()
-            cur.execute(select_sql, params)
-            rows = cur.fetchall()
-            # Close only sqlite connections created here; psycopg2 will be handled by driver
-            from contextlib import suppress
-
-            with suppress(Exception):
-                con.close()
+            with _connection() as con:
+                cur = con.cursor()
+                cur.execute(select_sql, params)
+                rows = cur.fetchall()
             if rows:
                 return rows
         except Exception:
@@ -333,17 +499,22 @@ def init_db() -> None:
       - txs           : transactions store
       - users         : auth / accounts
       - user_settings : per - user persisted settings (x_api_key, thresholds, etc.)
+      - tx_rollup_*   : analytics rollups of txs (backfilled on first start)
+      - xrpl_sync_state : per - account XRPL history sync checkpoints
     Also adds helpful indexes.
     """
     # Clear in-memory caches to avoid carrying state between test runs
     try:
         _cache.clear()
-        _cache_expiry.clear()
+        _notify_user_invalidation(("users",))
     except Exception:
         # Ignore cache clearing failures during init (best-effort)
         with contextlib.suppress(Exception):
             _ = None
 
+    # Pooled connections may point at a file that is about to be recreated
+    close_pools()
+
     # If DATABASE_URL points to a sqlite file (used by tests), connect directly
     runtime_db = os.getenv("DATABASE_URL") or ""
     if runtime_db and runtime_db.startswith("sqlite://"):
@@ -436,6 +607,29 @@ def init_db() -> None:
             "CREATE INDEX IF NOT EXISTS idx_txs_timestamp_desc ON txs (timestamp DESC);",
         )
 
+    # ---- ANALYTICS ROLLUPS ----
+    _create_rollup_tables(cur)
+    # First start after the rollup tables appeared: fold in existing rows
+    cur.execute("SELECT 1 FROM tx_rollup_hourly LIMIT 1")
+    if cur.fetchone() is None:
+        cur.execute("SELECT 1 FROM txs LIMIT 1")
+        if cur.fetchone() is not None:
+            _rebuild_rollups(cur)
+
+    # ---- XRPL SYNC CHECKPOINTS ----
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS xrpl_sync_state (
+            account TEXT PRIMARY KEY,
+            last_ledger BIGINT,
+            run_min BIGINT,
+            run_max BIGINT,
+            marker TEXT,
+            tx_count BIGINT NOT NULL DEFAULT 0,
+            updated_at TEXT
+        );""",
+    )
+
     # ---- USERS TABLE ----
     if USING_POSTGRES:
         # users table: role can be 'admin' | 'analyst' | 'viewer'
@@ -775,49 +969,280 @@ def _row_to_user(row: Any | None) -> UserDict | None:
 # --- Transactions API ---------------------------------------------------------
 
 
-def save_tagged(t: dict[str, Any]) -> int:
-    con = _conn()
-    cur = con.cursor()
-    # SQL placeholder for current backend (inline {_ph()} is used)
+_TX_COLUMNS = (
+    "tx_id, timestamp, chain, from_addr, to_addr, amount, symbol, direction, "
+    "memo, fee, category, risk_score, risk_flags, notes"
+)
+
+# Rows per executemany() call inside save_tagged_many's single transaction.
+BULK_INSERT_CHUNK = 1000
+
+
+def normalize_timestamp(value: Any) -> str:
+    """Stored form of a tx timestamp: naive UTC ISO-8601 text.
+
+    ``YYYY-MM-DDTHH:MM:SS[.ffffff]``, so plain text comparisons order rows
+    by time. Aware values are converted to UTC and naive ones taken as UTC;
+    strings go through ``datetime.fromisoformat`` (a space separator, ``Z``
+    or an offset are all accepted). Text that does not parse is kept as is.
+    """
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, date):
+        dt = datetime(value.year, value.month, value.day)
+    else:
+        text = str(value).strip()
+        try:
+            dt = datetime.fromisoformat(text)
+        except ValueError:
+            return text
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(UTC).replace(tzinfo=None)
+    # datetime's own isoformat: pandas Timestamps would add nanoseconds
+    return datetime.isoformat(dt)
+
+
+def normalize_tx_timestamps() -> int:
+    """Rewrite txs timestamps not in `normalize_timestamp` form; return count.
+
+    One-off migration (scripts/normalize_tx_timestamps.py) for rows written
+    before the normalization as ``str(datetime)`` text ("2025-01-01
+    12:00:00+02:00"), which sorts wrongly against ISO bounds. Rollups are
+    rebuilt in the same transaction when any row moved.
+    """
+    with _connection() as con:
+        cur = con.cursor()
+        try:
+            cur.execute(
+                "SELECT id, timestamp FROM txs WHERE timestamp IS NOT NULL AND "
+                "(substr(timestamp, 11, 1) <> 'T' "
+                "OR length(timestamp) NOT IN (19, 26))",
+            )
+            updates = []
+            for row in cur.fetchall():
+                row_id, ts = _safe_idx(row, 0), _safe_idx(row, 1)
+                normalized = normalize_timestamp(ts)
+                if normalized != ts:
+                    updates.append((normalized, row_id))
+            if updates:
+                p = _ph()
+                cur.executemany(
+                    f"UPDATE txs SET timestamp = {p} WHERE id = {p}",
+                    updates,
+                )
+                _rebuild_rollups(cur)
+            con.commit()
+        except Exception:
+            with contextlib.suppress(Exception):
+                con.rollback()
+            raise
+    return len(updates)
+
+
+def _tx_params(t: dict[str, Any]) -> tuple[Any, ...]:
+    """Column values for a txs INSERT, in `_TX_COLUMNS` order."""
+    return (
+        t["tx_id"],
+        normalize_timestamp(t["timestamp"]),
+        t["chain"],
+        t["from_addr"],
+        t["to_addr"],
+        float(t["amount"]),
+        t["symbol"],
+        t["direction"],
+        t.get("memo"),
+        float(t.get("fee") or 0.0),
+        t.get("category", "unknown"),
+        float(t.get("risk_score") or 0.0),
+        json.dumps(t.get("risk_flags", [])),
+        t.get("notes"),
+    )
+
+
+def _insert_tx_sql() -> str:
     # Parameterized query using _ph() placeholders and parameters tuple - safe from SQL injection
-    sql = f"""
-      INSERT INTO txs (
-        tx_id, timestamp, chain, from_addr, to_addr, amount, symbol, direction,
-            memo, fee, category, risk_score, risk_flags, notes
-      )
-        VALUES (
-            {_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()},
-            {_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()}
+    placeholders = ",".join([_ph()] * 14)
+    return f"INSERT INTO txs ({_TX_COLUMNS}) VALUES ({placeholders})"  # nosec: B608 - placeholders used; parameters passed separately
+
+
+# A bulk write touching more wallets than this drops every list_by_wallet
+# entry instead of invalidating wallet by wallet.
+_WALLET_INVALIDATION_LIMIT = 256
+
+
+class _TxWriteSummary:
+    """What a batch of new txs touched, for precise cache invalidation."""
+
+    __slots__ = ("wallets", "all_wallets", "top_risk")
+
+    def __init__(self) -> None:
+        self.wallets: set[str] = set()
+        self.all_wallets = False
+        self.top_risk = 0.0
+
+    def add(self, t: dict[str, Any]) -> None:
+        if not self.all_wallets:
+            for w in (t.get("from_addr"), t.get("to_addr")):
+                if w:
+                    self.wallets.add(str(w))
+            if len(self.wallets) > _WALLET_INVALIDATION_LIMIT:
+                self.all_wallets = True
+                self.wallets.clear()
+        with contextlib.suppress(TypeError, ValueError):
+            self.top_risk = max(self.top_risk, float(t.get("risk_score") or 0))
+
+
+def _invalidate_tx_caches(summary: _TxWriteSummary | None = None) -> None:
+    """Drop cached tx lists that newly written rows could appear in.
+
+    New rows get the highest ids, so only first pages (``before_id`` None)
+    are tagged for invalidation; older keyset pages stay valid. Without a
+    summary every first page is dropped.
+    """
+    if summary is None:
+        _cache.invalidate_tags("txs:head", "txs:wallet", "txs:alerts")
+        return
+    tags = ["txs:head"]
+    if summary.all_wallets:
+        tags.append("txs:wallet")
+    else:
+        tags += [f"wallet:{w}" for w in summary.wallets]
+    for tag in _cache.tags_with_prefix("alerts:"):
+        with contextlib.suppress(ValueError):
+            if float(tag.split(":", 1)[1]) <= summary.top_risk:
+                tags.append(tag)
+    _cache.invalidate_tags(*tags)
+
+
+def save_tagged(t: dict[str, Any]) -> int:
+    params = _tx_params(t)
+    rollups = _RollupDelta()
+    rollups.add(params)
+    with _connection() as con:
+        cur = con.cursor()
+        try:
+            cur.execute(_insert_tx_sql(), params)
+            new_id = cur.lastrowid
+            rollups.flush(cur)
+            con.commit()
+        except Exception:
+            with contextlib.suppress(Exception):
+                con.rollback()
+            raise
+
+    # Invalidate transaction - related caches
+    summary = _TxWriteSummary()
+    summary.add(t)
+    _invalidate_tx_caches(summary)
+    return int(new_id or 0)
+
+
+def save_tagged_many(
+    txs: Iterable[dict[str, Any]],
+    *,
+    before_commit: Callable[[Any], None] | None = None,
+) -> int:
+    """Insert many tagged transactions in one transaction; return the count.
+
+    Rows are written with executemany in chunks of `BULK_INSERT_CHUNK` (or via
+    COPY when psycopg3 is driving Postgres), committed once, and the
+    transaction caches are invalidated once at the end. The analytics
+    rollups are updated in the same transaction, one upsert per touched
+    bucket. Either every row is stored or, on error, none are.
+
+    `before_commit(cursor)` runs inside the same transaction just before the
+    commit, so callers can record progress atomically with the rows.
+    """
+    count = 0
+    summary = _TxWriteSummary()
+    rollups = _RollupDelta()
+    with _connection() as con:
+        cur = con.cursor()
+        try:
+            if USING_POSTGRES and PSYCOPG_LIBRARY == "psycopg":
+                with cur.copy(f"COPY txs ({_TX_COLUMNS}) FROM STDIN") as copy:
+                    for t in txs:
+                        params = _tx_params(t)
+                        copy.write_row(params)
+                        rollups.add(params)
+                        summary.add(t)
+                        count += 1
+            else:
+                sql = _insert_tx_sql()
+                chunk: list[tuple[Any, ...]] = []
+                for t in txs:
+                    params = _tx_params(t)
+                    chunk.append(params)
+                    rollups.add(params)
+                    summary.add(t)
+                    if len(chunk) >= BULK_INSERT_CHUNK:
+                        cur.executemany(sql, chunk)
+                        count += len(chunk)
+                        chunk = []
+                if chunk:
+                    cur.executemany(sql, chunk)
+                    count += len(chunk)
+            rollups.flush(cur)
+            if before_commit is not None:
+                before_commit(cur)
+            con.commit()
+        except Exception:
+            with contextlib.suppress(Exception):
+                con.rollback()
+            raise
+
+    if count:
+        _invalidate_tx_caches(summary)
+    return count
+
+
+# ---------- XRPL sync checkpoints ----------
+
+_XRPL_SYNC_COLUMNS = ("last_ledger", "run_min", "run_max", "marker", "tx_count")
+
+
+def get_xrpl_sync_state(account: str) -> dict[str, Any] | None:
+    """Checkpoint of the XRPL history sync for `account` (None if never run)."""
+    with _connection() as con:
+        cur = con.cursor()
+        cur.execute(
+            f"SELECT account, {', '.join(_XRPL_SYNC_COLUMNS)}, updated_at "  # nosec: B608 - fixed column list
+            f"FROM xrpl_sync_state WHERE account = {_ph()}",
+            (account,),
         )
-    """  # nosec: B608 - placeholders used; parameters passed separately
+        row = cur.fetchone()
+    return _row_as_dict(row) if row else None
+
+
+def _upsert_xrpl_sync_state(cur: Any, account: str, state: dict[str, Any]) -> None:
+    cols = ", ".join(_XRPL_SYNC_COLUMNS)
+    updates = ", ".join(
+        f"{c} = excluded.{c}" for c in (*_XRPL_SYNC_COLUMNS, "updated_at")
+    )
+    placeholders = ",".join([_ph()] * (len(_XRPL_SYNC_COLUMNS) + 2))
     cur.execute(
-        sql,
+        f"INSERT INTO xrpl_sync_state (account, {cols}, updated_at) "  # nosec: B608 - fixed column list
+        f"VALUES ({placeholders}) ON CONFLICT (account) DO UPDATE SET {updates}",
         (
-            t["tx_id"],
-            str(t["timestamp"]),
-            t["chain"],
-            t["from_addr"],
-            t["to_addr"],
-            float(t["amount"]),
-            t["symbol"],
-            t["direction"],
-            t.get("memo"),
-            float(t.get("fee") or 0.0),
-            t.get("category", "unknown"),
-            float(t.get("risk_score") or 0.0),
-            json.dumps(t.get("risk_flags", [])),
-            t.get("notes"),
+            account,
+            *(state.get(c) for c in _XRPL_SYNC_COLUMNS),
+            datetime.now(UTC).isoformat(),
         ),
     )
-    con.commit()
-    new_id = cur.lastrowid
-    con.close()
 
-    # Invalidate transaction - related caches
-    _clear_cache_pattern("list_all")
-    _clear_cache_pattern("list_by_wallet")
-    _clear_cache_pattern("list_alerts")
-    return int(new_id or 0)
+
+def save_xrpl_sync_page(
+    account: str, txs: Iterable[dict[str, Any]], state: dict[str, Any]
+) -> int:
+    """Store one page of synced transactions and advance the account checkpoint.
+
+    Both happen in one DB transaction, so an interrupted sync resumes exactly
+    after the last stored page without duplicating or skipping rows.
+    """
+    return save_tagged_many(
+        txs,
+        before_commit=lambda cur: _upsert_xrpl_sync_state(cur, account, state),
+    )
 
 
 def get_by_id(tx_id: int) -> dict[str, Any] | None:
@@ -846,87 +1271,687 @@ def get_by_id(tx_id: int) -> dict[str, Any] | None:
         return None
 
 
-def list_by_wallet(wallet: str, limit: int = 100) -> list[dict[str, Any]]:
-    con = _conn()
-    cur = con.cursor()
-    # placeholder not needed; using inline {_ph()} in query
-    # Parameterized query using internal {_ph()} placeholder function and a
-    # separate parameters tuple. This is safe against SQL injection.
-    # Parameterized SELECT by wallet, safe: placeholders used in parameters tuple
+# Rows fetched per round trip when streaming transactions out of the DB
+STREAM_BATCH_SIZE = 500
+
+_TX_SELECT_COLUMNS = """
+                tx_id, timestamp, chain, from_addr, to_addr, amount, symbol, direction,
+                memo, fee, category, risk_score, risk_flags, notes"""
+
+
+def _tx_query(
+    *,
+    wallet: str | None = None,
+    min_risk: float | None = None,
+    before_id: int | None = None,
+    since: str | None = None,
+    limit: int | None = None,
+    with_id: bool = False,
+) -> tuple[str, tuple[Any, ...]]:
+    """Build a newest-first SELECT over txs with keyset (``id < ?``) paging.
+
+    Only fixed column names and ``_ph()`` placeholders are interpolated;
+    every value travels in the returned parameters tuple.
+    """
+    clauses: list[str] = []
+    params: list[Any] = []
+    if wallet is not None:
+        clauses.append(f"(from_addr={_ph()} OR to_addr={_ph()})")
+        params += [wallet, wallet]
+    if min_risk is not None:
+        clauses.append(f"risk_score >= {_ph()}")
+        params.append(min_risk)
+    if before_id is not None:
+        clauses.append(f"id < {_ph()}")
+        params.append(int(before_id))
+    if since is not None:
+        clauses.append(f"timestamp >= {_ph()}")
+        params.append(normalize_timestamp(since))
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    columns = ("id," if with_id else "") + _TX_SELECT_COLUMNS
     sql = f"""
-        SELECT
-            tx_id, timestamp, chain, from_addr, to_addr, amount, symbol, direction,
-            memo, fee, category, risk_score, risk_flags, notes
-        FROM txs
-        WHERE from_addr={_ph()} OR to_addr={_ph()}
-        ORDER BY id DESC
-        LIMIT {_ph()}
+            SELECT {columns}
+            FROM txs
+            {where}
+            ORDER BY id DESC
     """  # nosec: B608 - parameterized placeholders used
-    cur.execute(
-        sql,
-        (wallet, wallet, limit),
-    )  # nosec: B608 - parameterized placeholders used
-    rows = cur.fetchall()
-    con.close()
+    if limit is not None:
+        sql += f" LIMIT {_ph()}"
+        params.append(int(limit))
+    return sql, tuple(params)
+
+
+def _select_txs(sql: str, params: tuple[Any, ...]) -> list[dict[str, Any]]:
+    with _connection() as con:
+        cur = con.cursor()
+        cur.execute(sql, params)  # nosec: B608 - parameterized placeholders used
+        rows = cur.fetchall()
     return _rows_to_dicts(rows)
 
 
-def list_alerts(threshold: float = 0.75, limit: int = 100) -> list[dict[str, Any]]:
-    con = _conn()
-    cur = con.cursor()
-    # placeholder not needed; using inline {_ph()} in query
-    # Parameterized query using internal {_ph()} placeholder function and a
-    # separate parameters tuple. This is safe against SQL injection.
-    # Parameterized SELECT by risk threshold - placeholders used
-    sql = f"""
-        SELECT
-            tx_id, timestamp, chain, from_addr, to_addr, amount, symbol, direction,
-            memo, fee, category, risk_score, risk_flags, notes
-        FROM txs
-        WHERE risk_score >= {_ph()}
-        ORDER BY id DESC
-        LIMIT {_ph()}
-    """  # nosec: B608 - parameterized placeholders used
+def iter_txs(
+    *,
+    wallet: str | None = None,
+    min_risk: float | None = None,
+    before_id: int | None = None,
+    since: str | None = None,
+    limit: int | None = None,
+    batch_size: int = STREAM_BATCH_SIZE,
+) -> Generator[dict[str, Any], None, None]:
+    """Yield transactions newest first without materializing the result.
+
+    Rows are pulled with ``fetchmany(batch_size)`` (a server-side cursor on
+    Postgres) and include the primary key ``id`` so callers can resume with
+    ``before_id``. ``since`` (anything `normalize_timestamp` accepts) keeps
+    rows at or after it. The connection stays checked out until the
+    generator is exhausted or closed.
+    """
+    sql, params = _tx_query(
+        wallet=wallet,
+        min_risk=min_risk,
+        before_id=before_id,
+        since=since,
+        limit=limit,
+        with_id=True,
+    )
+    with _connection() as con:
+        if USING_POSTGRES:
+            cur = con.cursor(name="klerno_iter_txs")
+            cur.itersize = batch_size
+        else:
+            cur = con.cursor()
+        cur.execute(sql, params)  # nosec: B608 - parameterized placeholders used
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from _rows_to_dicts(rows)
+
+
+def window_aggregates(
+    since: str,
+    low_risk: float,
+    medium_risk: float,
+) -> dict[str, Any]:
+    """Aggregate txs with ``timestamp >= since`` in SQL.
+
+    ``since`` is anything `normalize_timestamp` accepts; timestamps are
+    stored in that form, so the range predicate is exact and served by
+    ``idx_txs_timestamp``. Risk scores below ``low_risk`` are low, below
+    ``medium_risk`` medium, otherwise high; NULL risk scores and amounts count as 0. Returns ``totals``,
+    ``categories`` (category -> count), ``hourly`` and ``daily`` rows.
+    """
+    since = normalize_timestamp(since)
+    p = _ph()
+    risk = "COALESCE(risk_score, 0)"
+    amount = "COALESCE(amount, 0)"
+    window = f"FROM txs WHERE timestamp >= {p}"
+    totals_sql = f"""
+        SELECT COUNT(*) AS n,
+               SUM({amount}) AS volume,
+               AVG({risk}) AS avg_risk,
+               SUM(CASE WHEN {risk} >= {p} THEN 1 ELSE 0 END) AS high,
+               SUM(CASE WHEN {risk} >= {p} AND {risk} < {p} THEN 1 ELSE 0 END)
+                   AS medium,
+               SUM(CASE WHEN {risk} < {p} THEN 1 ELSE 0 END) AS low
+        {window}
+    """  # nosec: B608 - fixed SQL fragments; values passed as parameters
+    categories_sql = f"""
+        SELECT COALESCE(category, 'unknown') AS category, COUNT(*) AS n
+        {window}
+        GROUP BY COALESCE(category, 'unknown')
+        ORDER BY n DESC
+    """  # nosec: B608 - fixed SQL fragments; values passed as parameters
+    # ISO text: characters 12-13 hold the hour, 1-10 the calendar date.
+    hourly_sql = f"""
+        SELECT substr(timestamp, 12, 2) AS hour, COUNT(*) AS n,
+               SUM({amount}) AS volume, AVG({risk}) AS avg_risk
+        {window}
+        GROUP BY substr(timestamp, 12, 2)
+    """  # nosec: B608 - fixed SQL fragments; values passed as parameters
+    daily_sql = f"""
+        SELECT substr(timestamp, 1, 10) AS day, COUNT(*) AS n,
+               SUM({amount}) AS volume, AVG({risk}) AS avg_risk,
+               MAX({risk}) AS max_risk
+        {window}
+        GROUP BY substr(timestamp, 1, 10)
+        ORDER BY day
+    """  # nosec: B608 - fixed SQL fragments; values passed as parameters
+
+    def _rows(cur: Any, sql: str, params: tuple[Any, ...]) -> list[dict[str, Any]]:
+        cur.execute(sql, params)  # nosec: B608 - parameterized placeholders used
+        names = [d[0] for d in cur.description]
+        return [
+            dict(r) if isinstance(r, dict) else dict(zip(names, tuple(r), strict=True))
+            for r in cur.fetchall()
+        ]
+
+    with _connection() as con:
+        cur = con.cursor()
+        totals = _rows(
+            cur,
+            totals_sql,
+            (medium_risk, low_risk, medium_risk, low_risk, since),
+        )[0]
+        categories = _rows(cur, categories_sql, (since,))
+        hourly = _rows(cur, hourly_sql, (since,))
+        daily = _rows(cur, daily_sql, (since,))
+
+    return {
+        "totals": totals,
+        "categories": {str(r["category"]): int(r["n"]) for r in categories},
+        "hourly": hourly,
+        "daily": daily,
+    }
+
+
+# --- Analytics rollups --------------------------------------------------------
+#
+# Pre-aggregated views of txs kept in step with every write made through
+# save_tagged / save_tagged_many (same transaction), so dashboards read
+# O(buckets) rows instead of scanning the window:
+#   tx_rollup_hourly        : per hour x category x risk bucket
+#   tx_rollup_address_daily : per day x address (either side of a tx)
+#   tx_rollup_edge_daily    : per day x distinct sender -> receiver edge
+# Daily category/risk figures group the hourly table. Rows written by other
+# means (raw SQL, other services) are picked up by backfill_rollups().
+
+# Risk bucket boundaries baked into tx_rollup_hourly; they match
+# AdvancedAnalytics' default thresholds.
+ROLLUP_RISK_LOW = 0.33
+ROLLUP_RISK_MEDIUM = 0.66
+
+# table -> (key columns, additive columns, max columns)
+_ROLLUPS: dict[str, tuple[tuple[str, ...], tuple[str, ...], tuple[str, ...]]] = {
+    "tx_rollup_hourly": (
+        ("hour", "category", "risk_bucket"),
+        ("n", "volume", "volume_sq", "risk_sum"),
+        ("risk_max",),
+    ),
+    "tx_rollup_address_daily": (
+        ("day", "address"),
+        ("n", "volume", "risk_sum"),
+        ("risk_max",),
+    ),
+    "tx_rollup_edge_daily": (("day", "from_addr", "to_addr"), ("n",), ()),
+}
+
+# Bucket keys derived from the stored ISO text: "YYYY-MM-DDTHH" and
+# "YYYY-MM-DD". A space separator ("2025-01-01 12:00") maps to the same hour.
+_HOUR_EXPR = "substr(timestamp, 1, 10) || 'T' || substr(timestamp, 12, 2)"
+_DAY_EXPR = "substr(timestamp, 1, 10)"
+_RISK_EXPR = "COALESCE(risk_score, 0)"
+_AMOUNT_EXPR = "COALESCE(amount, 0)"
+
+
+def _rollup_hour(ts: str) -> str:
+    """Python twin of ``_HOUR_EXPR``."""
+    return f"{ts[:10]}T{ts[11:13]}"
+
+
+def _risk_bucket(risk: float) -> str:
+    if risk >= ROLLUP_RISK_MEDIUM:
+        return "high"
+    if risk >= ROLLUP_RISK_LOW:
+        return "medium"
+    return "low"
+
+
+def _create_rollup_tables(cur: Any) -> None:
+    real = "DOUBLE PRECISION" if USING_POSTGRES else "REAL"
+    for table, (keys, sums, maxes) in _ROLLUPS.items():
+        columns = [f"{k} TEXT NOT NULL" for k in keys]
+        columns += [f"{c} {'BIGINT' if c == 'n' else real} NOT NULL" for c in sums]
+        columns += [f"{c} {real} NOT NULL" for c in maxes]
+        cur.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            f"{', '.join(columns)}, PRIMARY KEY ({', '.join(keys)}));",
+        )  # nosec: B608 - table and column names are internal constants
     cur.execute(
-        sql,
-        (threshold, limit),
-    )  # nosec: B608 - parameterized placeholders used
-    rows = cur.fetchall()
-    con.close()
-    return _rows_to_dicts(rows)
+        "CREATE INDEX IF NOT EXISTS idx_tx_rollup_address_daily_address "
+        "ON tx_rollup_address_daily (address);",
+    )
 
 
-def list_all(limit: int = 1000) -> list[dict[str, Any]]:
-    # Check cache first
-    cache_key = _get_cache_key("list_all", limit)
-    cached_result = _get_cached(cache_key, ttl=60)  # Cache for 1 minute
-    if cached_result is not None:
-        return cached_result
+@functools.cache
+def _rollup_upsert_sql(table: str, postgres: bool) -> str:
+    keys, sums, maxes = _ROLLUPS[table]
+    columns = (*keys, *sums, *maxes)
+    greatest = "GREATEST" if postgres else "MAX"
+    updates = [f"{c} = {table}.{c} + excluded.{c}" for c in sums]
+    updates += [f"{c} = {greatest}({table}.{c}, excluded.{c})" for c in maxes]
+    placeholders = ",".join(["%s" if postgres else "?"] * len(columns))
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+        f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {', '.join(updates)}"
+    )  # nosec: B608 - internal identifiers only; values passed as parameters
+
+
+def _accumulate(
+    acc: dict[tuple[str, ...], list[float]],
+    key: tuple[str, ...],
+    sums: tuple[float, ...],
+    maxes: tuple[float, ...] = (),
+) -> None:
+    current = acc.get(key)
+    if current is None:
+        acc[key] = [*sums, *maxes]
+        return
+    for i, v in enumerate(sums):
+        current[i] += v
+    for i, v in enumerate(maxes, len(sums)):
+        current[i] = max(current[i], v)
 
-    con = _conn()
-    cur = con.cursor()
-    # placeholder not needed; using inline {_ph()} in query
-    # Parameterized query using internal {_ph()} placeholder function and a
-    # separate parameters tuple. This is safe against SQL injection.
-    # Parameterized SELECT all txs with limit
-    sql = f"""
-        SELECT
-            tx_id, timestamp, chain, from_addr, to_addr, amount, symbol, direction,
-            memo, fee, category, risk_score, risk_flags, notes
+
+class _RollupDelta:
+    """Rollup increments for a batch of new txs, merged per bucket key."""
+
+    __slots__ = ("tables",)
+
+    def __init__(self) -> None:
+        self.tables: dict[str, dict[tuple[str, ...], list[float]]] = {
+            table: {} for table in _ROLLUPS
+        }
+
+    def add(self, params: tuple[Any, ...]) -> None:
+        """Fold in one row given as its `_tx_params` tuple (stored values)."""
+        ts = str(params[1])
+        day = ts[:10]
+        from_addr, to_addr, amount = params[3], params[4], params[5]
+        category = params[10] if params[10] is not None else "unknown"
+        risk = params[11]
+        _accumulate(
+            self.tables["tx_rollup_hourly"],
+            (_rollup_hour(ts), str(category), _risk_bucket(risk)),
+            (1, amount, amount * amount, risk),
+            (risk,),
+        )
+        addresses = self.tables["tx_rollup_address_daily"]
+        for addr in (from_addr, to_addr):
+            if addr:
+                _accumulate(addresses, (day, str(addr)), (1, amount, risk), (risk,))
+        if from_addr and to_addr:
+            _accumulate(
+                self.tables["tx_rollup_edge_daily"],
+                (day, str(from_addr), str(to_addr)),
+                (1,),
+            )
+
+    def flush(self, cur: Any) -> None:
+        """Upsert the merged increments through ``cur`` (caller commits).
+
+        Keys go out sorted so concurrent writers lock shared bucket rows in
+        the same order and cannot deadlock each other on Postgres.
+        """
+        for table, acc in self.tables.items():
+            if acc:
+                cur.executemany(
+                    _rollup_upsert_sql(table, USING_POSTGRES),
+                    [(*key, *values) for key, values in sorted(acc.items())],
+                )
+            acc.clear()
+
+
+def _hourly_source_sql(where: str) -> str:
+    """txs grouped into tx_rollup_hourly rows (2 risk params, then ``where``)."""
+    p = _ph()
+    return f"""
+        SELECT hour, category, risk_bucket, COUNT(*) AS n, SUM(amount) AS volume,
+               SUM(amount * amount) AS volume_sq, SUM(risk) AS risk_sum,
+               MAX(risk) AS risk_max
+        FROM (
+            SELECT {_HOUR_EXPR} AS hour,
+                   COALESCE(category, 'unknown') AS category,
+                   CASE WHEN {_RISK_EXPR} >= {p} THEN 'high'
+                        WHEN {_RISK_EXPR} >= {p} THEN 'medium'
+                        ELSE 'low' END AS risk_bucket,
+                   {_AMOUNT_EXPR} AS amount, {_RISK_EXPR} AS risk
+            FROM txs WHERE {where}
+        ) AS src
+        GROUP BY hour, category, risk_bucket
+    """  # nosec: B608 - fixed SQL fragments; values passed as parameters
+
+
+def _address_source_sql(where: str) -> str:
+    """txs grouped into tx_rollup_address_daily rows (``where`` applied twice)."""
+    sides = " UNION ALL ".join(
+        f"""
+            SELECT {_DAY_EXPR} AS day, {side} AS address,
+                   {_AMOUNT_EXPR} AS amount, {_RISK_EXPR} AS risk
+            FROM txs WHERE {where} AND {side} IS NOT NULL AND {side} <> ''"""
+        for side in ("from_addr", "to_addr")
+    )
+    return f"""
+        SELECT day, address, COUNT(*) AS n, SUM(amount) AS volume,
+               SUM(risk) AS risk_sum, MAX(risk) AS risk_max
+        FROM ({sides}) AS src
+        GROUP BY day, address
+    """  # nosec: B608 - fixed SQL fragments; values passed as parameters
+
+
+def _edge_source_sql(where: str) -> str:
+    """txs grouped into tx_rollup_edge_daily rows."""
+    return f"""
+        SELECT {_DAY_EXPR} AS day, from_addr, to_addr, COUNT(*) AS n
         FROM txs
-        ORDER BY id DESC
-        LIMIT {_ph()}
-    """  # nosec: B608 - parameterized placeholders used
-    cur.execute(sql, (limit,))  # nosec: B608 - parameterized placeholders used
-    rows = cur.fetchall()
-    con.close()
-    result = _rows_to_dicts(rows)
+        WHERE {where} AND from_addr IS NOT NULL AND from_addr <> ''
+              AND to_addr IS NOT NULL AND to_addr <> ''
+        GROUP BY {_DAY_EXPR}, from_addr, to_addr
+    """  # nosec: B608 - fixed SQL fragments; values passed as parameters
+
+
+def _rebuild_rollups(cur: Any) -> None:
+    """Recompute every rollup table from txs through ``cur``."""
+    risk = (ROLLUP_RISK_MEDIUM, ROLLUP_RISK_LOW)
+    sources = {
+        "tx_rollup_hourly": (_hourly_source_sql, risk),
+        "tx_rollup_address_daily": (_address_source_sql, ()),
+        "tx_rollup_edge_daily": (_edge_source_sql, ()),
+    }
+    for table, (source, params) in sources.items():
+        keys, sums, maxes = _ROLLUPS[table]
+        columns = ", ".join((*keys, *sums, *maxes))
+        cur.execute(f"DELETE FROM {table}")  # nosec: B608 - internal table name
+        cur.execute(
+            f"INSERT INTO {table} ({columns}) {source('timestamp IS NOT NULL')}",
+            params,
+        )  # nosec: B608 - internal identifiers only; values passed as parameters
 
-    # Cache the result
-    _set_cache(cache_key, result, ttl=60)
+
+def backfill_rollups() -> int:
+    """Rebuild the analytics rollups from txs; return the rows folded in.
+
+    Runs in one transaction, so readers see either the old or the new
+    rollups. Needed once for rows that predate the rollup tables and after
+    txs is changed behind this module's back.
+    """
+    with _connection() as con:
+        cur = con.cursor()
+        try:
+            _rebuild_rollups(cur)
+            cur.execute("SELECT COUNT(*) FROM txs WHERE timestamp IS NOT NULL")
+            count = int(_safe_idx(cur.fetchone(), 0) or 0)
+            con.commit()
+        except Exception:
+            with contextlib.suppress(Exception):
+                con.rollback()
+            raise
+    return count
+
+
+def _rollup_boundary(since: str, *, daily: bool) -> tuple[str, str]:
+    """First whole bucket at or after ``since``: (bucket key, ISO timestamp).
+
+    Rows in [since, timestamp) are read raw; whole buckets from the key on
+    come from the rollup table. ``since`` must already be normalized.
+    """
+    start = datetime.fromisoformat(since)
+    if daily:
+        floor = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        step = timedelta(days=1)
+    else:
+        floor = start.replace(minute=0, second=0, microsecond=0)
+        step = timedelta(hours=1)
+    boundary = floor if floor == start else floor + step
+    ts = boundary.isoformat()
+    return (ts[:10] if daily else _rollup_hour(ts)), ts
+
+
+def _fetch_dicts(cur: Any, sql: str, params: tuple[Any, ...]) -> list[dict[str, Any]]:
+    cur.execute(sql, params)  # nosec: B608 - parameterized placeholders used
+    names = [d[0] for d in cur.description]
+    return [
+        dict(r) if isinstance(r, dict) else dict(zip(names, tuple(r), strict=True))
+        for r in cur.fetchall()
+    ]
+
+
+def rollup_aggregates(since: str) -> dict[str, Any]:
+    """``window_aggregates`` for the rollup risk buckets, read from rollups.
+
+    Whole hours come from tx_rollup_hourly and the partial first hour from
+    txs, so the result covers exactly ``timestamp >= since`` (any form
+    `normalize_timestamp` accepts). Totals also carry ``volume_sq`` (sum of
+    squared amounts) for variance.
+    """
+    since = normalize_timestamp(since)
+    p = _ph()
+    bucket, boundary = _rollup_boundary(since, daily=False)
+    sql = f"""
+        SELECT hour, risk_bucket, category, SUM(n) AS n, SUM(volume) AS volume,
+               SUM(volume_sq) AS volume_sq, SUM(risk_sum) AS risk_sum,
+               MAX(risk_max) AS risk_max
+        FROM (
+            SELECT hour, category, risk_bucket, n, volume, volume_sq, risk_sum,
+                   risk_max
+            FROM tx_rollup_hourly WHERE hour >= {p}
+            UNION ALL
+            {_hourly_source_sql(f"timestamp >= {p} AND timestamp < {p}")}
+        ) AS r
+        GROUP BY hour, risk_bucket, category
+    """  # nosec: B608 - fixed SQL fragments; values passed as parameters
+    params = (bucket, ROLLUP_RISK_MEDIUM, ROLLUP_RISK_LOW, since, boundary)
+    with _connection() as con:
+        rows = _fetch_dicts(con.cursor(), sql, params)
+
+    totals: dict[str, Any] = {"n": 0, "volume": 0.0, "volume_sq": 0.0}
+    totals.update({"risk_sum": 0.0, "high": 0, "medium": 0, "low": 0})
+    categories: dict[str, int] = {}
+    hourly: dict[tuple[str, ...], list[float]] = {}
+    daily: dict[tuple[str, ...], list[float]] = {}
+    for r in rows:
+        n, volume, risk_sum = int(r["n"]), float(r["volume"]), float(r["risk_sum"])
+        totals["n"] += n
+        totals["volume"] += volume
+        totals["volume_sq"] += float(r["volume_sq"])
+        totals["risk_sum"] += risk_sum
+        totals[str(r["risk_bucket"])] += n
+        category = str(r["category"])
+        categories[category] = categories.get(category, 0) + n
+        hour = str(r["hour"])
+        _accumulate(hourly, (hour[11:13],), (n, volume, risk_sum))
+        _accumulate(daily, (hour[:10],), (n, volume, risk_sum), (float(r["risk_max"]),))
+
+    count = totals["n"]
+    totals["avg_risk"] = totals.pop("risk_sum") / count if count else None
+    return {
+        "totals": totals,
+        "categories": dict(
+            sorted(categories.items(), key=lambda kv: kv[1], reverse=True),
+        ),
+        "hourly": [
+            {"hour": h, "n": int(n), "volume": v, "avg_risk": s / n}
+            for (h,), (n, v, s) in hourly.items()
+        ],
+        "daily": [
+            {"day": d, "n": int(n), "volume": v, "avg_risk": s / n, "max_risk": m}
+            for (d,), (n, v, s, m) in sorted(daily.items())
+        ],
+    }
+
+
+def rollup_address_stats(since: str, limit: int = 10) -> dict[str, Any]:
+    """Distinct address count and the ``limit`` riskiest addresses.
+
+    Reads tx_rollup_address_daily for whole days plus raw txs for the
+    partial first day. Addresses rank by average risk, then address.
+    """
+    since = normalize_timestamp(since)
+    p = _ph()
+    day, boundary = _rollup_boundary(since, daily=True)
+    source = f"""
+        SELECT address, n, volume, risk_sum, risk_max
+        FROM tx_rollup_address_daily WHERE day >= {p}
+        UNION ALL
+        SELECT address, n, volume, risk_sum, risk_max FROM (
+            {_address_source_sql(f"timestamp >= {p} AND timestamp < {p}")}
+        ) AS head
+    """  # nosec: B608 - fixed SQL fragments; values passed as parameters
+    params = (day, since, boundary, since, boundary)
+    unique_sql = f"""
+        SELECT COUNT(DISTINCT address) AS n FROM ({source}) AS a
+    """  # nosec: B608 - fixed SQL fragments; values passed as parameters
+    top_sql = f"""
+        SELECT address, SUM(n) AS n, SUM(volume) AS volume,
+               SUM(risk_sum) / SUM(n) AS avg_risk, MAX(risk_max) AS max_risk
+        FROM ({source}) AS a
+        GROUP BY address
+        ORDER BY avg_risk DESC, address
+        LIMIT {p}
+    """  # nosec: B608 - fixed SQL fragments; values passed as parameters
+    with _connection() as con:
+        cur = con.cursor()
+        unique = _fetch_dicts(cur, unique_sql, params)[0]["n"]
+        top = _fetch_dicts(cur, top_sql, (*params, int(limit)))
+    return {"unique_addresses": int(unique or 0), "top_risk_addresses": top}
+
+
+def rollup_network_stats(since: str, limit: int = 5) -> dict[str, Any]:
+    """Distinct sender -> receiver edges since ``since`` and the top hubs.
+
+    Returns ``connections`` (distinct edges), ``senders`` (distinct senders)
+    and ``hubs``: the ``limit`` senders with the most distinct receivers.
+    """
+    since = normalize_timestamp(since)
+    p = _ph()
+    day, boundary = _rollup_boundary(since, daily=True)
+    edges = f"""
+        SELECT from_addr, to_addr FROM tx_rollup_edge_daily WHERE day >= {p}
+        UNION
+        SELECT from_addr, to_addr FROM (
+            {_edge_source_sql(f"timestamp >= {p} AND timestamp < {p}")}
+        ) AS head
+    """  # nosec: B608 - fixed SQL fragments; values passed as parameters
+    params = (day, since, boundary)
+    totals_sql = f"""
+        SELECT COUNT(*) AS connections, COUNT(DISTINCT from_addr) AS senders
+        FROM ({edges}) AS e
+    """  # nosec: B608 - fixed SQL fragments; values passed as parameters
+    hubs_sql = f"""
+        SELECT from_addr AS address, COUNT(*) AS n
+        FROM ({edges}) AS e
+        GROUP BY from_addr
+        ORDER BY n DESC, from_addr
+        LIMIT {p}
+    """  # nosec: B608 - fixed SQL fragments; values passed as parameters
+    with _connection() as con:
+        cur = con.cursor()
+        totals = _fetch_dicts(cur, totals_sql, params)[0]
+        hubs = _fetch_dicts(cur, hubs_sql, (*params, int(limit)))
+    return {
+        "connections": int(totals["connections"] or 0),
+        "senders": int(totals["senders"] or 0),
+        "hubs": hubs,
+    }
+
+
+def count_amount_outliers(since: str, center: float, radius: float) -> int:
+    """Count txs since ``since`` whose amount lies more than ``radius`` from
+    ``center`` (NULL amounts count as 0)."""
+    since = normalize_timestamp(since)
+    p = _ph()
+    sql = f"""
+        SELECT COUNT(*) FROM txs
+        WHERE timestamp >= {p} AND ABS({_AMOUNT_EXPR} - {p}) > {p}
+    """  # nosec: B608 - fixed SQL fragments; values passed as parameters
+    with _connection() as con:
+        cur = con.cursor()
+        cur.execute(sql, (since, center, radius))
+        return int(_safe_idx(cur.fetchone(), 0) or 0)
+
+
+def list_page(
+    *,
+    wallet: str | None = None,
+    min_risk: float | None = None,
+    before_id: int | None = None,
+    limit: int = 100,
+) -> tuple[list[dict[str, Any]], int | None]:
+    """Return one keyset page and the cursor for the next one.
+
+    The cursor is the ``id`` of the last row returned, or None when no
+    older rows remain. Pass it back as ``before_id``.
+    """
+    limit = max(1, int(limit))
+    sql, params = _tx_query(
+        wallet=wallet,
+        min_risk=min_risk,
+        before_id=before_id,
+        limit=limit + 1,
+        with_id=True,
+    )
+    rows = _select_txs(sql, params)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1]["id"]
+    return rows, None
+
+
+# Seconds a cached tx list stays valid (writes through this module also
+# invalidate it early; the TTL bounds staleness from other writers)
+TX_LIST_CACHE_TTL = 60
+
+
+def _cached_tx_list(
+    cache_key: str,
+    tags: list[str],
+    before_id: int | None,
+    **query: Any,
+) -> list[dict[str, Any]]:
+    cached_result = _get_cached(cache_key, ttl=TX_LIST_CACHE_TTL)
+    if cached_result is not None:
+        return cached_result
+
+    sql, params = _tx_query(before_id=before_id, **query)
+    result = _select_txs(sql, params)
+    # Pages below a cursor cannot gain rows from inserts; only the first
+    # page needs write invalidation.
+    _set_cache(
+        cache_key,
+        result,
+        ttl=TX_LIST_CACHE_TTL,
+        tags=tags if before_id is None else (),
+    )
     return result
 
 
+def list_by_wallet(
+    wallet: str,
+    limit: int = 100,
+    before_id: int | None = None,
+) -> list[dict[str, Any]]:
+    return _cached_tx_list(
+        _get_cache_key("list_by_wallet", wallet, limit, before_id),
+        [f"wallet:{wallet}", "txs:wallet"],
+        before_id,
+        wallet=wallet,
+        limit=limit,
+    )
+
+
+def list_alerts(
+    threshold: float = 0.75,
+    limit: int = 100,
+    before_id: int | None = None,
+) -> list[dict[str, Any]]:
+    return _cached_tx_list(
+        _get_cache_key("list_alerts", threshold, limit, before_id),
+        [f"alerts:{float(threshold)}", "txs:alerts"],
+        before_id,
+        min_risk=threshold,
+        limit=limit,
+    )
+
+
+def list_all(limit: int = 1000, before_id: int | None = None) -> list[dict[str, Any]]:
+    return _cached_tx_list(
+        _get_cache_key("list_all", limit, before_id),
+        ["txs:head"],
+        before_id,
+        limit=limit,
+    )
+
+
 def legacy_transactions_exists() -> bool:
     """Check whether a legacy `transactions` table exists in the active DB.
 
@@ -954,11 +1979,10 @@ def legacy_transactions_exists() -> bool:
 
 
 def users_count() -> int:
-    con = _conn()
-    cur = con.cursor()
-    cur.execute("SELECT COUNT(*) AS n FROM users")
-    row = cur.fetchone()
-    con.close()
+    with _connection() as con:
+        cur = con.cursor()
+        cur.execute("SELECT COUNT(*) AS n FROM users")
+        row = cur.fetchone()
     if isinstance(row, dict):
         return int(row.get("n", 0))
     return int(row[0]) if row else 0
@@ -981,77 +2005,76 @@ def get_user_by_email(email: str) -> UserDict | None:
     if cached_result is not None:
         return cached_result
 
-    con = _conn()
-    cur = con.cursor()
-    # placeholder not needed; using inline {_ph()} in query
-    try:
-        # Parameterized query using internal {_ph()} placeholder function and a
-        # separate parameters tuple. This is safe against SQL injection.
-        sql = f"""
-            SELECT id, email, password_hash, role, subscription_active, created_at,
-                   oauth_provider, oauth_id, display_name, avatar_url, wallet_addresses,
-                       totp_secret, mfa_enabled, mfa_type, recovery_codes, has_hardware_key
-    FROM users WHERE email={_ph()}
-        """  # nosec: B608 - parameterized placeholders used
-        logger.debug(
-            "get_user_by_email: executing SQL=%r params=%r DATABASE_URL=%r DB_PATH=%r",
-            sql,
-            (email,),
-            os.getenv("DATABASE_URL"),
-            DB_PATH,
-        )
-        cur.execute(sql, (email,))  # nosec: B608 - parameterized placeholders used
-        row = cur.fetchone()
-        logger.debug("get_user_by_email: fetched row=%r", row)
-    except sqlite3.OperationalError:
-        # Fallback for legacy / test DB schemas that use different column names
+    with _connection() as con:
+        cur = con.cursor()
+        # placeholder not needed; using inline {_ph()} in query
         try:
-            cur.execute(  # nosec: B608 - parameterized query using _ph() placeholders and parameters tuple
-                "SELECT id, email, hashed_password, is_active, is_admin FROM users WHERE email=?",
+            # Parameterized query using internal {_ph()} placeholder function and a
+            # separate parameters tuple. This is safe against SQL injection.
+            sql = f"""
+                SELECT id, email, password_hash, role, subscription_active, created_at,
+                       oauth_provider, oauth_id, display_name, avatar_url, wallet_addresses,
+                           totp_secret, mfa_enabled, mfa_type, recovery_codes, has_hardware_key
+        FROM users WHERE email={_ph()}
+            """  # nosec: B608 - parameterized placeholders used
+            logger.debug(
+                "get_user_by_email: executing SQL=%r params=%r DATABASE_URL=%r DB_PATH=%r",
+                sql,
                 (email,),
+                os.getenv("DATABASE_URL"),
+                DB_PATH,
             )
+            cur.execute(sql, (email,))  # nosec: B608 - parameterized placeholders used
             row = cur.fetchone()
-            if row:
-                # Normalize to expected shape
-                if isinstance(row, dict):
-                    hashed = row.get("hashed_password")
-                    is_active = bool(row.get("is_active"))
-                    is_admin = bool(row.get("is_admin"))
-                    row = {
-                        "id": row.get("id"),
-                        "email": row.get("email"),
-                        "password_hash": hashed,
-                        "role": "admin" if is_admin else "viewer",
-                        "subscription_active": is_active,
-                    }
-                else:
-                    # sqlite3.Row supports index access
-                    hashed = _safe_idx(row, 2)
-                    is_active = (
-                        bool(_safe_idx(row, 3))
-                        if _safe_idx(row, 3) is not None
-                        else False
-                    )
-                    is_admin = (
-                        bool(_safe_idx(row, 4))
-                        if _safe_idx(row, 4) is not None
-                        else False
-                    )
-                    row = {
-                        "id": _safe_idx(row, 0),
-                        "email": _safe_idx(row, 1),
-                        "password_hash": hashed,
-                        "role": "admin" if is_admin else "viewer",
-                        "subscription_active": is_active,
-                    }
-        except Exception:
-            row = None
-    con.close()
+            logger.debug("get_user_by_email: fetched row=%r", row)
+        except sqlite3.OperationalError:
+            # Fallback for legacy / test DB schemas that use different column names
+            try:
+                cur.execute(  # nosec: B608 - parameterized query using _ph() placeholders and parameters tuple
+                    "SELECT id, email, hashed_password, is_active, is_admin FROM users WHERE email=?",
+                    (email,),
+                )
+                row = cur.fetchone()
+                if row:
+                    # Normalize to expected shape
+                    if isinstance(row, dict):
+                        hashed = row.get("hashed_password")
+                        is_active = bool(row.get("is_active"))
+                        is_admin = bool(row.get("is_admin"))
+                        row = {
+                            "id": row.get("id"),
+                            "email": row.get("email"),
+                            "password_hash": hashed,
+                            "role": "admin" if is_admin else "viewer",
+                            "subscription_active": is_active,
+                        }
+                    else:
+                        # sqlite3.Row supports index access
+                        hashed = _safe_idx(row, 2)
+                        is_active = (
+                            bool(_safe_idx(row, 3))
+                            if _safe_idx(row, 3) is not None
+                            else False
+                        )
+                        is_admin = (
+                            bool(_safe_idx(row, 4))
+                            if _safe_idx(row, 4) is not None
+                            else False
+                        )
+                        row = {
+                            "id": _safe_idx(row, 0),
+                            "email": _safe_idx(row, 1),
+                            "password_hash": hashed,
+                            "role": "admin" if is_admin else "viewer",
+                            "subscription_active": is_active,
+                        }
+            except Exception:
+                row = None
 
     result = _row_to_user(row) if row else None
 
     # Cache the result
-    _set_cache(cache_key, result, ttl=300)
+    _set_cache(cache_key, result, ttl=300, tags=_user_cache_tags(result, email))
     return result
 
 
@@ -1061,64 +2084,67 @@ def get_user_by_id(uid: int) -> UserDict | None:
     if cached is not None:
         return cached
 
-    con = _conn()
-    cur = con.cursor()
-    try:
-        # Parameterized query using internal {_ph()} placeholder function and a
-        # separate parameters tuple. This is safe against SQL injection.
-        # Parameterized query using _ph() placeholders and parameters tuple - safe from SQL injection
-        sql = f"""
-        SELECT id, email, password_hash, role, subscription_active, created_at,
-               oauth_provider, oauth_id, display_name, avatar_url, wallet_addresses,
-                   totp_secret, mfa_enabled, mfa_type, recovery_codes, has_hardware_key
-    FROM users WHERE id={_ph()}
-    """  # nosec: B608 - parameterized placeholders used
-        cur.execute(sql, (uid,))  # nosec: B608 - parameterized placeholders used
-        row = cur.fetchone()
-    except sqlite3.OperationalError:
-        # Fallback for legacy/test DB schemas
+    with _connection() as con:
+        cur = con.cursor()
         try:
-            cur.execute(
-                "SELECT id, email, hashed_password, is_admin, is_active FROM users WHERE id=?",
-                (uid,),
-            )
-            r = cur.fetchone()
-            if r:
-                if isinstance(r, dict):
-                    hashed = r.get("hashed_password")
-                    is_active = bool(r.get("is_active"))
-                    is_admin = bool(r.get("is_admin"))
-                    row = {
-                        "id": r.get("id"),
-                        "email": r.get("email"),
-                        "password_hash": hashed,
-                        "role": "admin" if is_admin else "viewer",
-                        "subscription_active": is_active,
-                    }
+            # Parameterized query using internal {_ph()} placeholder function and a
+            # separate parameters tuple. This is safe against SQL injection.
+            # Parameterized query using _ph() placeholders and parameters tuple - safe from SQL injection
+            sql = f"""
+            SELECT id, email, password_hash, role, subscription_active, created_at,
+                   oauth_provider, oauth_id, display_name, avatar_url, wallet_addresses,
+                       totp_secret, mfa_enabled, mfa_type, recovery_codes, has_hardware_key
+        FROM users WHERE id={_ph()}
+        """  # nosec: B608 - parameterized placeholders used
+            cur.execute(sql, (uid,))  # nosec: B608 - parameterized placeholders used
+            row = cur.fetchone()
+        except sqlite3.OperationalError:
+            # Fallback for legacy/test DB schemas
+            try:
+                cur.execute(
+                    "SELECT id, email, hashed_password, is_admin, is_active FROM users WHERE id=?",
+                    (uid,),
+                )
+                r = cur.fetchone()
+                if r:
+                    if isinstance(r, dict):
+                        hashed = r.get("hashed_password")
+                        is_active = bool(r.get("is_active"))
+                        is_admin = bool(r.get("is_admin"))
+                        row = {
+                            "id": r.get("id"),
+                            "email": r.get("email"),
+                            "password_hash": hashed,
+                            "role": "admin" if is_admin else "viewer",
+                            "subscription_active": is_active,
+                        }
+                    else:
+                        # sqlite3.Row or sequence
+                        hashed = _safe_idx(r, 2)
+                        is_admin = (
+                            bool(_safe_idx(r, 3))
+                            if _safe_idx(r, 3) is not None
+                            else False
+                        )
+                        is_active = (
+                            bool(_safe_idx(r, 4))
+                            if _safe_idx(r, 4) is not None
+                            else False
+                        )
+                        row = {
+                            "id": _safe_idx(r, 0),
+                            "email": _safe_idx(r, 1),
+                            "password_hash": hashed,
+                            "role": "admin" if is_admin else "viewer",
+                            "subscription_active": is_active,
+                        }
                 else:
-                    # sqlite3.Row or sequence
-                    hashed = _safe_idx(r, 2)
-                    is_admin = (
-                        bool(_safe_idx(r, 3)) if _safe_idx(r, 3) is not None else False
-                    )
-                    is_active = (
-                        bool(_safe_idx(r, 4)) if _safe_idx(r, 4) is not None else False
-                    )
-                    row = {
-                        "id": _safe_idx(r, 0),
-                        "email": _safe_idx(r, 1),
-                        "password_hash": hashed,
-                        "role": "admin" if is_admin else "viewer",
-                        "subscription_active": is_active,
-                    }
-            else:
+                    row = None
+            except Exception:
                 row = None
-        except Exception:
-            row = None
-    con.close()
     result = _row_to_user(row)
 
-    _set_cache(cache_key, result, ttl=300)
+    _set_cache(cache_key, result, ttl=300, tags=_user_cache_tags(result))
     return result
 
 
@@ -1139,57 +2165,15 @@ def create_user(
     has_hardware_key: bool = False,
 ) -> UserDict | None:
     """Create a new user with support for both traditional email / password and OAuth authentication."""
-    con = _conn()
-    cur = con.cursor()
+    with _connection() as con:
+        cur = con.cursor()
 
-    # Convert wallet_addresses and recovery_codes to JSON string
-    wallet_addresses_json = json.dumps(wallet_addresses or [])
-    recovery_codes_json = json.dumps(recovery_codes or [])
+        # Convert wallet_addresses and recovery_codes to JSON string
+        wallet_addresses_json = json.dumps(wallet_addresses or [])
+        recovery_codes_json = json.dumps(recovery_codes or [])
 
-    # For OAuth users, password_hash can be None
-    if USING_POSTGRES:
-        sql = f"""
-        INSERT INTO users (
-            email, password_hash, role, subscription_active, created_at,
-                oauth_provider, oauth_id, display_name, avatar_url, wallet_addresses,
-                totp_secret, mfa_enabled, mfa_type, recovery_codes, has_hardware_key
-        )
-        VALUES (
-            {_ph()},{_ph()},{_ph()},{_ph()}, NOW(),
-            {_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()}
-        )
-        RETURNING id
-        """  # nosec: B608 - parameterized placeholders used
-        cur.execute(
-            sql,
-            (
-                email,
-                password_hash,
-                role,
-                subscription_active,
-                oauth_provider,
-                oauth_id,
-                display_name,
-                avatar_url,
-                wallet_addresses_json,
-                totp_secret,
-                mfa_enabled,
-                mfa_type,
-                recovery_codes_json,
-                has_hardware_key,
-            ),
-        )
-        _f = cur.fetchone()
-        # Normalize returned shape: psycopg2 may return a dict-like row, sqlite returns a sequence
-        if _f is None:
-            new_id = None
-        elif isinstance(_f, dict):
-            new_id = _f.get("id")
-        else:
-            new_id = _safe_idx(_f, 0)
-    else:
-        # Attempt normal insert into canonical columns
-        try:
+        # For OAuth users, password_hash can be None
+        if USING_POSTGRES:
             sql = f"""
             INSERT INTO users (
                 email, password_hash, role, subscription_active, created_at,
@@ -1197,9 +2181,10 @@ def create_user(
                     totp_secret, mfa_enabled, mfa_type, recovery_codes, has_hardware_key
             )
             VALUES (
-                {_ph()},{_ph()},{_ph()},{_ph()}, datetime('now'),
+                {_ph()},{_ph()},{_ph()},{_ph()}, NOW(),
                 {_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()}
             )
+            RETURNING id
             """  # nosec: B608 - parameterized placeholders used
             cur.execute(
                 sql,
@@ -1207,56 +2192,96 @@ def create_user(
                     email,
                     password_hash,
                     role,
-                    1 if subscription_active else 0,
+                    subscription_active,
                     oauth_provider,
                     oauth_id,
                     display_name,
                     avatar_url,
                     wallet_addresses_json,
                     totp_secret,
-                    1 if mfa_enabled else 0,
+                    mfa_enabled,
                     mfa_type,
                     recovery_codes_json,
-                    1 if has_hardware_key else 0,
+                    has_hardware_key,
                 ),
             )
-            new_id = cur.lastrowid
-        except sqlite3.OperationalError as e:
-            # Fallback for legacy/test DBs that have older column names
-            lower_e = str(e).lower()
-            if (
-                "no column named password_hash" in lower_e
-                or "has no column named password_hash" in lower_e
-            ):
-                try:
-                    # Legacy schema uses hashed_password, is_admin, is_active
-                    sql = f"""
-                    INSERT INTO users (
-                        email, hashed_password, is_admin, is_active, created_at
-                                        ) VALUES (
-                                            {_ph()},{_ph()},{_ph()},{_ph()}, datetime('now')
-                                        )
-                    """  # nosec: B608 - parameterized placeholders used
-                    cur.execute(
-                        sql,
-                        (
-                            email,
-                            password_hash,
-                            1 if role == "admin" else 0,
-                            1 if subscription_active else 0,
-                        ),
-                    )
-                    new_id = cur.lastrowid
-                except Exception:
-                    # Re-raise original error if fallback also fails
-                    raise
+            _f = cur.fetchone()
+            # Normalize returned shape: psycopg2 may return a dict-like row, sqlite returns a sequence
+            if _f is None:
+                new_id = None
+            elif isinstance(_f, dict):
+                new_id = _f.get("id")
             else:
-                raise
-    con.commit()
-    con.close()
+                new_id = _safe_idx(_f, 0)
+        else:
+            # Attempt normal insert into canonical columns
+            try:
+                sql = f"""
+                INSERT INTO users (
+                    email, password_hash, role, subscription_active, created_at,
+                        oauth_provider, oauth_id, display_name, avatar_url, wallet_addresses,
+                        totp_secret, mfa_enabled, mfa_type, recovery_codes, has_hardware_key
+                )
+                VALUES (
+                    {_ph()},{_ph()},{_ph()},{_ph()}, datetime('now'),
+                    {_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()},{_ph()}
+                )
+                """  # nosec: B608 - parameterized placeholders used
+                cur.execute(
+                    sql,
+                    (
+                        email,
+                        password_hash,
+                        role,
+                        1 if subscription_active else 0,
+                        oauth_provider,
+                        oauth_id,
+                        display_name,
+                        avatar_url,
+                        wallet_addresses_json,
+                        totp_secret,
+                        1 if mfa_enabled else 0,
+                        mfa_type,
+                        recovery_codes_json,
+                        1 if has_hardware_key else 0,
+                    ),
+                )
+                new_id = cur.lastrowid
+            except sqlite3.OperationalError as e:
+                # Fallback for legacy/test DBs that have older column names
+                lower_e = str(e).lower()
+                if (
+                    "no column named password_hash" in lower_e
+                    or "has no column named password_hash" in lower_e
+                ):
+                    try:
+                        # Legacy schema uses hashed_password, is_admin, is_active
+                        sql = f"""
+                        INSERT INTO users (
+                            email, hashed_password, is_admin, is_active, created_at
+                                            ) VALUES (
+                                                {_ph()},{_ph()},{_ph()},{_ph()}, datetime('now')
+                                            )
+                        """  # nosec: B608 - parameterized placeholders used
+                        cur.execute(
+                            sql,
+                            (
+                                email,
+                                password_hash,
+                                1 if role == "admin" else 0,
+                                1 if subscription_active else 0,
+                            ),
+                        )
+                        new_id = cur.lastrowid
+                    except Exception:
+                        # Re-raise original error if fallback also fails
+                        raise
+                else:
+                    raise
+        con.commit()
 
     # Invalidate user caches
-    _clear_cache_pattern("user_by_email")
+    _invalidate_user(email=email)
 
     # Debug visibility: log the newly created id for troubleshooting tests
     try:
@@ -1272,27 +2297,27 @@ def create_user(
 
 
 def set_subscription_active(email: str, active: bool) -> None:
-    con = _conn()
-    cur = con.cursor()
-    # For Postgres, store True / False; for SQLite, store 1 / 0
-    value = True if USING_POSTGRES else (1 if active else 0)
-    cur.execute(
-        f"UPDATE users SET subscription_active={_ph()} WHERE email={_ph()}",  # nosec: B608
-        (value, email),
-    )
-    con.commit()
-    con.close()
+    with _connection() as con:
+        cur = con.cursor()
+        # For Postgres, store True / False; for SQLite, store 1 / 0
+        value = True if USING_POSTGRES else (1 if active else 0)
+        cur.execute(
+            f"UPDATE users SET subscription_active={_ph()} WHERE email={_ph()}",  # nosec: B608
+            (value, email),
+        )
+        con.commit()
+    _invalidate_user(email=email)
 
 
 def set_role(email: str, role: str) -> None:
-    con = _conn()
-    cur = con.cursor()
-    cur.execute(
-        f"UPDATE users SET role={_ph()} WHERE email={_ph()}",  # nosec: B608
-        (role, email),
-    )
-    con.commit()
-    con.close()
+    with _connection() as con:
+        cur = con.cursor()
+        cur.execute(
+            f"UPDATE users SET role={_ph()} WHERE email={_ph()}",  # nosec: B608
+            (role, email),
+        )
+        con.commit()
+    _invalidate_user(email=email)
 
 
 def update_user_subscription(user_id: int | str, active: bool = True) -> bool:
@@ -1317,8 +2342,7 @@ def update_user_subscription(user_id: int | str, active: bool = True) -> bool:
             )
         con.commit()
         con.close()
-        _clear_cache_pattern(f"user_by_id:{uid}")
-        _clear_cache_pattern("user_by_email")
+        _invalidate_user(uid)
         return True
     except Exception:
         with contextlib.suppress(Exception):
@@ -1334,16 +2358,15 @@ def get_settings_for_user(user_id: int) -> dict[str, Any]:
     Keys: x_api_key (str), risk_threshold (float|None), time_range_days (int|None), ui_prefs (dict).
     """
     try:
-        con = _conn()
-        cur = con.cursor()
-        sql = f"""
-          SELECT x_api_key, risk_threshold, time_range_days, ui_prefs
-          FROM user_settings
-    WHERE user_id={_ph()}
-    """  # nosec: B608 - parameterized placeholders used
-        cur.execute(sql, (user_id,))  # nosec: B608 - parameterized placeholders used
-        row = cur.fetchone()
-        con.close()
+        with _connection() as con:
+            cur = con.cursor()
+            sql = f"""
+              SELECT x_api_key, risk_threshold, time_range_days, ui_prefs
+              FROM user_settings
+        WHERE user_id={_ph()}
+        """  # nosec: B608 - parameterized placeholders used
+            cur.execute(sql, (user_id,))  # nosec: B608 - parameterized placeholders used
+            row = cur.fetchone()
         if not row:
             return {}
         if not isinstance(row, dict):
@@ -1415,54 +2438,53 @@ def save_settings_for_user(user_id: int, patch: dict[str, Any]) -> dict[str, Any
     time_range_days = merged.get("time_range_days")
     ui_prefs_json = json.dumps(merged.get("ui_prefs") or {})
 
-    con = _conn()
-    cur = con.cursor()
-    if USING_POSTGRES:
-        sql = f"""
-                    INSERT INTO user_settings (
-                        user_id,
-                            x_api_key,
-                            risk_threshold,
-                            time_range_days,
-                            ui_prefs,
-                            created_at,
-                            updated_at
-                    )
-                    VALUES (
-                        {_ph()},{_ph()},{_ph()},{_ph()},{_ph()}, NOW(), NOW()
-                    )
-                    ON CONFLICT (user_id) DO UPDATE SET
-                        x_api_key=EXCLUDED.x_api_key,
-                            risk_threshold=EXCLUDED.risk_threshold,
-                            time_range_days=EXCLUDED.time_range_days,
-                            ui_prefs=EXCLUDED.ui_prefs,
-                            updated_at=NOW()
-                        """  # nosec: B608 - parameterized placeholders used
-        cur.execute(
-            sql,
-            (user_id, x_api_key, risk_threshold, time_range_days, ui_prefs_json),
-        )
-    else:
-        sql = f"""
-                    INSERT INTO user_settings (
-                        user_id, x_api_key, risk_threshold, time_range_days, ui_prefs, created_at, updated_at
-                    )
-                    VALUES (
-                        {_ph()},{_ph()},{_ph()},{_ph()},{_ph()}, datetime('now'), datetime('now')
-                    )
-                    ON CONFLICT(user_id) DO UPDATE SET
-                        x_api_key=excluded.x_api_key,
-                        risk_threshold=excluded.risk_threshold,
-                        time_range_days=excluded.time_range_days,
-                        ui_prefs=excluded.ui_prefs,
-                        updated_at=datetime('now')
-                """  # nosec: B608 - parameterized placeholders used
-        cur.execute(
-            sql,
-            (user_id, x_api_key, risk_threshold, time_range_days, ui_prefs_json),
-        )
-    con.commit()
-    con.close()
+    with _connection() as con:
+        cur = con.cursor()
+        if USING_POSTGRES:
+            sql = f"""
+                        INSERT INTO user_settings (
+                            user_id,
+                                x_api_key,
+                                risk_threshold,
+                                time_range_days,
+                                ui_prefs,
+                                created_at,
+                                updated_at
+                        )
+                        VALUES (
+                            {_ph()},{_ph()},{_ph()},{_ph()},{_ph()}, NOW(), NOW()
+                        )
+                        ON CONFLICT (user_id) DO UPDATE SET
+                            x_api_key=EXCLUDED.x_api_key,
+                                risk_threshold=EXCLUDED.risk_threshold,
+                                time_range_days=EXCLUDED.time_range_days,
+                                ui_prefs=EXCLUDED.ui_prefs,
+                                updated_at=NOW()
+                            """  # nosec: B608 - parameterized placeholders used
+            cur.execute(
+                sql,
+                (user_id, x_api_key, risk_threshold, time_range_days, ui_prefs_json),
+            )
+        else:
+            sql = f"""
+                        INSERT INTO user_settings (
+                            user_id, x_api_key, risk_threshold, time_range_days, ui_prefs, created_at, updated_at
+                        )
+                        VALUES (
+                            {_ph()},{_ph()},{_ph()},{_ph()},{_ph()}, datetime('now'), datetime('now')
+                        )
+                        ON CONFLICT(user_id) DO UPDATE SET
+                            x_api_key=excluded.x_api_key,
+                            risk_threshold=excluded.risk_threshold,
+                            time_range_days=excluded.time_range_days,
+                            ui_prefs=excluded.ui_prefs,
+                            updated_at=datetime('now')
+                    """  # nosec: B608 - parameterized placeholders used
+            cur.execute(
+                sql,
+                (user_id, x_api_key, risk_threshold, time_range_days, ui_prefs_json),
+            )
+        con.commit()
     return get_settings_for_user(user_id)
 
 
@@ -1489,22 +2511,21 @@ def get_user_by_oauth(oauth_provider: str, oauth_id: str) -> UserDict | None:
     if cached is not None:
         return cached
 
-    con = _conn()
-    cur = con.cursor()
-    sql = f"""
-        SELECT id, email, password_hash, role, subscription_active, created_at,
-               oauth_provider, oauth_id, display_name, avatar_url, wallet_addresses
-    FROM users WHERE oauth_provider={_ph()} AND oauth_id={_ph()}
-        """  # nosec: B608 - parameterized placeholders used
-    cur.execute(
-        sql,
-        (oauth_provider, oauth_id),
-    )  # nosec: B608 - parameterized placeholders used
-    row = cur.fetchone()
-    con.close()
+    with _connection() as con:
+        cur = con.cursor()
+        sql = f"""
+            SELECT id, email, password_hash, role, subscription_active, created_at,
+                   oauth_provider, oauth_id, display_name, avatar_url, wallet_addresses
+        FROM users WHERE oauth_provider={_ph()} AND oauth_id={_ph()}
+            """  # nosec: B608 - parameterized placeholders used
+        cur.execute(
+            sql,
+            (oauth_provider, oauth_id),
+        )  # nosec: B608 - parameterized placeholders used
+        row = cur.fetchone()
     result = _row_to_user(row)
 
-    _set_cache(cache_key, result, ttl=300)
+    _set_cache(cache_key, result, ttl=300, tags=_user_cache_tags(result))
     return result
 
 
@@ -1513,22 +2534,19 @@ def update_user_wallet_addresses(
     wallet_addresses: list[dict[str, Any]],
 ) -> None:
     """Update a user's wallet addresses."""
-    con = _conn()
-    cur = con.cursor()
-    wallet_addresses_json = json.dumps(wallet_addresses)
-    # Parameterized query using internal {_ph()} placeholder function and a
-    # separate parameters tuple. This is safe against SQL injection.
-    cur.execute(
-        f"UPDATE users SET wallet_addresses={_ph()} WHERE id={_ph()}",  # nosec: B608
-        (wallet_addresses_json, user_id),
-    )
-    con.commit()
-    con.close()
+    with _connection() as con:
+        cur = con.cursor()
+        wallet_addresses_json = json.dumps(wallet_addresses)
+        # Parameterized query using internal {_ph()} placeholder function and a
+        # separate parameters tuple. This is safe against SQL injection.
+        cur.execute(
+            f"UPDATE users SET wallet_addresses={_ph()} WHERE id={_ph()}",  # nosec: B608
+            (wallet_addresses_json, user_id),
+        )
+        con.commit()
 
     # Invalidate user caches
-    _clear_cache_pattern(f"user_by_id:{user_id}")
-    _clear_cache_pattern("user_by_email")
-    _clear_cache_pattern("user_by_oauth")
+    _invalidate_user(user_id)
 
 
 def add_wallet_address(
@@ -1571,83 +2589,78 @@ def update_user_mfa(
     has_hardware_key: bool | None = None,
 ) -> None:
     """Update MFA settings for a user."""
-    con = _conn()
-    cur = con.cursor()
+    with _connection() as con:
+        cur = con.cursor()
 
-    # Build dynamic update query
-    updates: list[str] = []
-    values: list[Any] = []
+        # Build dynamic update query
+        updates: list[str] = []
+        values: list[Any] = []
 
-    if mfa_enabled is not None:
-        if USING_POSTGRES:
-            updates.append(
-                f"mfa_enabled={_ph()}",
-            )  # nosec: B608 - internal placeholder; value passed via params
-            values.append(mfa_enabled)
-        else:
+        if mfa_enabled is not None:
+            if USING_POSTGRES:
+                updates.append(
+                    f"mfa_enabled={_ph()}",
+                )  # nosec: B608 - internal placeholder; value passed via params
+                values.append(mfa_enabled)
+            else:
+                updates.append(
+                    f"mfa_enabled={_ph()}",
+                )  # nosec: B608 - internal placeholder; value passed via params
+                values.append(1 if mfa_enabled else 0)
+
+        if mfa_type is not None:
             updates.append(
-                f"mfa_enabled={_ph()}",
+                f"mfa_type={_ph()}",
             )  # nosec: B608 - internal placeholder; value passed via params
-            values.append(1 if mfa_enabled else 0)
-
-    if mfa_type is not None:
-        updates.append(
-            f"mfa_type={_ph()}",
-        )  # nosec: B608 - internal placeholder; value passed via params
-        values.append(mfa_type)
-
-    if totp_secret is not None:
-        updates.append(
-            f"totp_secret={_ph()}",
-        )  # nosec: B608 - internal placeholder; value passed via params
-        values.append(totp_secret)
-
-    if recovery_codes is not None:
-        updates.append(
-            f"recovery_codes={_ph()}",
-        )  # nosec: B608 - internal placeholder; value passed via params
-        values.append(json.dumps(recovery_codes))
-
-    if has_hardware_key is not None:
-        if USING_POSTGRES:
+            values.append(mfa_type)
+
+        if totp_secret is not None:
             updates.append(
-                f"has_hardware_key={_ph()}",
+                f"totp_secret={_ph()}",
             )  # nosec: B608 - internal placeholder; value passed via params
-            values.append(has_hardware_key)
-        else:
+            values.append(totp_secret)
+
+        if recovery_codes is not None:
             updates.append(
-                f"has_hardware_key={_ph()}",
+                f"recovery_codes={_ph()}",
             )  # nosec: B608 - internal placeholder; value passed via params
-            values.append(1 if has_hardware_key else 0)
-
-    if updates:
-        values.append(user_id)
-    query = f"UPDATE users SET {', '.join(updates)} WHERE id={_ph()}"  # nosec: B608 - internal _ph() placeholders used; params passed separately
-    cur.execute(query, values)
-    con.commit()
-
-    con.close()
+            values.append(json.dumps(recovery_codes))
+
+        if has_hardware_key is not None:
+            if USING_POSTGRES:
+                updates.append(
+                    f"has_hardware_key={_ph()}",
+                )  # nosec: B608 - internal placeholder; value passed via params
+                values.append(has_hardware_key)
+            else:
+                updates.append(
+                    f"has_hardware_key={_ph()}",
+                )  # nosec: B608 - internal placeholder; value passed via params
+                values.append(1 if has_hardware_key else 0)
+
+        if updates:
+            values.append(user_id)
+        query = f"UPDATE users SET {', '.join(updates)} WHERE id={_ph()}"  # nosec: B608 - internal _ph() placeholders used; params passed separately
+        cur.execute(query, values)
+        con.commit()
 
     # Clear user cache
-    _clear_cache_pattern("user_by_id")
-    _clear_cache_pattern("user_by_email")
+    _invalidate_user(user_id)
 
 
 def update_user_password(user_id: int, password_hash: str) -> None:
     """Update user's password hash."""
-    con = _conn()
-    cur = con.cursor()
+    with _connection() as con:
+        cur = con.cursor()
 
-    cur.execute(
-        f"UPDATE users SET password_hash={_ph()} WHERE id={_ph()}",  # nosec: B608 - internal placeholders; values provided in params
-        (password_hash, user_id),
-    )
-    con.commit()
-    con.close()
+        cur.execute(
+            f"UPDATE users SET password_hash={_ph()} WHERE id={_ph()}",  # nosec: B608 - internal placeholders; values provided in params
+            (password_hash, user_id),
+        )
+        con.commit()
 
     # Clear user cache
-    _clear_cache_pattern("user_by_id")
-    _clear_cache_pattern("user_by_email")
+    _invalidate_user(user_id)
 
 
 # Simple in-memory rotated password storage (ephemeral).
@@ -1710,31 +2723,31 @@ def update_user_profile(
     avatar_url: str | None = None,
 ) -> None:
     """Update a user's profile information."""
-    con = _conn()
-    cur = con.cursor()
+    with _connection() as con:
+        cur = con.cursor()
 
-    updates: list[str] = []
-    params: list[Any] = []
+        updates: list[str] = []
+        params: list[Any] = []
 
-    if display_name is not None:
-        updates.append(
-            f"display_name={_ph()}",
-        )  # nosec: B608 - internal placeholder; value passed via params
-        params.append(display_name)
-
-    if avatar_url is not None:
-        updates.append(
-            f"avatar_url={_ph()}",
-        )  # nosec: B608 - internal placeholder; value passed via params
-        params.append(avatar_url)
-
-    if updates:
-        params.append(user_id)
-        # Constructed query uses internal {_ph()} placeholders and the
-        # accompanying `params` tuple below, so values are passed separately
-        # to the DB API. Suppress Bandit B608 here with a short rationale.
-        sql = f"UPDATE users SET {', '.join(updates)} WHERE id={_ph()}"  # nosec: B608
-        cur.execute(sql, params)  # nosec: B608 - parameterized placeholders used
-        con.commit()
+        if display_name is not None:
+            updates.append(
+                f"display_name={_ph()}",
+            )  # nosec: B608 - internal placeholder; value passed via params
+            params.append(display_name)
 
-    con.close()
+        if avatar_url is not None:
+            updates.append(
+                f"avatar_url={_ph()}",
+            )  # nosec: B608 - internal placeholder; value passed via params
+            params.append(avatar_url)
+
+        if updates:
+            params.append(user_id)
+            # Constructed query uses internal {_ph()} placeholders and the
+            # accompanying `params` tuple below, so values are passed separately
+            # to the DB API. Suppress Bandit B608 here with a short rationale.
+            sql = f"UPDATE users SET {', '.join(updates)} WHERE id={_ph()}"  # nosec: B608
+            cur.execute(sql, params)  # nosec: B608 - parameterized placeholders used
+            con.commit()
+
+    _invalidate_user(user_id)
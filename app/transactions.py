@@ -1,8 +1,11 @@
 # transactions compatibility router
 import contextlib
+import json
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from . import store
 from .deps import current_user
@@ -19,6 +22,65 @@ _SQL_SELECT_TRANSACTION_BY_ID = (
 )
 
 
+# Upper bound on rows accepted by one POST /transactions/bulk request
+MAX_BULK_TRANSACTIONS = 10_000
+# Upper bound on the page size of GET /transactions/page
+MAX_PAGE_SIZE = 1000
+
+
+def _payload_to_tx(payload: dict[str, Any], amount: float, currency: str) -> dict:
+    """Map a loosely-shaped API payload onto the canonical `txs` row."""
+    return {
+        "tx_id": payload.get("tx_id") or payload.get("id") or "",
+        "timestamp": payload.get("timestamp") or payload.get("created_at") or "",
+        "chain": payload.get("chain", "XRP"),
+        "from_addr": payload.get("from_addr") or payload.get("from_address"),
+        "to_addr": payload.get("to_addr") or payload.get("to_address"),
+        "amount": amount,
+        "symbol": currency,
+        "direction": payload.get("direction", "out"),
+        "fee": payload.get("fee", 0),
+        "memo": payload.get("memo"),
+        "notes": payload.get("notes"),
+        "category": payload.get("category", "unknown"),
+        "risk_score": payload.get("risk_score", 0.0),
+        "risk_flags": payload.get("risk_flags", []),
+    }
+
+
+def _parse_bulk_body(body: bytes, content_type: str) -> list[Any]:
+    """Decode a bulk upload: NDJSON (one object per line) or a JSON array.
+
+    A JSON object with a ``transactions`` array is accepted as well.
+    """
+    if "ndjson" in content_type or "jsonl" in content_type:
+        items: list[Any] = []
+        for lineno, line in enumerate(body.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"invalid JSON on line {lineno}",
+                ) from e
+        return items
+
+    try:
+        data = json.loads(body or b"null")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail="invalid JSON body") from e
+    if isinstance(data, dict) and isinstance(data.get("transactions"), list):
+        data = data["transactions"]
+    if not isinstance(data, list):
+        raise HTTPException(
+            status_code=422,
+            detail="expected a JSON array or NDJSON of transactions",
+        )
+    return data
+
+
 @router.post("/transactions", status_code=201)
 def create_transaction(
     payload: Annotated[dict[str, Any], Body()], user=Depends(current_user)
@@ -89,50 +151,22 @@ def create_transaction(
                 "status": status,
             }
 
-        # Fallback to canonical storage
-        tx = {
-            "tx_id": payload.get("tx_id") or payload.get("id") or "",
-            "timestamp": payload.get("timestamp") or payload.get("created_at") or "",
-            "chain": payload.get("chain", "XRP"),
-            "from_addr": payload.get("from_addr") or payload.get("from_address"),
-            "to_addr": payload.get("to_addr") or payload.get("to_address"),
-            "amount": amount,
-            "symbol": currency,
-            "direction": payload.get("direction", "out"),
-            "fee": payload.get("fee", 0),
-            "memo": payload.get("memo"),
-            "notes": payload.get("notes"),
-            "category": payload.get("category", "unknown"),
-            "risk_score": payload.get("risk_score", 0.0),
-            "risk_flags": payload.get("risk_flags", []),
-        }
+        # Fallback to canonical storage. Hand the probe connection back first:
+        # save_tagged checks out its own and nested checkouts can exhaust the pool.
+        con.close()
+        con = None
+        tx = _payload_to_tx(payload, amount, currency)
         new_id = store.save_tagged(tx)
         return {"id": new_id, "amount": amount, "currency": currency, "status": status}
 
     except Exception:
+        with contextlib.suppress(Exception):
+            if con is not None:
+                con.close()
+                con = None
         # Last-resort fallback via store.save_tagged
         try:
-            new_id = store.save_tagged(
-                {
-                    "tx_id": payload.get("tx_id") or payload.get("id") or "",
-                    "timestamp": payload.get("timestamp")
-                    or payload.get("created_at")
-                    or "",
-                    "chain": payload.get("chain", "XRP"),
-                    "from_addr": payload.get("from_addr")
-                    or payload.get("from_address"),
-                    "to_addr": payload.get("to_addr") or payload.get("to_address"),
-                    "amount": amount,
-                    "symbol": currency,
-                    "direction": payload.get("direction", "out"),
-                    "fee": payload.get("fee", 0),
-                    "memo": payload.get("memo"),
-                    "notes": payload.get("notes"),
-                    "category": payload.get("category", "unknown"),
-                    "risk_score": payload.get("risk_score", 0.0),
-                    "risk_flags": payload.get("risk_flags", []),
-                },
-            )
+            new_id = store.save_tagged(_payload_to_tx(payload, amount, currency))
             return {
                 "id": new_id,
                 "amount": amount,
@@ -150,6 +184,95 @@ def create_transaction(
                 con.close()
 
 
+@router.post("/transactions/bulk", status_code=201)
+async def create_transactions_bulk(request: Request, user=Depends(current_user)):
+    """Ingest many transactions in one request (JSON array or NDJSON).
+
+    All rows are validated first and then written to `txs` through
+    `store.save_tagged_many` in a single DB transaction, so a backfill of
+    thousands of rows costs one commit instead of one per row.
+    """
+    items = _parse_bulk_body(
+        await request.body(),
+        request.headers.get("content-type", "").lower(),
+    )
+    if len(items) > MAX_BULK_TRANSACTIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"at most {MAX_BULK_TRANSACTIONS} transactions per request",
+        )
+
+    txs = []
+    for index, payload in enumerate(items):
+        if not isinstance(payload, dict):
+            raise HTTPException(
+                status_code=422,
+                detail=f"item {index} is not a JSON object",
+            )
+        try:
+            amount = float(payload.get("amount", 0) or 0)
+        except (TypeError, ValueError) as e:
+            raise HTTPException(
+                status_code=422,
+                detail=f"item {index}: amount must be a number",
+            ) from e
+        if amount < 0:
+            raise HTTPException(
+                status_code=422,
+                detail=f"item {index}: amount must be non-negative",
+            )
+        currency = payload.get("currency") or payload.get("symbol") or "XRP"
+        txs.append(_payload_to_tx(payload, amount, currency))
+
+    try:
+        inserted = await run_in_threadpool(store.save_tagged_many, txs)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to save transactions",
+        ) from e
+    return {"inserted": inserted}
+
+
+@router.get("/transactions/page")
+def list_transactions_page(
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = 100,
+    cursor: Annotated[int | None, Query(ge=1)] = None,
+    wallet: str | None = None,
+    min_risk: Annotated[float | None, Query(ge=0, le=1)] = None,
+    user=Depends(current_user),
+):
+    """Return one newest-first page of `txs` using keyset pagination.
+
+    Pass the returned ``next_cursor`` back as ``cursor`` to fetch the next
+    page; it is null once no older rows remain.
+    """
+    items, next_cursor = store.list_page(
+        wallet=wallet,
+        min_risk=min_risk,
+        before_id=cursor,
+        limit=limit,
+    )
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/transactions/export")
+def export_transactions(
+    cursor: Annotated[int | None, Query(ge=1)] = None,
+    wallet: str | None = None,
+    min_risk: Annotated[float | None, Query(ge=0, le=1)] = None,
+    user=Depends(current_user),
+):
+    """Stream matching `txs` rows as NDJSON, newest first.
+
+    Rows are read from the database in batches while the response is being
+    written, so large exports never sit in memory as one list.
+    """
+    rows = store.iter_txs(wallet=wallet, min_risk=min_risk, before_id=cursor)
+    lines = (json.dumps(row, default=str) + "\n" for row in rows)
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
 @router.get("/transactions/{transaction_id}")
 def get_transaction(transaction_id: int, user=Depends(current_user)):
     """Return a single legacy transaction by id for compatibility tests."""
@@ -179,6 +302,9 @@ def get_transaction(transaction_id: int, user=Depends(current_user)):
                 "created_at": r[5] if len(r) > 5 else None,
             }
     except Exception:
+        pass
+    finally:
+        # Release before the fallback below checks out its own connection
         with contextlib.suppress(Exception):
             if con is not None:
                 con.close()
@@ -259,6 +385,8 @@ def list_transactions(user=Depends(current_user)):
             has_table = cur.fetchone() is not None
 
         if not has_table:
+            con.close()
+            con = None
             if hasattr(store, "list_all"):
                 return store.list_all(limit=1000)
             return []
@@ -289,6 +417,7 @@ def list_transactions(user=Depends(current_user)):
         with contextlib.suppress(Exception):
             if con is not None:
                 con.close()
+                con = None
         if hasattr(store, "list_all"):
             return store.list_all(limit=1000)
         return []
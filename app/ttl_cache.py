@@ -0,0 +1,153 @@
+"""Bounded, thread-safe LRU cache with per-entry TTLs and tag invalidation.
+
+Entries are evicted least-recently-used first once ``maxsize`` is reached,
+and expire ``ttl`` seconds after they were stored. Each entry may carry
+tags (e.g. ``"wallet:rXYZ"`` or ``"user:42"``) so writers can drop exactly
+the entries a change affects instead of scanning every key.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any
+
+_MISSING = object()
+
+
+class TTLCache:
+    """LRU + TTL cache with hit/miss counters and tag-based invalidation."""
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        *,
+        name: str = "",
+    ) -> None:
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self.name = name
+        # key -> (expires_at, value, tags)
+        self._data: OrderedDict[Hashable, tuple[float, Any, tuple[str, ...]]] = (
+            OrderedDict()
+        )
+        self._tags: dict[str, set[Hashable]] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the live value for ``key`` (refreshing its LRU position)."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._stats["misses"] += 1
+                return default
+            if item[0] <= now:
+                self._remove_locked(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+            return item[1]
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: float | None = None,
+        tags: Iterable[str] = (),
+    ) -> None:
+        """Store ``value``; ``ttl`` defaults to the cache-wide TTL."""
+        expires = time.monotonic() + (self.ttl if ttl is None else float(ttl))
+        tags = tuple(tags)
+        with self._lock:
+            if key in self._data:
+                self._remove_locked(key)
+            self._data[key] = (expires, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self._stats["sets"] += 1
+            while len(self._data) > self.maxsize:
+                oldest = next(iter(self._data))
+                self._remove_locked(oldest)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop a single key; return whether it was present."""
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._remove_locked(key)
+            self._stats["invalidations"] += 1
+            return True
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """Drop every entry carrying any of ``tags``; return how many."""
+        with self._lock:
+            keys: set[Hashable] = set()
+            for tag in tags:
+                keys |= self._tags.get(tag, set())
+            for key in keys:
+                self._remove_locked(key)
+            self._stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop entries whose key satisfies ``predicate`` (full scan)."""
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for key in keys:
+                self._remove_locked(key)
+            self._stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def tags_with_prefix(self, prefix: str) -> list[str]:
+        """Return the live tags that start with ``prefix``."""
+        with self._lock:
+            return [t for t in self._tags if t.startswith(prefix)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._stats)
+            lookups = out["hits"] + out["misses"]
+            out.update(
+                {
+                    "name": self.name,
+                    "size": len(self._data),
+                    "maxsize": self.maxsize,
+                    "hit_rate": out["hits"] / lookups if lookups else 0.0,
+                },
+            )
+        return out
+
+    def _remove_locked(self, key: Hashable) -> None:
+        _, _, tags = self._data.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
@@ -1,17 +1,22 @@
-"""Compatibility shim for removed websocket_alerts module.
-
-This module provided enterprise-only WebSocket alerting. To avoid
-raising on import during consolidation, provide a lightweight no-op shim
-that preserves the public functions and types. Callers can continue to
-import the names; calls will be logged but won't raise.
+"""Realtime alert delivery over the cross-worker backplane.
+
+Alerts are published as ``user`` (or ``all``) routing messages on the
+process backplane (see ``app.realtime_backplane``). Every worker whose
+WebSocket ConnectionManager is attached to the same backplane delivers them
+to the target user's sockets, whichever worker they are connected to.
+With no manager attached anywhere the alert is simply dropped, as the old
+no-op shim did.
 """
 
 from __future__ import annotations
 
 import logging
+from datetime import UTC, datetime
 from enum import Enum
 from typing import Any
 
+from .realtime_backplane import get_backplane
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,10 +26,15 @@ class AlertSeverity(str, Enum):
     ERROR = "error"
 
 
-class _NoopWebsocketManager:
-    """Minimal async stub that logs calls instead of sending real WS
-    messages.
-    """
+class _BackplaneAlertSender:
+    """Builds alert frames and publishes them on the backplane."""
+
+    async def _to_user(self, user_id: str, alert: dict[str, Any]) -> None:
+        alert["timestamp"] = datetime.now(UTC).isoformat()
+        await get_backplane().publish(
+            {"op": "user", "user_id": user_id, "message": alert}
+        )
+        logger.debug("websocket_alerts: %s -> user=%s", alert["type"], user_id)
 
     async def send_risk_alert(
         self,
@@ -34,11 +44,17 @@ class _NoopWebsocketManager:
         risk_level: str,
         recommendations: list[str],
     ) -> Any:
-        logger.debug(
-            "websocket_alerts.send_risk_alert (noop) user=%s score=%s level=%s",
+        await self._to_user(
             user_id,
-            risk_score,
-            risk_level,
+            {
+                "type": "risk_alert",
+                "data": {
+                    "transaction": transaction_data,
+                    "risk_score": risk_score,
+                    "risk_level": risk_level,
+                    "recommendations": recommendations,
+                },
+            },
         )
 
     async def send_compliance_alert(
@@ -48,12 +64,13 @@ class _NoopWebsocketManager:
         transaction_data: dict[str, Any],
         severity: AlertSeverity = AlertSeverity.WARNING,
     ) -> Any:
-        logger.debug(
-            "websocket_alerts.send_compliance_alert (noop) user=%s "
-            "issue=%s severity=%s",
+        await self._to_user(
             user_id,
-            compliance_issue,
-            severity,
+            {
+                "type": "compliance_alert",
+                "severity": AlertSeverity(severity).value,
+                "data": {"issue": compliance_issue, "transaction": transaction_data},
+            },
         )
 
     async def send_threshold_alert(
@@ -64,14 +81,17 @@ class _NoopWebsocketManager:
         threshold_value: float,
         severity: AlertSeverity = AlertSeverity.WARNING,
     ) -> Any:
-        logger.debug(
-            "websocket_alerts.send_threshold_alert (noop) user=%s "
-            "type=%s current=%s threshold=%s severity=%s",
+        await self._to_user(
             user_id,
-            threshold_type,
-            current_value,
-            threshold_value,
-            severity,
+            {
+                "type": "threshold_alert",
+                "severity": AlertSeverity(severity).value,
+                "data": {
+                    "threshold_type": threshold_type,
+                    "current_value": current_value,
+                    "threshold_value": threshold_value,
+                },
+            },
         )
 
     async def broadcast_system_alert(
@@ -81,15 +101,23 @@ class _NoopWebsocketManager:
         severity: AlertSeverity = AlertSeverity.INFO,
         data: dict[str, Any] | None = None,
     ) -> Any:
-        logger.debug(
-            "websocket_alerts.broadcast_system_alert (noop) title=%s severity=%s",
-            title,
-            severity,
+        await get_backplane().publish(
+            {
+                "op": "all",
+                "message": {
+                    "type": "system_alert",
+                    "severity": AlertSeverity(severity).value,
+                    "title": title,
+                    "message": message,
+                    "data": data or {},
+                    "timestamp": datetime.now(UTC).isoformat(),
+                },
+            }
         )
 
 
-# single instance used by the shimmed functions
-websocket_manager = _NoopWebsocketManager()
+# single instance used by the module-level functions
+websocket_manager = _BackplaneAlertSender()
 
 
 async def send_risk_alert(
@@ -99,7 +127,7 @@ async def send_risk_alert(
     risk_level: str,
     recommendations: list[str],
 ) -> Any:
-    """Send risk alert to user (noop shim)."""
+    """Send risk alert to every connection of ``user_id``."""
     await websocket_manager.send_risk_alert(
         user_id,
         transaction_data,
@@ -115,7 +143,7 @@ async def send_compliance_alert(
     transaction_data: dict[str, Any],
     severity: AlertSeverity = AlertSeverity.WARNING,
 ) -> Any:
-    """Send compliance alert to user (noop shim)."""
+    """Send compliance alert to every connection of ``user_id``."""
     await websocket_manager.send_compliance_alert(
         user_id,
         compliance_issue,
@@ -131,7 +159,7 @@ async def send_threshold_alert(
     threshold_value: float,
     severity: AlertSeverity = AlertSeverity.WARNING,
 ) -> Any:
-    """Send threshold alert to user (noop shim)."""
+    """Send threshold alert to every connection of ``user_id``."""
     await websocket_manager.send_threshold_alert(
         user_id,
         threshold_type,
@@ -147,7 +175,7 @@ async def broadcast_system_alert(
     severity: AlertSeverity = AlertSeverity.INFO,
     data: dict[str, Any] | None = None,
 ) -> Any:
-    """Broadcast system alert to all users (noop shim)."""
+    """Broadcast system alert to all connected users."""
     await websocket_manager.broadcast_system_alert(title, message, severity, data)
 
 
@@ -5,8 +5,8 @@ import like `app.integrations.xrp.fetch_account_tx` or patch those
 functions in tests.
 """
 
-from . import bsc, bscscan, xrp
+from . import bsc, bscscan, http, xrp
 
 # Re-export common helpers (if present) to provide stable import paths
 # Tests expect to be able to patch app.integrations.xrp.fetch_account_tx
-__all__ = ["bsc", "bscscan", "xrp"]
+__all__ = ["bsc", "bscscan", "http", "xrp"]
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 # app / integrations / bscscan.py
+import asyncio
 import os
 import time
-from typing import Any
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any, ClassVar
 
-import requests
+from .http import get_json, stream_json_items
 
 try:
     import importlib
@@ -21,23 +24,15 @@ Transaction = mod.Transaction
 BASE_URL = "https://api.bscscan.com/api"
 DEFAULT_LIMIT = 25
 
+# payload key -> BscScan action
+_ACTIONS = {"normal": "txlist", "token": "tokentx", "internal": "txlistinternal"}
+
 
 def _api_key(explicit: str | None = None) -> str:
     # Prefer explicit key, else env
     return (explicit or os.getenv("BSC_API_KEY") or "").strip()
 
 
-def _get(params: dict[str, Any], api_key: str | None) -> dict[str, Any]:
-    p = dict(params)
-    key = _api_key(api_key)
-    if key:
-        p["apikey"] = key
-    r = requests.get(BASE_URL, params=p, timeout=15)
-    r.raise_for_status()
-    return r.json()
-    # BscScan returns {"status":"1","message":"OK","result":[...]} on success
-
-
 def _wei_to_bnb(x: str) -> float:
     try:
         return int(x) / 1e18
@@ -61,169 +56,241 @@ def _ts_to_iso(sec_str: str) -> str:
         return ""
 
 
-def fetch_account_tx_bscscan(
+def _params(address: str, action: str, limit: int, api_key: str | None) -> dict:
+    p: dict[str, Any] = {
+        "module": "account",
+        "action": action,
+        "address": address,
+        "startblock": 0,
+        "endblock": 99999999,
+        "page": 1,
+        "offset": max(1, min(limit, 10000)),
+        "sort": "desc",
+    }
+    key = _api_key(api_key)
+    if key:
+        p["apikey"] = key
+    return p
+
+
+async def fetch_account_tx_bscscan(
     address: str,
     *,
     limit: int = DEFAULT_LIMIT,
     api_key: str | None = None,
 ) -> dict[str, Any]:
     """Fetch recent normal, token, and internal transactions for an address.
+    The three explorer calls run concurrently on the shared pooled client.
     Returns raw payloads as dict: {
         "normal": [...], "token": [...], "internal": [...]
     }.
     """
-    offset = max(1, min(limit, 10000))
-    common = {
-        "address": address,
-        "startblock": 0,
-        "endblock": 99999999,
-        "page": 1,
-        "offset": offset,
-        "sort": "desc",
-    }
-
-    normal = (
-        _get({"module": "account", "action": "txlist", **common}, api_key).get(
-            "result",
-            [],
+    # BscScan returns {"status":"1","message":"OK","result":[...]} on success
+    responses = await asyncio.gather(
+        *(
+            get_json(BASE_URL, _params(address, a, limit, api_key))
+            for a in _ACTIONS.values()
         )
-        or []
     )
-    tok_params = {"module": "account", "action": "tokentx", **common}
-    token = _get(tok_params, api_key).get("result", []) or []
-
-    int_params = {"module": "account", "action": "txlistinternal", **common}
-    internal = _get(int_params, api_key).get("result", []) or []
+    normal, token, internal = ((r.get("result", []) or []) for r in responses)
 
     return {"normal": normal, "token": token, "internal": internal}
 
 
-def bscscan_json_to_transactions(
+@dataclass(slots=True)
+class BscTxRecord:
+    """One normalized BscScan transfer, kept as plain floats and strings.
+
+    Much lighter than a ``Transaction`` (no Decimal coercion, no instance
+    dict); ``to_row`` feeds the store and ``to_transaction`` builds the
+    model at the API boundary.
+    """
+
+    chain: ClassVar[str] = "BSC"
+
+    tx_id: str
+    timestamp: str
+    from_addr: str
+    to_addr: str
+    amount: float
+    symbol: str
+    direction: str
+    memo: str
+    fee: float = 0.0
+
+    def to_row(self) -> dict[str, Any]:
+        return {
+            "tx_id": self.tx_id,
+            "timestamp": self.timestamp,
+            "chain": self.chain,
+            "from_addr": self.from_addr,
+            "to_addr": self.to_addr,
+            "amount": self.amount,
+            "symbol": self.symbol,
+            "direction": self.direction,
+            "memo": self.memo,
+            "fee": self.fee,
+        }
+
+    def to_transaction(self):
+        return Transaction(**self.to_row())
+
+
+def _direction(acct: str, it: dict[str, Any]) -> str:
+    if (it.get("to") or "").lower() == acct:
+        return "in"
+    if (it.get("from") or "").lower() == acct:
+        return "out"
+    return "other"
+
+
+def _normal_record(acct: str, it: dict[str, Any]) -> BscTxRecord:
+    # Native BNB sends; the fee is paid on these
+    try:
+        fee = int(it.get("gasPrice") or "0") * int(it.get("gasUsed") or "0") / 1e18
+    except Exception:
+        fee = 0.0
+    return BscTxRecord(
+        tx_id=it.get("hash") or "",
+        timestamp=_ts_to_iso(it.get("timeStamp") or ""),
+        from_addr=it.get("from") or "",
+        to_addr=it.get("to") or "",
+        amount=_wei_to_bnb(it.get("value") or "0"),
+        symbol="BNB",
+        direction=_direction(acct, it),
+        memo=(it.get("functionName") or "").strip(),
+        fee=fee,
+    )
+
+
+def _token_record(acct: str, it: dict[str, Any]) -> BscTxRecord:
+    # BEP-20 transfers; the fee is on the parent tx, accounted in "normal"
+    symbol = (it.get("tokenSymbol") or "").upper() or "TOKEN"
+    return BscTxRecord(
+        tx_id=it.get("hash") or "",
+        timestamp=_ts_to_iso(it.get("timeStamp") or ""),
+        from_addr=it.get("from") or "",
+        to_addr=it.get("to") or "",
+        amount=_scale(it.get("value") or "0", it.get("tokenDecimal") or "18"),
+        symbol=symbol,
+        direction=_direction(acct, it),
+        memo=f"{it.get('tokenName') or ''} ({symbol})",
+    )
+
+
+def _internal_record(acct: str, it: dict[str, Any]) -> BscTxRecord:
+    # Value transfers triggered by contracts
+    return BscTxRecord(
+        tx_id=it.get("hash") or "",
+        timestamp=_ts_to_iso(it.get("timeStamp") or ""),
+        from_addr=it.get("from") or "",
+        to_addr=it.get("to") or "",
+        amount=_wei_to_bnb(it.get("value") or "0"),
+        symbol="BNB",
+        direction=_direction(acct, it),
+        memo="internal",
+    )
+
+
+# payload key -> (record builder, field that tells entries of one tx apart)
+_NORMALIZERS: dict[str, tuple[Callable[[str, dict], BscTxRecord], str | None]] = {
+    "normal": (_normal_record, None),
+    "token": (_token_record, "logIndex"),
+    "internal": (_internal_record, "traceId"),
+}
+
+
+def _normalize(kind: str, acct: str, it: Any, seen: set[str]) -> BscTxRecord | None:
+    build, sub = _NORMALIZERS[kind]
+    try:
+        key = str(it.get("hash"))
+        if sub is not None:
+            key = f"{key}#{it.get(sub)}"
+        if key in seen:
+            return None
+        seen.add(key)
+        return build(acct, it)
+    except Exception:
+        return None
+
+
+def iter_records(
+    kind: str,
     account: str,
-    payload: dict[str, Any],
-):
-    """Normalize BscScan payloads into a List[Transaction].
-    Handles native BNB sends, token transfers, and internal txs.
+    items: Iterable[Any],
+    seen: set[str] | None = None,
+) -> Iterator[BscTxRecord]:
+    """Normalize raw ``kind`` entries one at a time, skipping duplicates.
+
+    ``seen`` holds the dedupe keys (hash, plus logIndex/traceId where one tx
+    has several entries); pass the same set across pages of one kind.
     """
     acct = (account or "").lower().strip()
-    items = []
-    # keys are tuples of (category, hash, optional index/trace)
+    seen = set() if seen is None else seen
+    for it in items:
+        rec = _normalize(kind, acct, it, seen)
+        if rec is not None:
+            yield rec
 
-    seen: set[tuple[str, Any, Any]] = set()
 
-    # ---- Normal (native BNB sends)
-    for it in payload.get("normal", []):
-        try:
-            key = ("normal", it.get("hash"), None)
-            if key in seen:
-                continue
-            seen.add(key)
-
-            from_addr = (it.get("from") or "").lower()
-            to_addr = (it.get("to") or "").lower()
-            if to_addr == acct:
-                direction = "in"
-            elif from_addr == acct:
-                direction = "out"
-            else:
-                direction = "other"
-
-            fee = 0.0
-            try:
-                gas_price = int(it.get("gasPrice") or "0")
-                gas_used = int(it.get("gasUsed") or "0")
-                fee = (gas_price * gas_used) / 1e18
-            except Exception:
-                fee = 0.0
-
-            items.append(
-                Transaction(
-                    tx_id=it.get("hash") or "",
-                    timestamp=_ts_to_iso(it.get("timeStamp") or ""),
-                    chain="BSC",
-                    from_addr=it.get("from") or "",
-                    to_addr=it.get("to") or "",
-                    amount=_wei_to_bnb(it.get("value") or "0"),
-                    symbol="BNB",
-                    direction=direction,
-                    memo=(it.get("functionName") or "").strip() or "",
-                    fee=fee,
-                ),
-            )
-        except Exception:
-            continue
-
-    # ---- Token transfers (BEP - 20)
-    for it in payload.get("token", []):
-        try:
-            key = ("token", it.get("hash"), it.get("logIndex"))
-            if key in seen:
-                continue
-            seen.add(key)
-
-            from_addr = (it.get("from") or "").lower()
-            to_addr = (it.get("to") or "").lower()
-            if to_addr == acct:
-                direction = "in"
-            elif from_addr == acct:
-                direction = "out"
-            else:
-                direction = "other"
-
-            amount = _scale(it.get("value") or "0", it.get("tokenDecimal") or "18")
-            symbol = (it.get("tokenSymbol") or "").upper() or "TOKEN"
-
-            items.append(
-                Transaction(
-                    tx_id=it.get("hash") or "",
-                    timestamp=_ts_to_iso(it.get("timeStamp") or ""),
-                    chain="BSC",
-                    from_addr=it.get("from") or "",
-                    to_addr=it.get("to") or "",
-                    amount=amount,
-                    symbol=symbol,
-                    direction=direction,
-                    memo=f"{it.get('tokenName') or ''} ({symbol})",
-                    fee=0.0,  # fee is on the parent tx; accounted in "normal"
-                ),
-            )
-        except Exception:
-            continue
-
-    # ---- Internal tx (value transfers triggered by contracts)
-    for it in payload.get("internal", []):
+async def stream_account_records(
+    address: str,
+    *,
+    limit: int = DEFAULT_LIMIT,
+    api_key: str | None = None,
+    max_buffered: int = 1000,
+) -> AsyncIterator[BscTxRecord]:
+    """Yield normalized records for all three BscScan lists as they decode.
+
+    The three calls still run concurrently; each response is decoded
+    incrementally and its records handed over through a bounded queue, so
+    memory stays at ``max_buffered`` records however large ``limit`` is.
+    Records arrive in no particular order across kinds.
+    """
+    queue: asyncio.Queue[BscTxRecord | None] = asyncio.Queue(max_buffered)
+
+    acct = (address or "").lower().strip()
+
+    async def produce(kind: str) -> None:
+        seen: set[str] = set()
+        params = _params(address, _ACTIONS[kind], limit, api_key)
         try:
-            key = ("internal", it.get("hash"), it.get("traceId"))
-            if key in seen:
-                continue
-            seen.add(key)
-
-            from_addr = (it.get("from") or "").lower()
-            to_addr = (it.get("to") or "").lower()
-            if to_addr == acct:
-                direction = "in"
-            elif from_addr == acct:
-                direction = "out"
+            async for it in stream_json_items(BASE_URL, params):
+                rec = _normalize(kind, acct, it, seen)
+                if rec is not None:
+                    await queue.put(rec)
+        finally:
+            await queue.put(None)
+
+    tasks = [asyncio.create_task(produce(kind)) for kind in _ACTIONS]
+    try:
+        pending = len(tasks)
+        while pending:
+            rec = await queue.get()
+            if rec is None:
+                pending -= 1
             else:
-                direction = "other"
-
-            items.append(
-                Transaction(
-                    tx_id=it.get("hash") or "",
-                    timestamp=_ts_to_iso(it.get("timeStamp") or ""),
-                    chain="BSC",
-                    from_addr=it.get("from") or "",
-                    to_addr=it.get("to") or "",
-                    amount=_wei_to_bnb(it.get("value") or "0"),
-                    symbol="BNB",
-                    direction=direction,
-                    memo="internal",
-                    fee=0.0,
-                ),
-            )
-        except Exception:
-            continue
+                yield rec
+        # Surface the first fetch error, if any
+        await asyncio.gather(*tasks)
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
 
+def bscscan_json_to_transactions(
+    account: str,
+    payload: dict[str, Any],
+):
+    """Normalize BscScan payloads into a List[Transaction].
+    Handles native BNB sends, token transfers, and internal txs.
+    """
+    items = [
+        rec.to_transaction()
+        for kind in _ACTIONS
+        for rec in iter_records(kind, account, payload.get(kind, []))
+    ]
     # newest first
     items.sort(key=lambda x: x.timestamp or "", reverse=True)
     return items
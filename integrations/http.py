@@ -0,0 +1,279 @@
+"""Shared async HTTP client for the chain integrations.
+
+One ``httpx.AsyncClient`` per event loop keeps connections to the RPC and
+explorer hosts alive between calls instead of opening a new TLS session per
+request. ``get_json`` / ``post_json`` retry transport errors, 429 and 5xx
+responses with exponential backoff and raise the last error when retries
+are exhausted. ``stream_json_items`` decodes the items of one top-level
+array (e.g. an explorer's ``result``) as the body arrives, so large pages
+are never held as one parsed document.
+
+Environment variables:
+- INTEGRATIONS_HTTP_TIMEOUT=15        Deadline for one get_json/post_json attempt,
+                                      body included (seconds). Streams use it
+                                      per network read instead.
+- INTEGRATIONS_HTTP_CONNECT_TIMEOUT=5 Connect timeout (seconds).
+- INTEGRATIONS_HTTP_RETRIES=2         Extra attempts after the first.
+- INTEGRATIONS_HTTP_MAX_CONNECTIONS=20
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from collections.abc import AsyncIterator
+from typing import Any
+
+import httpx
+
+__all__ = [
+    "JSONArrayStream",
+    "aclose_client",
+    "get_client",
+    "get_json",
+    "post_json",
+    "stream_json_items",
+]
+
+_RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+_BACKOFF_BASE = 0.25
+
+# (loop, client): an AsyncClient is bound to the loop it first ran on
+_client: tuple[asyncio.AbstractEventLoop, httpx.AsyncClient] | None = None
+
+
+def _attempt_deadline() -> float:
+    return float(os.getenv("INTEGRATIONS_HTTP_TIMEOUT", "15"))
+
+
+def _timeout() -> httpx.Timeout:
+    # Per-phase limits; whole-attempt deadlines are enforced in _send
+    total = _attempt_deadline()
+    connect = float(os.getenv("INTEGRATIONS_HTTP_CONNECT_TIMEOUT", "5"))
+    return httpx.Timeout(total, connect=min(connect, total))
+
+
+def _retries() -> int:
+    return max(0, int(os.getenv("INTEGRATIONS_HTTP_RETRIES", "2")))
+
+
+def get_client() -> httpx.AsyncClient:
+    """Pooled client for the running event loop (created on first use)."""
+    global _client
+    loop = asyncio.get_running_loop()
+    if _client is not None and _client[0] is loop and not _client[1].is_closed:
+        return _client[1]
+    max_conns = int(os.getenv("INTEGRATIONS_HTTP_MAX_CONNECTIONS", "20"))
+    client = httpx.AsyncClient(
+        timeout=_timeout(),
+        limits=httpx.Limits(
+            max_connections=max_conns,
+            max_keepalive_connections=max_conns,
+            keepalive_expiry=30.0,
+        ),
+        headers={"User-Agent": "klerno-integrations"},
+    )
+    _client = (loop, client)
+    return client
+
+
+async def aclose_client() -> None:
+    """Close the pooled client (app shutdown / test teardown)."""
+    global _client
+    if _client is None:
+        return
+    loop, client = _client
+    _client = None
+    if loop is asyncio.get_running_loop():
+        await client.aclose()
+
+
+async def _send(
+    client: httpx.AsyncClient, method: str, url: str, **kwargs
+) -> httpx.Response:
+    """``client.request`` bounded by one deadline for the whole attempt.
+
+    httpx timeouts apply per read, so a body that keeps trickling in would
+    otherwise never time out.
+    """
+    deadline = _attempt_deadline()
+    try:
+        async with asyncio.timeout(deadline):
+            return await client.request(method, url, **kwargs)
+    except TimeoutError as e:
+        msg = f"{method} {url} exceeded {deadline:g}s"
+        raise httpx.TimeoutException(msg) from e
+
+
+async def _request_json(method: str, url: str, retries: int | None, **kwargs) -> Any:
+    attempts = (_retries() if retries is None else retries) + 1
+    client = get_client()
+    for attempt in range(attempts):
+        try:
+            resp = await _send(client, method, url, **kwargs)
+            if resp.status_code in _RETRY_STATUS and attempt + 1 < attempts:
+                await asyncio.sleep(_BACKOFF_BASE * 2**attempt)
+                continue
+            resp.raise_for_status()
+            return resp.json()
+        except httpx.TransportError:
+            if attempt + 1 >= attempts:
+                raise
+            await asyncio.sleep(_BACKOFF_BASE * 2**attempt)
+    raise RuntimeError("unreachable")  # pragma: no cover
+
+
+async def get_json(
+    url: str, params: dict[str, Any] | None = None, *, retries: int | None = None
+) -> Any:
+    return await _request_json("GET", url, retries, params=params)
+
+
+async def post_json(url: str, payload: Any, *, retries: int | None = None) -> Any:
+    return await _request_json("POST", url, retries, json=payload)
+
+
+class JSONArrayStream:
+    """Incremental decoder for the items of the array stored under ``key``.
+
+    ``feed`` takes the body text chunk by chunk and returns the items that
+    are complete so far; only the unfinished tail is buffered. Only a key of
+    the top-level object counts: the same text inside a string or a nested
+    object is skipped. Keys are compared as raw JSON text, so a key written
+    with escape sequences is not recognized. If ``key`` does not hold an
+    array (BscScan puts an error string there), no items are produced.
+    """
+
+    _SEPARATORS = " \t\r\n,"
+    _WHITESPACE = " \t\r\n"
+
+    def __init__(self, key: str = "result") -> None:
+        self._key = key
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._state = "seek"  # seek -> value -> items -> done
+        # Scanner state while seeking the key
+        self._depth = 0
+        self._in_str = False
+        self._escape = False
+        self._chars: list[str] | None = None  # current top-level string
+        self._pending: str | None = None  # last top-level string, colon may follow
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def _seek(self, buf: str) -> int | None:
+        """Scan ``buf`` for the top-level key; return the index after its colon."""
+        for i, ch in enumerate(buf):
+            if self._in_str:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_str = False
+                    if self._chars is not None:
+                        self._pending = "".join(self._chars)
+                        self._chars = None
+                    continue
+                if self._chars is not None:
+                    self._chars.append(ch)
+                    if len(self._chars) > len(self._key):
+                        self._chars = None  # too long to be the key
+                continue
+            if ch in self._WHITESPACE:
+                continue
+            if ch == ":" and self._pending == self._key and self._depth == 1:
+                return i + 1
+            self._pending = None
+            if ch == '"':
+                self._in_str = True
+                self._chars = [] if self._depth == 1 else None
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+        return None
+
+    def feed(self, text: str) -> list[Any]:
+        if self._state == "done":
+            return []
+        buf = self._buf + text
+        self._buf = ""
+        if self._state == "seek":
+            start = self._seek(buf)
+            if start is None:
+                return []
+            self._state, buf = "value", buf[start:]
+        if self._state == "value":
+            buf = buf.lstrip(self._WHITESPACE)
+            if not buf:
+                return []
+            if buf[0] != "[":
+                self._state = "done"
+                return []
+            self._state, buf = "items", buf[1:]
+
+        items: list[Any] = []
+        pos, end = 0, len(buf)
+        while True:
+            while pos < end and buf[pos] in self._SEPARATORS:
+                pos += 1
+            if pos >= end:
+                break
+            if buf[pos] == "]":
+                self._state = "done"
+                break
+            try:
+                item, stop = self._decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # unfinished item; wait for the next chunk
+            if stop >= end and not isinstance(item, dict | list | str):
+                break  # a bare number may continue in the next chunk
+            items.append(item)
+            pos = stop
+        self._buf = "" if self._state == "done" else buf[pos:]
+        return items
+
+    def close(self) -> None:
+        """Raise ``ValueError`` if the body ended inside the array."""
+        if self._state == "items":
+            raise ValueError("response ended inside the JSON array")
+
+
+async def stream_json_items(
+    url: str,
+    params: dict[str, Any] | None = None,
+    *,
+    key: str = "result",
+    retries: int | None = None,
+) -> AsyncIterator[Any]:
+    """Yield the items of the top-level ``key`` array of a GET response.
+
+    Failures before the first item is yielded are retried like
+    ``get_json``; once items have been handed out an error propagates, so
+    callers never see an item twice.
+    """
+    attempts = (_retries() if retries is None else retries) + 1
+    client = get_client()
+    for attempt in range(attempts):
+        yielded = False
+        try:
+            async with client.stream("GET", url, params=params) as resp:
+                if resp.status_code not in _RETRY_STATUS or attempt + 1 >= attempts:
+                    resp.raise_for_status()
+                    decoder = JSONArrayStream(key)
+                    async for text in resp.aiter_text():
+                        for item in decoder.feed(text):
+                            yielded = True
+                            yield item
+                        if decoder.done:
+                            break
+                    decoder.close()
+                    return
+        except httpx.TransportError:
+            if yielded or attempt + 1 >= attempts:
+                raise
+        await asyncio.sleep(_BACKOFF_BASE * 2**attempt)
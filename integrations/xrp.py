@@ -4,7 +4,7 @@ import os
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
-import requests
+from .http import post_json
 
 if TYPE_CHECKING:
     # Avoid requiring app.models to be importable at type-check time
@@ -62,14 +62,26 @@ def xrpl_json_to_transactions(account: str, tx_list: list[dict]):
 # --- Read - only XRPL fetch (public endpoint) ---
 
 
-def fetch_account_tx(account: str, limit: int = 10) -> list[dict]:
-    """Uses XRPL JSON - RPC 'account_tx' to fetch recent transactions for an account.
-    Read - only. No keys. Safe to try.
-    """
-    url = os.getenv(
+class XRPLRPCError(RuntimeError):
+    """JSON-RPC call answered with ``status: error`` (``code`` is rippled's)."""
+
+    def __init__(self, code: str, result: dict[str, Any]) -> None:
+        super().__init__(result.get("error_message") or code)
+        self.code = code
+        self.result = result
+
+
+def _rpc_url() -> str:
+    return os.getenv(
         "XRPL_RPC_URL",
         "https://s1.ripple.com:51234",
     )  # public Ripple server
+
+
+async def fetch_account_tx(account: str, limit: int = 10) -> list[dict]:
+    """Uses XRPL JSON - RPC 'account_tx' to fetch recent transactions for an account.
+    Read - only. No keys. Safe to try. Runs on the shared pooled client.
+    """
     payload = {
         "method": "account_tx",
         "params": [
@@ -82,9 +94,7 @@ def fetch_account_tx(account: str, limit: int = 10) -> list[dict]:
         ],
     }
     try:
-        r = requests.post(url, json=payload, timeout=15)
-        r.raise_for_status()
-        data = r.json()
+        data = await post_json(_rpc_url(), payload)
         # XRPL returns {"result": {"transactions": [...]}}
         return data.get("result", {}).get("transactions", [])
     except Exception:
@@ -92,6 +102,38 @@ def fetch_account_tx(account: str, limit: int = 10) -> list[dict]:
         return []
 
 
+async def fetch_account_tx_page(
+    account: str,
+    *,
+    ledger_index_min: int = -1,
+    ledger_index_max: int = -1,
+    marker: Any = None,
+    limit: int = 200,
+    forward: bool = True,
+) -> dict[str, Any]:
+    """One page of 'account_tx'; returns the raw ``result``.
+
+    The result carries ``transactions``, the ledger bounds actually searched
+    and, when more pages remain, an opaque ``marker`` to pass back unchanged
+    (with the same ledger bounds). Unlike ``fetch_account_tx`` errors are
+    raised: ``XRPLRPCError`` for RPC errors, httpx errors for transport.
+    """
+    params: dict[str, Any] = {
+        "account": account,
+        "ledger_index_min": int(ledger_index_min),
+        "ledger_index_max": int(ledger_index_max),
+        "limit": int(limit),
+        "forward": bool(forward),
+    }
+    if marker is not None:
+        params["marker"] = marker
+    data = await post_json(_rpc_url(), {"method": "account_tx", "params": [params]})
+    result = data.get("result", {}) if isinstance(data, dict) else {}
+    if result.get("status") == "error":
+        raise XRPLRPCError(str(result.get("error") or "unknown"), result)
+    return result
+
+
 def get_xrpl_client():
     """Return a simple client factory. Tests will patch this to provide a mock.
 
@@ -10,8 +10,11 @@
 # ===================================================================
 
 import asyncio
+import contextlib
 import json
+import os
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 from fastapi import FastAPI, Request, WebSocket
@@ -19,10 +22,36 @@ from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-# Import the WebSocket manager
-from realtime_websocket_server import manager, websocket_endpoint
+from app.realtime_backplane import get_backplane
 
-app = FastAPI(title="Klerno Labs Enterprise Platform")
+# Import the WebSocket manager
+from realtime_websocket_server import MetricsAggregator, manager, websocket_endpoint
+
+# Request metrics are rolled up and published once per interval to the
+# "performance_metrics" room and the SSE stream
+metrics = MetricsAggregator(
+    interval=float(os.getenv("REALTIME_METRICS_INTERVAL", "1.0")),
+)
+SSE_HEARTBEAT_SECONDS = 30.0
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Share rooms, user messages, alerts and presence with the other workers
+    backplane = get_backplane()
+    manager.attach_backplane(backplane)
+    await backplane.start()
+    publisher = asyncio.create_task(metrics.run(manager))
+    try:
+        yield
+    finally:
+        publisher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await publisher
+        await backplane.close()
+
+
+app = FastAPI(title="Klerno Labs Enterprise Platform", lifespan=lifespan)
 
 # Static files and templates
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -93,19 +122,27 @@ async def update_realtime_data(data: dict):
 # Server-sent events endpoint for fallback
 @app.get("/api/realtime/events")
 async def realtime_events(request: Request):
-    """Server-sent events endpoint for browsers that don't support WebSockets."""
-
-    async def event_stream():
-        while True:
-            # Check if client is still connected
-            if await request.is_disconnected():
-                break
+    """Server-sent events endpoint for browsers that don't support WebSockets.
 
-            # Send heartbeat
-            yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': datetime.now().isoformat()})}\n\n"
+    Streams the periodic performance summaries, with a heartbeat when idle.
+    """
 
-            # Wait before next heartbeat
-            await asyncio.sleep(30)
+    async def event_stream():
+        summaries = metrics.subscribe()
+        try:
+            while True:
+                # Check if client is still connected
+                if await request.is_disconnected():
+                    break
+                try:
+                    text = await asyncio.wait_for(
+                        summaries.get(), SSE_HEARTBEAT_SECONDS
+                    )
+                    yield f"event: performance_summary\ndata: {text}\n\n"
+                except TimeoutError:
+                    yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': datetime.now().isoformat()})}\n\n"
+        finally:
+            metrics.unsubscribe(summaries)
 
     return StreamingResponse(
         event_stream(),
@@ -121,26 +158,19 @@ async def realtime_events(request: Request):
 @app.middleware("http")
 async def realtime_middleware(request: Request, call_next):
     """Middleware to track user activity and real-time metrics."""
-    start_time = time.time()
+    start_time = time.perf_counter()
 
     # Process request
     response = await call_next(request)
 
-    # Calculate processing time
-    process_time = time.time() - start_time
-
-    # Broadcast performance metrics
-    await manager.broadcast(
-        {
-            "type": "performance_metric",
-            "data": {
-                "endpoint": str(request.url.path),
-                "method": request.method,
-                "process_time": process_time,
-                "status_code": response.status_code,
-            },
-            "timestamp": datetime.now().isoformat(),
-        },
+    # Aggregate by route template so path parameters don't explode the keys
+    route = request.scope.get("route")
+    endpoint = getattr(route, "path", None) or request.url.path
+    metrics.record(
+        request.method,
+        endpoint,
+        time.perf_counter() - start_time,
+        response.status_code,
     )
 
     return response
@@ -3,22 +3,113 @@
 # Elite Real-Time Features for FastAPI
 # ===================================================================
 
+import asyncio
+import contextlib
 import json
 import logging
+import random
 import uuid
+from collections import deque
 from datetime import datetime
 
 from fastapi import WebSocket, WebSocketDisconnect
 
+logger = logging.getLogger(__name__)
+
+# Slow-consumer policies for a full outbound queue
+DROP_OLDEST = "drop_oldest"
+DISCONNECT = "disconnect"
+
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_SEND_TIMEOUT = 10.0
+
+
+class Outbox:
+    """Bounded outbound queue drained by one writer task per connection.
+
+    Broadcasts only append an already-serialized frame here, so a client
+    that reads slowly delays nobody but itself. When the queue is full the
+    manager's policy applies: drop the oldest queued frame, or report
+    overflow so the connection is closed.
+    """
+
+    __slots__ = ("websocket", "frames", "maxlen", "dropped", "task", "_ready", "_idle")
+
+    def __init__(self, websocket: WebSocket, maxlen: int) -> None:
+        self.websocket = websocket
+        self.frames: deque[str] = deque()
+        self.maxlen = maxlen
+        self.dropped = 0
+        self.task: asyncio.Task | None = None
+        self._ready = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def push(self, frame: str, policy: str) -> bool:
+        """Queue ``frame``; False means the queue overflowed under DISCONNECT."""
+        if len(self.frames) >= self.maxlen:
+            if policy == DISCONNECT:
+                return False
+            self.frames.popleft()
+            self.dropped += 1
+        self.frames.append(frame)
+        self._idle.clear()
+        self._ready.set()
+        return True
+
+    async def run(self, send_timeout: float) -> None:
+        """Send queued frames in order until cancelled or a send fails."""
+        frames = self.frames
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            while frames:
+                await asyncio.wait_for(
+                    self.websocket.send_text(frames.popleft()), send_timeout
+                )
+            self._idle.set()
+
+    async def wait_idle(self) -> None:
+        await self._idle.wait()
+
+    def close(self) -> None:
+        """Discard pending frames and stop the writer (unless it is the caller)."""
+        self.frames.clear()
+        self._idle.set()
+        if self.task is not None and self.task is not asyncio.current_task():
+            self.task.cancel()
+
 
 class ConnectionManager:
-    """Manages WebSocket connections and real-time communication."""
+    """Manages WebSocket connections and real-time communication.
 
-    def __init__(self) -> None:
+    Every connection gets an ``Outbox`` (bounded queue + writer task);
+    messages are JSON-encoded once per broadcast and the same frame is
+    queued for each recipient. ``slow_consumer`` picks what happens when a
+    client falls ``queue_size`` frames behind: ``"drop_oldest"`` discards
+    its oldest pending frame, ``"disconnect"`` closes the connection. A
+    single send taking longer than ``send_timeout`` also drops the client.
+    """
+
+    def __init__(
+        self,
+        *,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        slow_consumer: str = DROP_OLDEST,
+        send_timeout: float = DEFAULT_SEND_TIMEOUT,
+    ) -> None:
+        if slow_consumer not in (DROP_OLDEST, DISCONNECT):
+            raise ValueError(f"unknown slow_consumer policy: {slow_consumer!r}")
+        self.queue_size = queue_size
+        self.slow_consumer = slow_consumer
+        self.send_timeout = send_timeout
         self.active_connections: dict[str, WebSocket] = {}
+        self.outboxes: dict[str, Outbox] = {}
         self.user_sessions: dict[str, dict] = {}
         self.room_connections: dict[str, set[str]] = {}
         self.user_presence: dict[str, dict] = {}
+        self._closing: set[asyncio.Task] = set()
+        self.backplane = None
 
     async def connect(self, websocket: WebSocket, user_id: str | None = None):
         """Accept WebSocket connection and register user."""
@@ -26,6 +117,9 @@ class ConnectionManager:
 
         connection_id = str(uuid.uuid4())
         self.active_connections[connection_id] = websocket
+        outbox = Outbox(websocket, self.queue_size)
+        outbox.task = asyncio.create_task(self._writer(connection_id, outbox))
+        self.outboxes[connection_id] = outbox
 
         if not user_id:
             user_id = f"user_{connection_id[:8]}"
@@ -47,6 +141,8 @@ class ConnectionManager:
             ],
         }
 
+        self._sync_presence()
+
         # Notify others about user joining
         await self.broadcast_user_presence(user_id, "joined")
 
@@ -60,6 +156,13 @@ class ConnectionManager:
 
             # Remove connection
             del self.active_connections[connection_id]
+            outbox = self.outboxes.pop(connection_id, None)
+            if outbox is not None:
+                outbox.close()
+            for room_id, members in list(self.room_connections.items()):
+                members.discard(connection_id)
+                if not members:
+                    del self.room_connections[room_id]
 
             if connection_id in self.user_sessions:
                 del self.user_sessions[connection_id]
@@ -78,43 +181,70 @@ class ConnectionManager:
                     await self.broadcast_user_presence(user_id, "left")
 
                 self.user_presence[user_id]["connections"] = connections
+                self._sync_presence()
+
+    async def _writer(self, connection_id: str, outbox: Outbox) -> None:
+        try:
+            await outbox.run(self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Send failed or timed out: the client is gone or too slow
+            await self.disconnect(connection_id)
+            await self._close(outbox.websocket)
+
+    async def _deliver(self, frame: str, connection_ids) -> None:
+        """Queue one serialized frame per connection; apply the overflow policy."""
+        overflowed = []
+        policy = self.slow_consumer
+        outboxes = self.outboxes
+        for connection_id in connection_ids:
+            outbox = outboxes.get(connection_id)
+            if outbox is not None and not outbox.push(frame, policy):
+                overflowed.append(connection_id)
+        for connection_id in overflowed:
+            outbox = outboxes.get(connection_id)
+            if outbox is None:
+                continue
+            logger.info("Closing slow WebSocket consumer %s", connection_id)
+            await self.disconnect(connection_id)
+            # Closing may block on the same stalled socket; don't wait for it
+            task = asyncio.get_running_loop().create_task(self._close(outbox.websocket))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def _close(self, websocket: WebSocket) -> None:
+        # 1013: try again later
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(websocket.close(code=1013), self.send_timeout)
+
+    def _recipients(self, connection_ids, exclude_user: str | None):
+        if not exclude_user:
+            return connection_ids
+        sessions = self.user_sessions
+        return [
+            cid
+            for cid in connection_ids
+            if sessions.get(cid, {}).get("user_id") != exclude_user
+        ]
 
     async def send_personal_message(self, message: str, connection_id: str) -> None:
         """Send message to specific connection."""
-        if connection_id in self.active_connections:
-            websocket = self.active_connections[connection_id]
-            try:
-                await websocket.send_text(message)
-            except Exception:
-                await self.disconnect(connection_id)
+        await self._deliver(message, (connection_id,))
 
     async def send_to_user(self, message: dict, user_id: str) -> None:
         """Send message to all connections of a specific user."""
-        if user_id in self.user_presence:
-            connections = self.user_presence[user_id].get("connections", [])
-            for connection_id in connections[
-                :
-            ]:  # Copy to avoid modification during iteration
-                await self.send_personal_message(json.dumps(message), connection_id)
+        await self._publish({"op": "user", "user_id": user_id, "message": message})
 
     async def broadcast(self, message: dict, exclude_user: str | None = None) -> None:
-        """Broadcast message to all connected users."""
-        message_json = json.dumps(message)
-        disconnected = []
-
-        for connection_id, websocket in self.active_connections.items():
-            session = self.user_sessions.get(connection_id, {})
-            if exclude_user and session.get("user_id") == exclude_user:
-                continue
+        """Broadcast message to all connected users.
 
-            try:
-                await websocket.send_text(message_json)
-            except Exception:
-                disconnected.append(connection_id)
-
-        # Clean up disconnected connections
-        for connection_id in disconnected:
-            await self.disconnect(connection_id)
+        Encodes once and only queues the frame; delivery happens on each
+        connection's writer task.
+        """
+        await self._publish(
+            {"op": "all", "message": message, "exclude_user": exclude_user}
+        )
 
     async def broadcast_to_room(
         self,
@@ -123,12 +253,74 @@ class ConnectionManager:
         exclude_user: str | None = None,
     ) -> None:
         """Broadcast message to all users in a specific room."""
-        if room_id in self.room_connections:
-            for connection_id in list(self.room_connections[room_id]):
-                session = self.user_sessions.get(connection_id, {})
-                if exclude_user and session.get("user_id") == exclude_user:
-                    continue
-                await self.send_personal_message(json.dumps(message), connection_id)
+        await self._publish(
+            {
+                "op": "room",
+                "room_id": room_id,
+                "message": message,
+                "exclude_user": exclude_user,
+            }
+        )
+
+    # ----- cross-worker routing -----
+
+    def attach_backplane(self, backplane) -> None:
+        """Route user/room/broadcast messages through ``backplane``.
+
+        The backplane delivers to this worker's sockets directly and to
+        every other worker sharing it; presence is shared the same way.
+        """
+        self.backplane = backplane
+        backplane.subscribe(self._route)
+        self._sync_presence()
+
+    async def _publish(self, routed: dict) -> None:
+        if self.backplane is not None:
+            await self.backplane.publish(routed)
+        else:
+            await self._route(routed)
+
+    async def _route(self, routed: dict) -> None:
+        """Deliver a routing message to the matching sockets on this worker."""
+        op = routed.get("op")
+        if op == "user":
+            presence = self.user_presence.get(routed.get("user_id"), {})
+            targets = list(presence.get("connections", []))
+        elif op == "room":
+            targets = list(self.room_connections.get(routed.get("room_id"), ()))
+        elif op == "all":
+            targets = list(self.outboxes)
+        else:
+            return
+        targets = self._recipients(targets, routed.get("exclude_user"))
+        if targets:
+            await self._deliver(json.dumps(routed["message"], default=str), targets)
+
+    def _sync_presence(self) -> None:
+        if self.backplane is not None:
+            self.backplane.set_presence(
+                {
+                    user_id: len(p.get("connections", []))
+                    for user_id, p in self.user_presence.items()
+                    if p.get("connections")
+                }
+            )
+
+    async def flush(self, timeout: float | None = None) -> None:
+        """Wait until every queued frame has been handed to its socket."""
+        waits = [o.wait_idle() for o in list(self.outboxes.values())]
+        if waits:
+            await asyncio.wait_for(asyncio.gather(*waits), timeout)
+
+    def queue_stats(self) -> dict:
+        """Queued and dropped frame counts across connections."""
+        outboxes = list(self.outboxes.values())
+        return {
+            "connections": len(outboxes),
+            "queued": sum(len(o.frames) for o in outboxes),
+            "max_queued": max((len(o.frames) for o in outboxes), default=0),
+            "dropped": sum(o.dropped for o in outboxes),
+        }
 
     async def join_room(self, connection_id: str, room_id: str) -> None:
         """Add user to a room."""
@@ -188,18 +380,29 @@ class ConnectionManager:
         )
 
     def get_active_users(self) -> list[dict]:
-        """Get list of active users."""
+        """Get list of active users (on every worker when a backplane is attached)."""
+        counts = (
+            self.backplane.presence()
+            if self.backplane is not None
+            else {
+                user_id: len(p.get("connections", []))
+                for user_id, p in self.user_presence.items()
+                if p.get("status") == "online"
+            }
+        )
         active_users = []
-        for user_id, presence in self.user_presence.items():
-            if presence.get("status") == "online":
-                active_users.append(
-                    {
-                        "user_id": user_id,
-                        "status": presence.get("status"),
-                        "last_seen": presence.get("last_seen"),
-                        "connection_count": len(presence.get("connections", [])),
-                    },
-                )
+        for user_id, count in counts.items():
+            if count <= 0:
+                continue
+            presence = self.user_presence.get(user_id, {})
+            active_users.append(
+                {
+                    "user_id": user_id,
+                    "status": "online",
+                    "last_seen": presence.get("last_seen"),
+                    "connection_count": count,
+                },
+            )
         return active_users
 
     def get_room_members(self, room_id: str) -> list[str]:
@@ -216,6 +419,145 @@ class ConnectionManager:
         return list(set(members))  # Remove duplicates
 
 
+# Room that receives performance summaries (join it to subscribe)
+METRICS_ROOM = "performance_metrics"
+
+
+class _EndpointStats:
+    """Counters plus a fixed-size latency reservoir for one endpoint."""
+
+    __slots__ = ("count", "total", "max", "statuses", "samples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.statuses: dict[str, int] = {}
+        self.samples: list[float] = []
+
+    def add(self, seconds: float, status: int, reservoir: int) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        klass = f"{status // 100}xx"
+        self.statuses[klass] = self.statuses.get(klass, 0) + 1
+        # Reservoir sampling keeps percentiles cheap under any request rate
+        if len(self.samples) < reservoir:
+            self.samples.append(seconds)
+        else:
+            i = random.randrange(self.count)
+            if i < reservoir:
+                self.samples[i] = seconds
+
+    def summary(self, method: str, endpoint: str) -> dict:
+        samples = sorted(self.samples)
+
+        def pct(q: float) -> float:
+            i = min(len(samples) - 1, int(q * len(samples)))
+            return round(samples[i] * 1000, 2)
+
+        return {
+            "endpoint": endpoint,
+            "method": method,
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 2),
+            "p50_ms": pct(0.5),
+            "p95_ms": pct(0.95),
+            "max_ms": round(self.max * 1000, 2),
+            "status": self.statuses,
+        }
+
+
+class MetricsAggregator:
+    """Collects request metrics in-process and publishes one summary per interval.
+
+    ``record`` is a constant-time update meant for HTTP middleware; every
+    ``interval`` seconds ``run`` sends a single ``performance_summary`` frame
+    to the members of ``room`` and to SSE subscribers, instead of one
+    message per request per client. Endpoints beyond ``max_endpoints`` in a
+    window are folded into ``"other"``.
+    """
+
+    def __init__(
+        self,
+        *,
+        interval: float = 1.0,
+        room: str = METRICS_ROOM,
+        reservoir: int = 128,
+        max_endpoints: int = 200,
+        subscriber_queue: int = 8,
+    ) -> None:
+        self.interval = interval
+        self.room = room
+        self.reservoir = reservoir
+        self.max_endpoints = max_endpoints
+        self.subscriber_queue = subscriber_queue
+        self._window: dict[tuple[str, str], _EndpointStats] = {}
+        self._subscribers: set[asyncio.Queue] = set()
+
+    def record(self, method: str, endpoint: str, seconds: float, status: int) -> None:
+        key = (method, endpoint)
+        stats = self._window.get(key)
+        if stats is None:
+            if len(self._window) >= self.max_endpoints:
+                key = (method, "other")
+                stats = self._window.get(key)
+            if stats is None:
+                stats = self._window[key] = _EndpointStats()
+        stats.add(seconds, status, self.reservoir)
+
+    def snapshot(self) -> dict | None:
+        """Summary frame for the current window (then reset), or None if idle."""
+        window, self._window = self._window, {}
+        if not window:
+            return None
+        endpoints = [
+            stats.summary(method, endpoint)
+            for (method, endpoint), stats in window.items()
+        ]
+        endpoints.sort(key=lambda e: e["count"], reverse=True)
+        return {
+            "type": "performance_summary",
+            "interval": self.interval,
+            "requests": sum(e["count"] for e in endpoints),
+            "endpoints": endpoints,
+            "timestamp": datetime.now().isoformat(),
+        }
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue receiving each summary as JSON text (SSE); newest wins when full."""
+        queue: asyncio.Queue = asyncio.Queue(self.subscriber_queue)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    async def publish(self, connections: ConnectionManager) -> dict | None:
+        frame = self.snapshot()
+        if frame is None:
+            return None
+        if self.room in connections.room_connections:
+            await connections.broadcast_to_room(frame, self.room)
+        if self._subscribers:
+            text = json.dumps(frame)
+            for queue in list(self._subscribers):
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(text)
+        return frame
+
+    async def run(self, connections: ConnectionManager) -> None:
+        """Publish every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.publish(connections)
+            except Exception:
+                logger.exception("Publishing performance summary failed")
+
+
 # Global connection manager
 manager = ConnectionManager()
 
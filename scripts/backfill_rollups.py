@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Rebuild the analytics rollup tables from txs.
+
+Run once after upgrading a database whose txs rows predate the rollups, or
+after txs was modified outside app.store (imports, manual deletes).
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+# Allow running as a script from the repo root or the scripts folder
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import store  # noqa: E402
+
+
+def main() -> int:
+    store.init_db()
+    started = time.perf_counter()
+    count = store.backfill_rollups()
+    elapsed = time.perf_counter() - started
+    print(f"rollups rebuilt from {count} txs in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Benchmark camt.053 parsing on a generated statement of a given size.
+
+Writes a statement of roughly --size-mb megabytes to a temporary file, then
+times ``iter_camt053_entries`` (streaming) and, unless --skip-full is given,
+``parse_camt053`` (whole document in memory), reporting entries/s and the
+peak traced memory of each.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Allow running as a script from the repo root or the scripts folder
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.iso20022_compliance import ISO20022Parser  # noqa: E402
+
+NS = "urn:iso:std:iso:20022:tech:xsd:camt.053.001.10"
+
+
+def _entry(i: int) -> str:
+    return (
+        f"<Ntry><NtryRef>R{i}</NtryRef>"
+        f'<Amt Ccy="EUR">{i % 10_000}.{i % 100:02d}</Amt>'
+        f"<CdtDbtInd>{'CRDT' if i % 2 else 'DBIT'}</CdtDbtInd>"
+        "<Sts><Cd>BOOK</Cd></Sts><BookgDt><Dt>2025-01-02</Dt></BookgDt>"
+        "<ValDt><Dt>2025-01-02</Dt></ValDt><NtryDtls><TxDtls>"
+        f"<RmtInf><Ustrd>invoice {i}</Ustrd></RmtInf></TxDtls></NtryDtls></Ntry>\n"
+    )
+
+
+def write_statement(path: Path, size_mb: float) -> int:
+    """Write a single-statement camt.053 of about ``size_mb`` MB; return entries."""
+    target = int(size_mb * 1_000_000)
+    written = count = 0
+    with path.open("w", encoding="utf-8") as fh:
+        head = (
+            f'<Document xmlns="{NS}"><BkToCstmrStmt><GrpHdr><MsgId>BENCH</MsgId>'
+            "<CreDtTm>2025-01-02T00:00:00</CreDtTm></GrpHdr><Stmt><Id>S1</Id>"
+            "<Acct><Id><IBAN>DE89370400440532013000</IBAN></Id></Acct>\n"
+        )
+        fh.write(head)
+        written += len(head)
+        while written < target:
+            chunk = "".join(_entry(count + i) for i in range(1000))
+            fh.write(chunk)
+            written += len(chunk)
+            count += 1000
+        fh.write("</Stmt></BkToCstmrStmt></Document>\n")
+    return count
+
+
+def _measure(label: str, fn) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:>6}: {count:,} entries in {elapsed:.1f}s "
+        f"({count / elapsed:,.0f}/s), peak {peak / 1e6:,.1f} MB"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=100.0)
+    parser.add_argument("--skip-full", action="store_true")
+    args = parser.parse_args()
+
+    iso = ISO20022Parser()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "camt053.xml"
+        entries = write_statement(path, args.size_mb)
+        size = path.stat().st_size / 1e6
+        print(f"generated {size:,.1f} MB statement with {entries:,} entries")
+
+        _measure("stream", lambda: sum(1 for _ in iso.iter_camt053_entries(str(path))))
+        if not args.skip_full:
+            _measure(
+                "full",
+                lambda: len(
+                    iso.parse_camt053(path.read_text(encoding="utf-8"))["statement"][
+                        "transactions"
+                    ]
+                ),
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
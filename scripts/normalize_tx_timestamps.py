@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""Rewrite txs timestamps into the stored UTC ISO form.
+
+Run once after upgrading a database with rows written before timestamps
+were normalized (``str(datetime)`` text with a space separator or a UTC
+offset). Rollups are rebuilt when any row changed. Safe to re-run.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+# Allow running as a script from the repo root or the scripts folder
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import store  # noqa: E402
+
+
+def main() -> int:
+    store.init_db()
+    started = time.perf_counter()
+    count = store.normalize_tx_timestamps()
+    elapsed = time.perf_counter() - started
+    print(f"normalized {count} tx timestamps in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Sync the full validated XRPL history of one or more accounts into txs.
+
+Safe to re-run: each call resumes from the stored checkpoint (an
+interrupted run continues from its marker; a finished one only fetches
+newer ledgers). Set XRPL_RPC_URL to choose the rippled server.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Allow running as a script from the repo root or the scripts folder
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import store, xrpl_sync  # noqa: E402
+from integrations.http import aclose_client  # noqa: E402
+
+
+async def _run(accounts: list[str], page_size: int, max_pages: int | None) -> None:
+    try:
+        for account in accounts:
+            summary = await xrpl_sync.sync_account(
+                account, page_size=page_size, max_pages=max_pages
+            )
+            state = "complete" if summary["complete"] else "partial"
+            print(
+                f"{account}: {summary['stored']} txs in {summary['pages']} pages "
+                f"({state}, last ledger {summary['last_ledger']})"
+            )
+    finally:
+        await aclose_client()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("accounts", nargs="+", help="classic r-addresses")
+    parser.add_argument("--page-size", type=int, default=xrpl_sync.DEFAULT_PAGE_SIZE)
+    parser.add_argument("--max-pages", type=int, default=None)
+    args = parser.parse_args()
+    store.init_db()
+    asyncio.run(_run(args.accounts, args.page_size, args.max_pages))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -250,6 +250,105 @@ def mock_xrpl_client() -> Mock:
     return mock_client
 
 
+class MockChainServer:
+    """Local HTTP server standing in for XRPL JSON-RPC and BscScan.
+
+    ``responses`` maps a JSON-RPC ``method`` (POST) or BscScan ``action``
+    query parameter (GET) to a JSON payload, to a list of
+    ``(status, payload)`` tuples served in order (the last one repeats), or
+    to a callable taking the request body and returning a payload.
+    ``delay`` slows every response so tests can observe concurrency.
+    """
+
+    def __init__(self) -> None:
+        import json
+        import threading
+        import time
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlparse
+
+        self.responses: dict[str, Any] = {}
+        self.requests: list[dict[str, Any]] = []
+        self.delay = 0.0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def log_message(self, *args: Any) -> None:
+                return
+
+            def _serve(self, key: str, body: Any) -> None:
+                with server._lock:
+                    server.requests.append(
+                        {"key": key, "body": body, "port": self.client_address[1]}
+                    )
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                    spec = server.responses.get(key, {})
+                    status, payload = 200, spec
+                    if isinstance(spec, list):
+                        status, payload = spec.pop(0) if len(spec) > 1 else spec[0]
+                    elif callable(spec):
+                        payload = spec(body)
+                try:
+                    if server.delay:
+                        time.sleep(server.delay)
+                    data = json.dumps(payload).encode()
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                finally:
+                    with server._lock:
+                        server.active -= 1
+
+            def do_GET(self) -> None:
+                query = parse_qs(urlparse(self.path).query)
+                self._serve(query.get("action", [""])[0], query)
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                self._serve(body.get("method", ""), body)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def mock_chain_server() -> Generator[MockChainServer, None, None]:
+    """Local mock of the XRPL / BscScan HTTP APIs."""
+    server = MockChainServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def fresh_store(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Generator[Any, None, None]:
+    """``app.store`` on a new, initialized SQLite file under ``tmp_path``."""
+    from app import store
+
+    db = tmp_path / "store.db"
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{db.as_posix()}")
+    store.init_db()
+    yield store
+    store.close_pools()
+
+
 @pytest.fixture
 def sample_iso20022_message() -> str:
     """Create a sample ISO 20022 message for testing."""
@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip("sklearn")
+
+from app import advanced_ai_risk  # noqa: E402
+from app.advanced_ai_risk import AdvancedAIRiskEngine  # noqa: E402
+
+TXS = [
+    {
+        "amount": amount,
+        "timestamp": f"2025-01-01T{hour:02d}:30:00",
+        "from_address": f"r{i}",
+    }
+    for i, (amount, hour) in enumerate([(5.0, 12), (25000.0, 3), (900.0, 23)])
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return AdvancedAIRiskEngine(model_dir=tmp_path)
+
+
+def test_training_data_shape_and_labels(engine) -> None:
+    X, y = engine._generate_training_data()
+    assert X.shape == (10000, 6)
+    assert set(y.tolist()) <= {1, 2, 3}
+    assert 0 <= X[:, 2].min() and X[:, 2].max() <= 23
+
+
+def test_batch_matches_single_scoring(engine) -> None:
+    batch = engine.analyze_transactions_batch(TXS)
+    singles = [engine.analyze_transaction(tx) for tx in TXS]
+    assert [r.overall_score for r in batch] == pytest.approx(
+        [r.overall_score for r in singles],
+    )
+    assert [r.risk_level for r in batch] == [r.risk_level for r in singles]
+    assert engine.analyze_transactions_batch([]) == []
+    with pytest.raises(ValueError, match="align"):
+        engine.analyze_transactions_batch(TXS, [[]])
+
+
+def test_models_are_persisted_and_reloaded(engine, tmp_path, monkeypatch) -> None:
+    assert engine.model_path.exists()
+
+    def _no_training(self) -> None:
+        raise AssertionError("models should come from disk")
+
+    monkeypatch.setattr(AdvancedAIRiskEngine, "_initialize_models", _no_training)
+    reloaded = AdvancedAIRiskEngine(model_dir=tmp_path)
+    assert reloaded.is_trained
+    assert reloaded.analyze_transaction(TXS[1]).overall_score == pytest.approx(
+        engine.analyze_transaction(TXS[1]).overall_score,
+    )
+
+    engine.model_path.write_bytes(b"not a pickle")
+    assert not engine._load_models()
+
+
+def test_models_from_another_version_are_ignored(engine, monkeypatch) -> None:
+    monkeypatch.setattr(advanced_ai_risk, "MODEL_VERSION", "0")
+    assert not engine._load_models()
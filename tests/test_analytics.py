@@ -1,5 +1,7 @@
 """Tests for advanced analytics functionality."""
 
+from datetime import UTC
+
 import pytest
 
 from app.analytics import AdvancedAnalytics, AnalyticsMetrics, InsightsEngine
@@ -16,10 +18,11 @@ def test_empty_analytics() -> None:
     conn.execute("DELETE FROM txs")  # Changed from 'transactions' to 'txs'
     conn.commit()
     conn.close()
+    # Raw SQL bypasses the store, so bring the analytics rollups back in step
+    store.backfill_rollups()
 
     # Clear ALL cache entries to ensure fresh data
     store._cache.clear()
-    store._cache_expiry.clear()
     store._clear_cache_pattern("list_all")
 
     try:
@@ -136,5 +139,99 @@ def test_network_hub_insights() -> None:
     assert len(hub_insights) > 0
 
 
+def test_metrics_window_is_applied_in_sql(fresh_store) -> None:
+    """Rows outside the `days` window are excluded, however many there are."""
+    from datetime import datetime, timedelta
+
+    store = fresh_store
+    now = datetime.now(UTC).replace(tzinfo=None, minute=0, second=0)
+
+    def _tx(i: int, age: timedelta, risk: float, category: str | None) -> dict:
+        return {
+            "tx_id": f"tx{i}",
+            "timestamp": (now - age).isoformat(),
+            "chain": "XRP",
+            "from_addr": f"rA{i % 2}",
+            "to_addr": "rB",
+            "amount": 10.0,
+            "symbol": "XRP",
+            "direction": "out",
+            "category": category,
+            "risk_score": risk,
+            "risk_flags": [],
+        }
+
+    store.save_tagged_many(
+        [
+            _tx(1, timedelta(hours=1), 0.9, "fee"),
+            _tx(2, timedelta(hours=1), 0.5, None),
+            _tx(3, timedelta(days=2), 0.1, "fee"),
+            _tx(4, timedelta(days=45), 0.9, "trade"),
+        ],
+    )
+    metrics = AdvancedAnalytics().generate_comprehensive_metrics(days=30)
+
+    assert metrics.total_transactions == 3
+    assert metrics.total_volume == 30.0
+    assert (metrics.high_risk_count, metrics.medium_risk_count) == (1, 1)
+    assert metrics.low_risk_count == 1
+    assert metrics.category_distribution == {"fee": 2, "unknown": 1}
+    assert metrics.unique_addresses == 3
+    assert [d["transaction_count"] for d in metrics.risk_trend] == [1, 2]
+    assert len(metrics.hourly_activity) == 24
+    hour = (now - timedelta(hours=1)).hour
+    assert metrics.hourly_activity[hour]["transaction_count"] >= 2
+
+
+def test_window_includes_datetime_rows_on_the_cutoff_day(fresh_store) -> None:
+    """Timestamps stored from datetimes compare correctly against ``since``."""
+    from datetime import datetime, timedelta, timezone
+
+    store = fresh_store
+
+    def _tx(i: int, ts: object) -> dict:
+        return {
+            "tx_id": f"tx{i}",
+            "timestamp": ts,
+            "chain": "XRP",
+            "from_addr": "rA",
+            "to_addr": "rB",
+            "amount": 1.0,
+            "symbol": "XRP",
+            "direction": "out",
+            "risk_score": 0.1,
+            "risk_flags": [],
+        }
+
+    since = "2025-01-10T06:00:00"
+    store.save_tagged_many(
+        [
+            _tx(1, datetime(2025, 1, 10, 7)),  # naive, taken as UTC
+            _tx(2, datetime(2025, 1, 10, 8, tzinfo=timezone(timedelta(hours=2)))),
+            _tx(3, datetime(2025, 1, 10, 7, 30, tzinfo=timezone(timedelta(hours=3)))),
+            _tx(4, datetime(2025, 1, 9, 23)),
+        ],
+    )
+    # A row written before normalization, as str(datetime)
+    with store._connection() as con:
+        con.execute(
+            "INSERT INTO txs (tx_id, timestamp, amount) VALUES (?, ?, ?)",
+            ("legacy", "2025-01-10 09:00:00", 1.0),
+        )
+        con.commit()
+    assert store.normalize_tx_timestamps() == 1
+    assert store.normalize_tx_timestamps() == 0
+    agg = store.window_aggregates(since, 0.33, 0.66)
+    stored = sorted(r["timestamp"] for r in store.iter_txs(since=since))
+
+    assert agg["totals"]["n"] == 3
+    assert [(d["day"], d["n"]) for d in agg["daily"]] == [("2025-01-10", 3)]
+    assert stored == [
+        "2025-01-10T06:00:00",
+        "2025-01-10T07:00:00",
+        "2025-01-10T09:00:00",
+    ]
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
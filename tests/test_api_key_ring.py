@@ -0,0 +1,143 @@
+import os
+import time
+
+from app.security.api_keys import ApiKeyRing
+
+
+def _ring(tmp_path, monkeypatch, **kwargs) -> ApiKeyRing:
+    monkeypatch.delenv("TEST_RING_KEY", raising=False)
+    return ApiKeyRing(
+        env_vars=("TEST_RING_KEY",),
+        key_file=tmp_path / "api_key.secret",
+        meta_file=tmp_path / "api_key.meta",
+        **kwargs,
+    )
+
+
+def test_file_key_is_cached_between_refreshes(tmp_path, monkeypatch) -> None:
+    ring = _ring(tmp_path, monkeypatch, refresh_interval=3600)
+    assert not ring.configured()
+    ring.key_file.write_text("sk-first\n", encoding="utf-8")
+    # Not re-checked until the refresh interval elapses or reload() runs
+    assert not ring.matches("sk-first")
+    ring.reload()
+    assert ring.matches("sk-first")
+    assert ring.primary() == "sk-first"
+    assert ring.source() == "file"
+
+    loads = ring.stats()["loads"]
+    for _ in range(100):
+        ring.matches("sk-first")
+    assert ring.stats()["loads"] == loads
+
+
+def test_file_changes_are_picked_up_by_polling(tmp_path, monkeypatch) -> None:
+    ring = _ring(tmp_path, monkeypatch, refresh_interval=0)
+    ring.key_file.write_text("sk-one\n", encoding="utf-8")
+    assert ring.matches("sk-one")
+    ring.key_file.write_text("sk-two-longer\n", encoding="utf-8")
+    assert ring.matches("sk-two-longer")
+    assert not ring.matches("sk-one")
+
+
+def test_rotation_keeps_previous_key_for_grace_period(tmp_path, monkeypatch) -> None:
+    ring = _ring(tmp_path, monkeypatch, refresh_interval=3600)
+    ring.rotate("sk-old-key-0001")
+    previews = ring.rotate("sk-new-key-0002", grace_seconds=60)
+    assert previews == {
+        "old_key_preview": "sk-o...0001",
+        "new_key_preview": "sk-n...0002",
+    }
+    assert ring.primary() == "sk-new-key-0002"
+    assert ring.matches("sk-old-key-0001")
+    assert ring.matches(" sk-new-key-0002 ")
+    assert ring.stats()["active_keys"] == 2
+
+    monkeypatch.setattr(time, "time", lambda: 10**12)
+    assert not ring.matches("sk-old-key-0001")
+    assert ring.matches("sk-new-key-0002")
+    assert ring.meta_file.exists()
+
+
+def test_env_keys_take_priority(tmp_path, monkeypatch) -> None:
+    ring = _ring(tmp_path, monkeypatch, refresh_interval=0)
+    ring.key_file.write_text("sk-file\n", encoding="utf-8")
+    monkeypatch.setenv("TEST_RING_KEY", "sk-new, sk-old")
+    assert ring.primary() == "sk-new"
+    assert ring.matches("sk-old")
+    assert not ring.matches("sk-file")
+    assert not ring.matches("")
+    assert ring.source() == "env"
+
+
+def test_request_paths_verify_from_memory(tmp_path, monkeypatch) -> None:
+    """API-key checks on live request paths do no env or key-file reads."""
+    from fastapi import Depends, FastAPI
+    from fastapi.testclient import TestClient
+
+    from app import security
+    from app.core import security as core_security
+    from app.main import app
+    from app.paywall import PAYWALL_CODE
+
+    ring = _ring(tmp_path, monkeypatch, refresh_interval=3600)
+    ring.rotate("sk-live-key-0001")
+    monkeypatch.setattr(security, "api_key_ring", ring)
+    monkeypatch.setattr(core_security, "api_key_ring", ring)
+
+    def no_io(*_args, **_kwargs):
+        raise AssertionError("key file read on the request path")
+
+    env_reads: list[str] = []
+    real_getenv = os.getenv
+
+    def getenv(name, default=None):
+        env_reads.append(name)
+        return real_getenv(name, default)
+
+    monkeypatch.setattr(ring, "_read_file_entries", no_io)
+    monkeypatch.setattr(ring, "_file_signature", no_io)
+    monkeypatch.setattr(os, "getenv", getenv)
+    loads = ring.stats()["loads"]
+
+    api = FastAPI()
+
+    @api.get("/pkg", dependencies=[Depends(security.enforce_api_key)])
+    def pkg() -> dict:
+        return {"ok": True}
+
+    @api.get("/core", dependencies=[Depends(core_security.enforce_api_key)])
+    def core() -> dict:
+        return {"ok": True}
+
+    client = TestClient(api)
+    for path in ("/pkg", "/core"):
+        for _ in range(20):
+            ok = client.get(path, headers={"X-API-Key": "sk-live-key-0001"})
+            assert ok.status_code == 200
+        assert client.get(path, headers={"X-API-Key": "sk-guess"}).status_code == 401
+
+    r = TestClient(app).post(
+        "/paywall/verify", data={"code": PAYWALL_CODE}, follow_redirects=False
+    )
+    assert r.headers["location"] == "/dashboard"
+    assert "sk-live-key-0001" not in str(r.headers)
+    assert not {"TEST_RING_KEY", "X_API_KEY", "API_KEY"} & set(env_reads)
+    assert ring.stats()["loads"] == loads
+
+
+def test_package_rotation_keeps_old_key_in_grace(tmp_path, monkeypatch) -> None:
+    from app import security
+
+    ring = _ring(tmp_path, monkeypatch, refresh_interval=3600)
+    ring.rotate("sk-previous-0001")
+    monkeypatch.setattr(security, "api_key_ring", ring)
+
+    new_key = security.rotate_api_key()
+    assert security.expected_api_key() == new_key
+    assert security.api_key_matches(new_key)
+    assert security.api_key_matches("sk-previous-0001")
+    preview = security.preview_api_key()
+    assert preview["configured"] is True
+    assert preview["source"] == "file"
+    assert preview["preview"] == new_key[:4] + "..." + new_key[-4:]
@@ -0,0 +1,60 @@
+import json
+import logging
+import threading
+
+from app.audit_logger import (
+    AuditEvent,
+    AuditEventType,
+    AuditQueueHandler,
+    JSONFormatter,
+)
+
+
+def _logger(handler: AuditQueueHandler, name: str) -> logging.Logger:
+    handler.setFormatter(JSONFormatter())
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    return logger
+
+
+def test_records_are_written_in_batches_and_rotated(tmp_path) -> None:
+    path = tmp_path / "audit.log"
+    handler = AuditQueueHandler(path, batch_size=50, max_bytes=4096, backup_count=2)
+    logger = _logger(handler, "test.audit.rotate")
+    event = AuditEvent(event_type=AuditEventType.API_ACCESS, resource="/x")
+    for i in range(200):
+        logger.info("event %d", i, extra={"audit_event": event})
+    assert handler.wait_drained(timeout=5)
+
+    stats = handler.stats()
+    assert stats["written"] == 200
+    assert stats["dropped"] == 0
+    assert stats["batches"] < 200
+    assert stats["rotations"] >= 1
+    assert (tmp_path / "audit.log.1").exists()
+    assert not (tmp_path / "audit.log.3").exists()
+    lines = (tmp_path / "audit.log.1").read_text().splitlines()
+    entry = json.loads(lines[0])
+    assert entry["audit_event"]["event_type"] == "api.access"
+    handler.close()
+    logger.removeHandler(handler)
+
+
+def test_full_queue_drops_and_counts(tmp_path) -> None:
+    handler = AuditQueueHandler(tmp_path / "audit.log", max_queue=5)
+    logger = _logger(handler, "test.audit.drop")
+    gate = threading.Event()
+    write = handler._write
+    handler._write = lambda records: (gate.wait(5), write(records))
+    for i in range(50):
+        logger.info("event %d", i)
+    stats = handler.stats()
+    assert stats["dropped"] > 0
+    assert stats["enqueued"] + stats["dropped"] == 50
+    gate.set()
+    assert handler.wait_drained(timeout=5)
+    assert handler.stats()["written"] == stats["enqueued"]
+    handler.close()
+    logger.removeHandler(handler)
@@ -0,0 +1,165 @@
+"""Tests for the streaming BscScan normalizer and incremental JSON decoding."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app import bsc_sync, store
+from integrations import bscscan, http
+
+ACCT = "0xAcc"
+
+
+def _normal(i: int, **extra) -> dict:
+    return {
+        "hash": f"0xn{i}",
+        "timeStamp": str(1_700_000_000 + i),
+        "from": "0xacc" if i % 2 else "0xother",
+        "to": "0xother" if i % 2 else "0xacc",
+        "value": str(10**18 * (i + 1)),
+        "gasPrice": "5000000000",
+        "gasUsed": "21000",
+        "functionName": " transfer ",
+        **extra,
+    }
+
+
+def _token(i: int, log_index: str = "0") -> dict:
+    return {
+        "hash": f"0xt{i}",
+        "logIndex": log_index,
+        "timeStamp": str(1_700_000_500 + i),
+        "from": "0xother",
+        "to": "0xACC",
+        "value": "2500000",
+        "tokenDecimal": "6",
+        "tokenSymbol": "usdt",
+        "tokenName": "Tether",
+    }
+
+
+def _internal(i: int) -> dict:
+    return {
+        "hash": f"0xi{i}",
+        "traceId": "0",
+        "timeStamp": str(1_699_999_000 + i),
+        "from": "0xcontract",
+        "to": "0xacc",
+        "value": str(10**17),
+    }
+
+
+def test_array_stream_matches_json_loads_for_any_chunking() -> None:
+    payload = {
+        "status": "1",
+        "message": "OK",
+        "result": [_normal(0), [1, 2], "s,]", 12345, True, None, {"n": {"x": []}}],
+    }
+    text = json.dumps(payload, indent=1)
+    for size in (1, 3, 7, len(text)):
+        decoder = http.JSONArrayStream("result")
+        items = []
+        for i in range(0, len(text), size):
+            items.extend(decoder.feed(text[i : i + size]))
+        decoder.close()
+        assert items == payload["result"], size
+
+
+def test_array_stream_error_result_and_truncation() -> None:
+    decoder = http.JSONArrayStream("result")
+    assert decoder.feed('{"status":"0","result":"Max rate limit reached"}') == []
+    assert decoder.done
+
+    decoder = http.JSONArrayStream("result")
+    assert decoder.feed('{"result":[{"a":1},{"a"') == [{"a": 1}]
+    with pytest.raises(ValueError):
+        decoder.close()
+
+
+def test_array_stream_only_matches_the_top_level_key() -> None:
+    text = json.dumps(
+        {
+            "message": 'quoted "result": [0] and \\"result\\":[0]',
+            "meta": {"result": [1], "list": [{"result": [2]}]},
+            "result": [3, {"result": [4]}],
+        },
+    )
+    for size in (1, 2, 5, len(text)):
+        decoder = http.JSONArrayStream("result")
+        items = []
+        for i in range(0, len(text), size):
+            items.extend(decoder.feed(text[i : i + size]))
+        assert items == [3, {"result": [4]}], size
+
+
+def test_json_to_transactions_normalizes_and_dedupes() -> None:
+    payload = {
+        "normal": [_normal(1), _normal(1), _normal(2)],
+        "token": [_token(1), _token(1), _token(1, log_index="1")],
+        "internal": [_internal(1), "garbage"],
+    }
+    txs = bscscan.bscscan_json_to_transactions(ACCT, payload)
+
+    assert [t.tx_id for t in txs] == ["0xt1", "0xt1", "0xn2", "0xn1", "0xi1"]
+    out, inbound = txs[3], txs[2]
+    assert (out.direction, inbound.direction) == ("out", "in")
+    assert float(out.amount) == 2.0
+    assert float(out.fee) == pytest.approx(0.000105)
+    assert out.memo == "transfer"
+    token = txs[0]
+    assert (token.symbol, float(token.amount), token.memo) == (
+        "USDT",
+        2.5,
+        "Tether (USDT)",
+    )
+    assert txs[-1].memo == "internal"
+    assert txs[0].chain == "BSC"
+
+
+@pytest.fixture
+def explorer(mock_chain_server, monkeypatch):
+    monkeypatch.setattr(bscscan, "BASE_URL", f"{mock_chain_server.url}/api")
+    normal = [_normal(i) for i in range(300)] + [_normal(5)]
+    mock_chain_server.responses.update(
+        {
+            "txlist": {"status": "1", "message": "OK", "result": normal},
+            "tokentx": {"status": "1", "result": [_token(i) for i in range(40)]},
+            "txlistinternal": {"status": "0", "result": "No transactions found"},
+        }
+    )
+    return mock_chain_server
+
+
+@pytest.mark.asyncio
+async def test_stream_records_merges_lists_with_bounded_buffer(explorer) -> None:
+    try:
+        records = [
+            r
+            async for r in bscscan.stream_account_records(
+                ACCT, limit=1000, max_buffered=8
+            )
+        ]
+    finally:
+        await http.aclose_client()
+
+    assert len(records) == 340
+    assert {r.symbol for r in records} == {"BNB", "USDT"}
+    assert all(isinstance(r, bscscan.BscTxRecord) for r in records)
+    assert not hasattr(records[0], "__dict__")
+    assert explorer.requests[0]["body"]["offset"] == ["1000"]
+
+
+@pytest.mark.asyncio
+async def test_store_account_history_writes_batches(explorer, fresh_store) -> None:
+    try:
+        summary = await bsc_sync.store_account_history(ACCT, limit=1000, batch_size=64)
+    finally:
+        await http.aclose_client()
+
+    assert summary == {"address": ACCT, "stored": 340, "batches": 6}
+    rows = store.list_all(limit=1000)
+    assert len(rows) == 340
+    assert {r["chain"] for r in rows} == {"BSC"}
+    assert all(r["category"] for r in rows)
@@ -0,0 +1,77 @@
+import json
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+def _tx(i: int) -> dict:
+    return {
+        "tx_id": f"tx{i}",
+        "timestamp": "2025-01-01T00:00:00",
+        "chain": "XRP",
+        "from_addr": "rA",
+        "to_addr": "rB",
+        "amount": float(i),
+        "symbol": "XRP",
+        "direction": "out",
+        "risk_flags": ["x"] if i % 2 else [],
+    }
+
+
+def _count(path: str) -> int:
+    con = sqlite3.connect(path)
+    try:
+        return con.execute("SELECT COUNT(*) FROM txs").fetchone()[0]
+    finally:
+        con.close()
+
+
+def test_save_tagged_many_inserts_all_rows(fresh_store) -> None:
+    store = fresh_store
+    path = store._sqlite_path()
+    store.list_all(limit=10)  # warm the cache
+
+    n = store.BULK_INSERT_CHUNK + 5
+    assert store.save_tagged_many(_tx(i) for i in range(n)) == n
+    assert _count(path) == n
+    assert len(store.list_all(limit=10)) == 10
+
+
+def test_save_tagged_many_is_atomic(fresh_store) -> None:
+    store = fresh_store
+    path = store._sqlite_path()
+    rows = [_tx(1), {"tx_id": "broken"}]
+    with pytest.raises(KeyError):
+        store.save_tagged_many(rows)
+    assert _count(path) == 0
+
+
+def test_bulk_endpoint_accepts_json_array_and_ndjson(fresh_store) -> None:
+    path = fresh_store._sqlite_path()
+    from app.main import app
+
+    client = TestClient(app)
+    r = client.post("/transactions/bulk", json=[{"amount": 1}, {"amount": 2}])
+    assert r.status_code == 201
+    assert r.json() == {"inserted": 2}
+
+    body = "\n".join(json.dumps({"amount": i, "tx_id": f"n{i}"}) for i in range(3))
+    r = client.post(
+        "/transactions/bulk",
+        content=body + "\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert r.status_code == 201
+    assert r.json() == {"inserted": 3}
+    assert _count(path) == 5
+
+
+def test_bulk_endpoint_rejects_bad_items(fresh_store) -> None:
+    path = fresh_store._sqlite_path()
+    from app.main import app
+
+    client = TestClient(app)
+    r = client.post("/transactions/bulk", json=[{"amount": 1}, {"amount": -1}])
+    assert r.status_code == 422
+    assert _count(path) == 0
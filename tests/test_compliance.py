@@ -33,3 +33,36 @@ def test_internal_transfer() -> None:
     tx = T(memo="move funds", from_address="rA", to_address="rB")
     cats = tag_categories(tx, address_book=book)
     assert cats[0].category in {"transfer", "income", "expense"}
+
+
+def test_keyword_matcher_finds_overlapping_keywords() -> None:
+    from app.compliance import KeywordMatcher
+
+    matcher = KeywordMatcher(
+        {"fee": ["network fee", "network", "fee"], "trade": ["fee", "swap"]},
+    )
+    hits = matcher.scan("Network Fee for swap")
+    assert [matcher.entries[i][0] for i in hits] == ["fee"] * 3 + ["trade"] * 2
+    assert matcher.scan("networking feed") == []
+    assert matcher.scan_many(["swap", "", "gas fee"]) == [[4], [], [2, 3]]
+
+
+def test_tag_categories_batch_matches_single() -> None:
+    from app.compliance import tag_categories_batch
+
+    book = AddressBook(owned={"rA", "rB"})
+    txs = [
+        T(memo="network fee", amount=Decimal(-1), fee=Decimal("0.1")),
+        T(memo="swap reward", direction="in"),
+        T(memo="gasoline purchase", amount=Decimal(-10)),
+        T(memo="move funds", from_address="rA", to_address="rB"),
+        T(memo=None),
+    ]
+
+    def _key(results):
+        return [(r.category, r.score, [x.reason for x in r.reasons]) for r in results]
+
+    batch = tag_categories_batch(txs, address_book=book)
+    assert [_key(r) for r in batch] == [
+        _key(tag_categories(tx, address_book=book)) for tx in txs
+    ]
@@ -0,0 +1,109 @@
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+
+from app.db_pool import PoolTimeoutError, SQLitePool
+
+
+def _factory(path: Path):
+    def _connect():
+        con = sqlite3.connect(str(path), check_same_thread=False)
+        con.row_factory = sqlite3.Row
+        return con
+
+    return _connect
+
+
+def test_connections_are_reused(tmp_path: Path) -> None:
+    db = tmp_path / "pool.db"
+    pool = SQLitePool(_factory(db), str(db), max_size=2)
+
+    con = pool.acquire()
+    raw = con.raw
+    con.close()
+    con2 = pool.acquire()
+    assert con2.raw is raw
+    con2.close()
+
+    stats = pool.stats()
+    assert stats["created"] == 1
+    assert stats["reused"] == 1
+    assert stats["in_use"] == 0
+    assert stats["idle"] == 1
+
+
+def test_pool_is_bounded(tmp_path: Path) -> None:
+    db = tmp_path / "pool.db"
+    pool = SQLitePool(_factory(db), str(db), max_size=1, acquire_timeout=0.05)
+
+    held = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    held.close()
+    pool.acquire().close()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_release_rolls_back_uncommitted_work(tmp_path: Path) -> None:
+    db = tmp_path / "pool.db"
+    pool = SQLitePool(_factory(db), str(db), max_size=1)
+
+    with pool.acquire() as con:
+        con.execute("CREATE TABLE t (x INTEGER)")
+
+    con = pool.acquire()
+    con.execute("INSERT INTO t VALUES (1)")
+    con.close()  # no commit
+
+    con = pool.acquire()
+    assert con.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    con.close()
+
+
+def test_idle_connections_are_reaped(tmp_path: Path) -> None:
+    db = tmp_path / "pool.db"
+    pool = SQLitePool(_factory(db), str(db), idle_timeout=0.01)
+
+    pool.acquire().close()
+    time.sleep(0.02)
+    assert pool.reap_idle() == 1
+    assert pool.stats()["idle"] == 0
+
+
+def test_replaced_database_file_fails_health_check(tmp_path: Path) -> None:
+    db = tmp_path / "pool.db"
+    pool = SQLitePool(_factory(db), str(db))
+
+    con = pool.acquire()
+    raw = con.raw
+    con.close()
+    db.unlink()
+    sqlite3.connect(str(db)).close()
+
+    con = pool.acquire()
+    assert con.raw is not raw
+    con.close()
+    assert pool.stats()["health_check_failures"] == 1
+
+
+def test_dropped_proxy_frees_its_slot(tmp_path: Path) -> None:
+    db = tmp_path / "pool.db"
+    pool = SQLitePool(_factory(db), str(db), max_size=1, acquire_timeout=0.5)
+
+    con = pool.acquire()
+    del con
+    pool.acquire().close()
+    assert pool.stats()["discarded"] == 1
+
+
+def test_store_conn_draws_from_pool(fresh_store) -> None:
+    store = fresh_store
+    for _ in range(3):
+        store.users_count()
+
+    stats = [s for s in store.pool_stats() if s["name"].endswith("store.db")]
+    assert len(stats) == 1
+    assert stats[0]["created"] == 1
+    assert stats[0]["reused"] >= 2
@@ -18,3 +18,41 @@ def test_large_outgoing_risk() -> None:
     score, flags = score_risk(tx)
     assert score > 0
     assert "large_outgoing" in flags
+
+
+def test_score_risk_batch_matches_scalar() -> None:
+    import random
+    from decimal import Decimal
+
+    from app.guardian import score_risk_batch
+
+    rng = random.Random(7)
+    memos = [None, "", "Rent", "SCAM alert", "tornado mixer", "scamixer", "hacked"]
+    rows: list = [
+        Transaction(
+            tx_id="m",
+            timestamp=datetime.now(UTC),
+            chain="XRP",
+            from_addr="rA",
+            to_addr="rB",
+            amount=Decimal("100.0000000000000000001"),
+            symbol="XRP",
+            direction="out",
+        ),
+    ]
+    for _ in range(2000):
+        rows.append(
+            {
+                "amount": rng.choice(
+                    [0, 100, 1000, 10000, 7, "12.5", None, rng.uniform(-2e4, 2e4)],
+                ),
+                "fee": rng.choice([0, 0.07, 1, None, Decimal("0.5"), rng.random()]),
+                "direction": rng.choice(["out", "IN", "debit", "credit", None]),
+                "memo": rng.choice(memos),
+                "tags": rng.choice([[], ["Mixer"], ["sanctioned"], None]),
+                "is_internal": rng.random() < 0.1,
+            },
+        )
+
+    assert score_risk_batch(rows) == [score_risk(r) for r in rows]
+    assert score_risk_batch([]) == []
@@ -0,0 +1,123 @@
+"""Tests for the pooled async integration HTTP layer (against a local server)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from integrations import bscscan, http, xrp
+
+ACCOUNT_TX = {"result": {"transactions": [{"tx": {"hash": "ABC"}}]}}
+
+
+@pytest.fixture(autouse=True)
+def _fast_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(http, "_BACKOFF_BASE", 0.0)
+
+
+@pytest.mark.asyncio
+async def test_xrpl_fetch_reuses_pooled_connection(
+    mock_chain_server, monkeypatch
+) -> None:
+    monkeypatch.setenv("XRPL_RPC_URL", mock_chain_server.url)
+    mock_chain_server.responses["account_tx"] = ACCOUNT_TX
+    try:
+        first = await xrp.fetch_account_tx("rAcct", limit=5)
+        second = await xrp.fetch_account_tx("rAcct", limit=5)
+    finally:
+        await http.aclose_client()
+
+    assert first == second == [{"tx": {"hash": "ABC"}}]
+    reqs = mock_chain_server.requests
+    assert reqs[0]["body"]["params"][0]["limit"] == 5
+    # Keep-alive: both calls went over the same client socket
+    assert reqs[0]["port"] == reqs[1]["port"]
+
+
+@pytest.mark.asyncio
+async def test_xrpl_fetch_retries_transient_errors(
+    mock_chain_server, monkeypatch
+) -> None:
+    monkeypatch.setenv("XRPL_RPC_URL", mock_chain_server.url)
+    mock_chain_server.responses["account_tx"] = [(503, {}), (200, ACCOUNT_TX)]
+    try:
+        txs = await xrp.fetch_account_tx("rAcct")
+    finally:
+        await http.aclose_client()
+    assert len(txs) == 1
+    assert len(mock_chain_server.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_xrpl_fetch_returns_empty_when_retries_exhausted(
+    mock_chain_server, monkeypatch
+) -> None:
+    monkeypatch.setenv("XRPL_RPC_URL", mock_chain_server.url)
+    monkeypatch.setenv("INTEGRATIONS_HTTP_RETRIES", "1")
+    mock_chain_server.responses["account_tx"] = [(500, {})]
+    try:
+        assert await xrp.fetch_account_tx("rAcct") == []
+    finally:
+        await http.aclose_client()
+    assert len(mock_chain_server.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_bscscan_calls_fan_out_concurrently(
+    mock_chain_server, monkeypatch
+) -> None:
+    monkeypatch.setattr(bscscan, "BASE_URL", f"{mock_chain_server.url}/api")
+    monkeypatch.setenv("BSC_API_KEY", "k")
+    mock_chain_server.delay = 0.2
+    for action in ("txlist", "tokentx", "txlistinternal"):
+        mock_chain_server.responses[action] = {"status": "1", "result": [{"a": action}]}
+    try:
+        payload = await bscscan.fetch_account_tx_bscscan("0xabc", limit=3)
+    finally:
+        await http.aclose_client()
+
+    assert payload == {
+        "normal": [{"a": "txlist"}],
+        "token": [{"a": "tokentx"}],
+        "internal": [{"a": "txlistinternal"}],
+    }
+    assert mock_chain_server.max_active == 3
+    query = mock_chain_server.requests[0]["body"]
+    assert query["apikey"] == ["k"]
+    assert query["offset"] == ["3"]
+
+
+class _Trickle(httpx.AsyncByteStream):
+    """Response body that arrives a few bytes at a time."""
+
+    def __init__(self, body: bytes, delay: float) -> None:
+        self.body = body
+        self.delay = delay
+
+    async def __aiter__(self):
+        for i in range(0, len(self.body), 4):
+            await asyncio.sleep(self.delay)
+            yield self.body[i : i + 4]
+
+
+@pytest.mark.asyncio
+async def test_attempt_deadline_covers_a_trickling_body(monkeypatch) -> None:
+    monkeypatch.setenv("INTEGRATIONS_HTTP_TIMEOUT", "0.2")
+    body = json.dumps({"result": list(range(20))}).encode()
+    delays = [0.05, 0.0]  # first attempt trickles for ~1s, the retry is fast
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, stream=_Trickle(body, delays.pop(0)))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(http, "_client", (asyncio.get_running_loop(), client))
+    try:
+        assert await http.get_json("http://chain.test", retries=1) == json.loads(body)
+        delays[:] = [0.05]
+        with pytest.raises(httpx.TimeoutException):
+            await http.get_json("http://chain.test", retries=0)
+    finally:
+        await http.aclose_client()
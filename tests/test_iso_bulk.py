@@ -0,0 +1,123 @@
+"""Tests and benchmark for bulk pain.001 validation and streaming output."""
+
+from __future__ import annotations
+
+import io
+import tracemalloc
+
+import pytest
+
+from app.iso20022_compliance import (
+    ISO20022Manager,
+    ISO20022MessageBuilder,
+    ISO20022Parser,
+    ISO20022Validator,
+)
+
+DEBTOR_IBAN = "DE89370400440532013000"
+CREDITOR_IBAN = "GB29NWBK60161331926819"
+
+
+def payout(i: int, **overrides) -> dict:
+    item = {
+        "instruction_id": f"I{i}",
+        "end_to_end_id": f"E{i}",
+        "amount": {"value": f"{i}.{i % 100:02d}", "currency": "EUR"},
+        "debtor": {"name": "Klerno Treasury"},
+        "creditor": {"name": f"Payee <{i}> & Co"},
+        "debtor_account": DEBTOR_IBAN,
+        "creditor_account": CREDITOR_IBAN,
+        "payment_purpose": "SALA",
+        "execution_date": "2025-02-01",
+        "remittance_info": f"payout {i}" if i % 2 else None,
+    }
+    item.update(overrides)
+    return item
+
+
+def batch(n: int) -> dict:
+    return {
+        "message_id": "BULK-1",
+        "creation_datetime": "2025-01-02T03:04:05Z",
+        "initiating_party": {"name": "Klerno"},
+        "payment_instructions": [payout(i) for i in range(n)],
+    }
+
+
+def test_iban_and_bic_checks() -> None:
+    v = ISO20022Validator()
+    assert v.validate_iban(DEBTOR_IBAN)
+    assert v.validate_iban("gb29 nwbk 6016 1331 9268 19")
+    assert not v.validate_iban("GB29NWBK60161331926818")  # checksum
+    assert not v.validate_iban("DE8937040044053201300")  # length for DE
+    assert not v.validate_iban("1234")
+    assert v.validate_bic("DEUTDEFF")
+    assert v.validate_bic("deutdeff500")
+    assert not v.validate_bic("DEUT1EFF")
+    assert not v.validate_bic("DEUTDEFF5")
+
+
+def test_batch_validation_reports_failing_rows_only() -> None:
+    rows = [
+        payout(0),
+        payout(1, amount={"value": "1.00", "currency": "XXX"}),
+        payout(2, creditor_account="GB29NWBK60161331926818"),
+        payout(3, debtor_account="", amount={"value": "1,5", "currency": "EUR"}),
+        payout(4),
+    ]
+    failures = ISO20022Validator().validate_payment_batch(rows)
+
+    assert sorted(failures) == [1, 2, 3]
+    assert failures[1][0].startswith("INVALID_FIELD:")
+    assert failures[2] == ["INVALID_IBAN: Creditor account invalid"]
+    assert failures[3] == [
+        "INVALID_AMOUNT: Amount format invalid",
+        "MISSING_FIELD: Debtor account required",
+    ]
+    relaxed = ISO20022Validator().validate_payment_batch(rows, check_accounts=False)
+    assert sorted(relaxed) == [1, 3]
+
+
+def test_bulk_document_matches_regular_builder() -> None:
+    data = batch(25)
+    builder, parser = ISO20022MessageBuilder(), ISO20022Parser()
+    streamed = parser.parse_pain001("".join(builder.iter_pain001_bulk(data)))
+    regular = parser.parse_pain001(builder.build_pain001_message(data))
+
+    assert streamed == regular
+    assert streamed["group_header"]["number_of_transactions"] == "25"
+    assert streamed["group_header"]["control_sum"] == "303.00"
+    assert len(streamed["payment_instructions"]) == 25
+
+
+def test_write_bulk_validates_before_writing() -> None:
+    mgr = ISO20022Manager()
+    data = batch(3)
+    out = io.StringIO()
+    assert mgr.write_bulk_pain001(data, out) == 3
+    assert out.getvalue().count("<CdtTrfTxInf>") == 3
+
+    data["payment_instructions"][1]["creditor_account"] = "GB00BAD"
+    out = io.StringIO()
+    with pytest.raises(ValueError, match="1 invalid payment instructions"):
+        mgr.write_bulk_pain001(data, out)
+    assert out.getvalue() == ""
+
+
+def test_bulk_payout_benchmark() -> None:
+    """Benchmark: streaming 5k payouts stays flat vs. the in-memory builder."""
+    data = batch(5_000)
+    builder, validator = ISO20022MessageBuilder(), ISO20022Validator()
+    assert validator.validate_payment_batch(data["payment_instructions"]) == {}
+
+    tracemalloc.start()
+    size = sum(len(chunk) for chunk in builder.iter_pain001_bulk(data))
+    _, stream_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+
+    builder.build_pain001_message(data)
+    _, full_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert size > 0
+    assert stream_peak * 20 < full_peak
@@ -0,0 +1,106 @@
+"""Tests and benchmark for the streaming camt.053 reader."""
+
+from __future__ import annotations
+
+import io
+import tracemalloc
+
+import pytest
+
+from app.iso20022_compliance import ISO20022Parser
+
+NS = "urn:iso:std:iso:20022:tech:xsd:camt.053.001.10"
+
+
+def _entry(i: int) -> str:
+    return (
+        "<Ntry>"
+        f"<NtryRef>R{i}</NtryRef>"
+        f'<Amt Ccy="EUR">{i}.{i % 100:02d}</Amt>'
+        f"<CdtDbtInd>{'CRDT' if i % 2 else 'DBIT'}</CdtDbtInd>"
+        "<Sts><Cd>BOOK</Cd></Sts>"
+        "<BookgDt><Dt>2025-01-02</Dt></BookgDt>"
+        f"<ValDt><DtTm>2025-01-0{1 + i % 9}T10:00:00</DtTm></ValDt>"
+        '<NtryDtls><TxDtls><Amt Ccy="USD">1.00</Amt>'
+        f"<RmtInf><Ustrd>invoice {i}</Ustrd></RmtInf></TxDtls></NtryDtls>"
+        "</Ntry>"
+    )
+
+
+def statement_xml(entries: int, statements: int = 1, ns: str = NS) -> str:
+    """Generate a camt.053 document with ``entries`` per statement."""
+    xmlns = f' xmlns="{ns}"' if ns else ""
+    parts = [
+        f"<Document{xmlns}><BkToCstmrStmt>",
+        "<GrpHdr><MsgId>BIG</MsgId><CreDtTm>2025-01-02T00:00:00</CreDtTm></GrpHdr>",
+    ]
+    for s in range(statements):
+        parts.append(
+            f"<Stmt><Id>S{s}</Id><Acct><Id><IBAN>DE{s:020d}</IBAN></Id></Acct>"
+            "<Bal><Tp><CdOrPrtry><Cd>OPBD</Cd></CdOrPrtry></Tp>"
+            '<Amt Ccy="EUR">0.00</Amt><Dt>2025-01-01</Dt></Bal>'
+        )
+        parts.extend(_entry(s * entries + i) for i in range(entries))
+        parts.append("</Stmt>")
+    parts.append("</BkToCstmrStmt></Document>")
+    return "".join(parts)
+
+
+@pytest.mark.parametrize("ns", [NS, ""])
+def test_stream_matches_full_parse(ns: str) -> None:
+    xml = statement_xml(50, ns=ns)
+    parser = ISO20022Parser()
+    full = parser.parse_camt053(xml)["statement"]["transactions"]
+    streamed = list(parser.iter_camt053_entries(io.BytesIO(xml.encode())))
+
+    assert [dict(e, statement_id=None) for e in streamed] == [
+        dict(e, statement_id=None) for e in full
+    ]
+    assert {e["statement_id"] for e in streamed} == {"S0"}
+    # Entry-level Amt wins over the nested TxDtls amount
+    assert full[3] == {
+        "reference": "R3",
+        "direction": "CRDT",
+        "amount": "3.03",
+        "currency": "EUR",
+        "booking_date": "2025-01-02",
+        "value_date": "2025-01-04T10:00:00",
+    }
+
+
+def test_stream_tracks_statement_ids_and_reads_files(tmp_path) -> None:
+    path = tmp_path / "camt053.xml"
+    path.write_text(statement_xml(3, statements=2), encoding="utf-8")
+    entries = list(ISO20022Parser().iter_camt053_entries(str(path)))
+    assert [(e["statement_id"], e["reference"]) for e in entries] == [
+        ("S0", "R0"),
+        ("S0", "R1"),
+        ("S0", "R2"),
+        ("S1", "R3"),
+        ("S1", "R4"),
+        ("S1", "R5"),
+    ]
+
+
+def test_stream_rejects_malformed_xml() -> None:
+    broken = io.BytesIO(statement_xml(2).encode()[:-40])
+    with pytest.raises(ValueError, match="Invalid XML"):
+        list(ISO20022Parser().iter_camt053_entries(broken))
+
+
+def test_camt053_streaming_benchmark() -> None:
+    """Benchmark: streaming keeps memory flat on a large generated statement."""
+    data = statement_xml(20_000).encode()
+    parser = ISO20022Parser()
+
+    tracemalloc.start()
+    count = sum(1 for _ in parser.iter_camt053_entries(io.BytesIO(data)))
+    _, stream_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+
+    full = parser.parse_camt053(data.decode())
+    _, full_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert count == len(full["statement"]["transactions"]) == 20_000
+    assert stream_peak * 5 < full_peak
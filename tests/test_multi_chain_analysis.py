@@ -0,0 +1,79 @@
+"""Tests for concurrent / streaming cross-chain analysis."""
+
+import asyncio
+import time
+from datetime import UTC, datetime
+
+import pytest
+
+from app.multi_chain_support import ChainTransaction, MultiChainEngine, SupportedChain
+
+DELAYS = {
+    SupportedChain.XRP: 0.05,
+    SupportedChain.BITCOIN: 0.15,
+    SupportedChain.SOLANA: 5,
+}
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = MultiChainEngine()
+
+    async def fake_history(chain, address, limit=100):
+        if chain == SupportedChain.CARDANO:
+            raise RuntimeError("explorer down")
+        await asyncio.sleep(DELAYS[chain])
+        return [
+            ChainTransaction(
+                chain=chain,
+                tx_hash=f"{address}-{i}",
+                from_address=address,
+                to_address="x",
+                amount=2.0,
+                fee=0.0,
+                timestamp=datetime.now(UTC),
+            )
+            for i in range(2)
+        ]
+
+    monkeypatch.setattr(engine, "get_address_transactions", fake_history)
+    return engine
+
+
+@pytest.mark.asyncio
+async def test_chains_run_concurrently_with_partial_results(engine) -> None:
+    started = time.perf_counter()
+    analytics = await engine.analyze_cross_chain_activity(
+        {
+            SupportedChain.XRP: ["r1", "r2"],
+            SupportedChain.BITCOIN: ["1a"],
+            SupportedChain.SOLANA: ["s1"],
+            SupportedChain.CARDANO: ["addr1"],
+        },
+        timeout=0.5,
+    )
+    elapsed = time.perf_counter() - started
+
+    # Bounded by the slowest chain budget, not the sum of chain latencies
+    assert elapsed < 1.5
+    assert list(analytics.chain_distribution) == ["xrp", "bitcoin"]
+    assert analytics.chain_distribution["xrp"]["transaction_count"] == 4
+    assert analytics.failed_chains == {"solana": "timeout", "cardano": "error"}
+    assert analytics.transaction_count == 6
+    assert analytics.unique_addresses == 3
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_chains_as_they_finish(engine) -> None:
+    seen = [
+        (r["chain"], r["status"])
+        async for r in engine.stream_cross_chain_activity(
+            {
+                SupportedChain.SOLANA: ["s1"],
+                SupportedChain.BITCOIN: ["1a"],
+                SupportedChain.XRP: ["r1"],
+            },
+            timeout=0.5,
+        )
+    ]
+    assert seen == [("xrp", "ok"), ("bitcoin", "ok"), ("solana", "timeout")]
@@ -0,0 +1,107 @@
+"""Tests for MultiChainEngine response caching and request coalescing."""
+
+import asyncio
+from datetime import UTC, datetime
+
+import pytest
+
+from app.multi_chain_support import ChainTransaction, MultiChainEngine, SupportedChain
+
+
+def _tx(tx_hash: str, status: str = "confirmed", confirmations: int = 10):
+    return ChainTransaction(
+        chain=SupportedChain.XRP,
+        tx_hash=tx_hash,
+        from_address="rA",
+        to_address="rB",
+        amount=1.0,
+        fee=0.0,
+        timestamp=datetime.now(UTC),
+        confirmations=confirmations,
+        status=status,
+    )
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = MultiChainEngine()
+    calls: list[str] = []
+
+    async def fake_tx(tx_hash: str):
+        calls.append(tx_hash)
+        await asyncio.sleep(0.01)
+        return _tx(
+            tx_hash, status="pending" if tx_hash.startswith("p") else "confirmed"
+        )
+
+    async def fake_history(address: str, limit: int):
+        calls.append(address)
+        await asyncio.sleep(0.01)
+        return [_tx(f"{address}-{i}") for i in range(3)]
+
+    monkeypatch.setattr(engine, "_get_xrp_transaction", fake_tx)
+    monkeypatch.setattr(engine, "_get_xrp_address_transactions", fake_history)
+    engine.calls = calls
+    return engine
+
+
+@pytest.mark.asyncio
+async def test_concurrent_transaction_lookups_are_coalesced(engine) -> None:
+    results = await asyncio.gather(
+        *(engine.get_transaction(SupportedChain.XRP, "H1") for _ in range(10))
+    )
+    assert engine.calls == ["H1"]
+    assert all(r is results[0] for r in results)
+    assert engine.cache_stats()["coalesced"] == 9
+    assert engine.rate_limiters[SupportedChain.XRP]["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_only_finalized_transactions_are_cached(engine) -> None:
+    await engine.get_transaction(SupportedChain.XRP, "H1")
+    await engine.get_transaction(SupportedChain.XRP, "H1")
+    await engine.get_transaction(SupportedChain.XRP, "pending1")
+    await engine.get_transaction(SupportedChain.XRP, "pending1")
+    assert engine.calls == ["H1", "pending1", "pending1"]
+
+
+@pytest.mark.asyncio
+async def test_address_history_cached_briefly_and_invalidated(engine) -> None:
+    first, second = await asyncio.gather(
+        engine.get_address_transactions(SupportedChain.XRP, "rW", limit=5),
+        engine.get_address_transactions(SupportedChain.XRP, "rW", limit=5),
+    )
+    again = await engine.get_address_transactions(SupportedChain.XRP, "rW", limit=5)
+    assert engine.calls == ["rW"]
+    assert [t.tx_hash for t in again] == [t.tx_hash for t in first]
+    # Callers get their own list
+    again.clear()
+    assert len(await engine.get_address_transactions(SupportedChain.XRP, "rW", 5)) == 3
+
+    # Finalized txs seen in the history answer single lookups too
+    await engine.get_transaction(SupportedChain.XRP, "rW-1")
+    assert engine.calls == ["rW"]
+
+    assert engine.invalidate_address(SupportedChain.XRP, "rW") == 1
+    await engine.get_address_transactions(SupportedChain.XRP, "rW", limit=5)
+    assert engine.calls == ["rW", "rW"]
+
+
+@pytest.mark.asyncio
+async def test_address_cache_expires(engine) -> None:
+    engine._address_cache.ttl = 0.0
+    await engine.get_address_transactions(SupportedChain.XRP, "rW", limit=5)
+    await engine.get_address_transactions(SupportedChain.XRP, "rW", limit=5)
+    assert engine.calls == ["rW", "rW"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_fetch(engine) -> None:
+    impatient = asyncio.create_task(
+        asyncio.wait_for(engine.get_transaction(SupportedChain.XRP, "H2"), 0.001)
+    )
+    patient = asyncio.create_task(engine.get_transaction(SupportedChain.XRP, "H2"))
+    with pytest.raises(TimeoutError):
+        await impatient
+    assert (await patient).tx_hash == "H2"
+    assert engine.calls == ["H2"]
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def seeded_store(fresh_store):
+    store = fresh_store
+    store.save_tagged_many(
+        {
+            "tx_id": f"tx{i}",
+            "timestamp": "2025-01-01T00:00:00",
+            "chain": "XRP",
+            "from_addr": "rA" if i % 2 else "rC",
+            "to_addr": "rB",
+            "amount": float(i),
+            "symbol": "XRP",
+            "direction": "out",
+            "risk_score": 0.9 if i % 3 == 0 else 0.1,
+            "risk_flags": [],
+        }
+        for i in range(25)
+    )
+    return store
+
+
+def test_list_page_walks_every_row_once(seeded_store) -> None:
+    store = seeded_store
+    seen: list[str] = []
+    cursor = None
+    while True:
+        rows, cursor = store.list_page(before_id=cursor, limit=10)
+        seen += [r["tx_id"] for r in rows]
+        if cursor is None:
+            break
+    assert seen == [f"tx{i}" for i in reversed(range(25))]
+
+    rows, cursor = store.list_page(wallet="rA", min_risk=0.5, limit=100)
+    assert [r["tx_id"] for r in rows] == ["tx21", "tx15", "tx9", "tx3"]
+    assert cursor is None
+
+
+def test_list_functions_accept_keyset_cursor(seeded_store) -> None:
+    store = seeded_store
+    first, cursor = store.list_page(limit=5)
+    assert [r["tx_id"] for r in store.list_all(limit=5, before_id=cursor)] == [
+        f"tx{i}" for i in range(19, 14, -1)
+    ]
+    assert len(store.list_by_wallet("rA", limit=100, before_id=first[0]["id"])) == 12
+    assert len(store.list_alerts(0.5, limit=100, before_id=cursor)) == 7
+
+
+def test_iter_txs_streams_in_batches(seeded_store) -> None:
+    store = seeded_store
+    rows = store.iter_txs(batch_size=4, limit=9)
+    assert [r["amount"] for r in rows] == [float(i) for i in range(24, 15, -1)]
+    assert len(list(store.iter_txs(wallet="rB", batch_size=3))) == 25
+
+
+def test_paginated_and_streaming_endpoints(seeded_store) -> None:
+    from app.main import app
+
+    client = TestClient(app)
+    r = client.get("/transactions/page", params={"limit": 20})
+    assert r.status_code == 200
+    body = r.json()
+    assert len(body["items"]) == 20
+    r = client.get("/transactions/page", params={"cursor": body["next_cursor"]})
+    tail = [item["tx_id"] for item in r.json()["items"]]
+    assert tail == ["tx4", "tx3", "tx2", "tx1", "tx0"]
+    assert r.json()["next_cursor"] is None
+    assert client.get("/transactions/page", params={"limit": 0}).status_code == 422
+
+    r = client.get("/transactions/export", params={"min_risk": 0.5})
+    assert r.status_code == 200
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["tx_id"] for row in lines] == [f"tx{i}" for i in range(24, -1, -3)]
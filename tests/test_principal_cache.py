@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def user_store(fresh_store):
+    from app import deps
+
+    user = fresh_store.create_user(email="p@example.com", password_hash="x")
+    return fresh_store, deps, user
+
+
+def _request(token: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        cookies={},
+        headers={"Authorization": f"Bearer {token}"},
+        state=SimpleNamespace(),
+    )
+
+
+def test_principal_is_cached_per_token_and_request(user_store, monkeypatch) -> None:
+    store, deps, user = user_store
+    from app.security_session import issue_jwt
+
+    token = issue_jwt(user["id"], user["email"], user["role"])
+    calls: list[str] = []
+    lookup = deps._lookup_user_by_sub
+
+    def counting_lookup(sub: str):
+        calls.append(sub)
+        return lookup(sub)
+
+    monkeypatch.setattr(deps, "_lookup_user_by_sub", counting_lookup)
+    request = _request(token)
+    assert deps.current_user(request)["email"] == "p@example.com"
+    assert deps.current_user(request) is deps.current_user(request)
+    assert deps.current_user(_request(token))["role"] == "viewer"
+    assert len(calls) == 1
+    assert deps.principal_cache_stats()["hits"] >= 1
+
+
+def test_user_writes_invalidate_cached_principals(user_store) -> None:
+    store, deps, user = user_store
+    from app.security_session import issue_jwt
+
+    token = issue_jwt(user["id"], user["email"], user["role"])
+    assert deps.current_user(_request(token))["role"] == "viewer"
+
+    store.set_role(user["email"], "admin")
+    assert deps.current_user(_request(token))["role"] == "admin"
+
+    store.update_user_subscription(user["id"], True)
+    assert deps.current_user(_request(token))["subscription_active"] is True
+
+    # A fresh database drops every cached principal
+    store.init_db()
+    assert len(deps._principal_cache) == 0
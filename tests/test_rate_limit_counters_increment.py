@@ -25,18 +25,18 @@ class TestRateLimitCountersIncrement:
         assert middleware._is_rate_limited(ip, current_time + 5)
 
     def test_rate_limit_cleanup_old_requests(self) -> None:
-        """Test that old requests are cleaned up properly."""
+        """Test that idle clients are cleaned up properly."""
         middleware = RateLimitMiddleware(Mock(), requests_per_minute=3)
         current_time = 1000.0
-        ip = "127.0.0.1"
 
-        # Add old requests
-        middleware._record_request(ip, current_time - 120)  # 2 minutes ago
-        middleware._record_request(ip, current_time - 30)  # 30 seconds ago
-        middleware._record_request(ip, current_time)  # Now
+        # One client idle for two minutes, one active
+        middleware._record_request("10.0.0.1", current_time - 120)
+        middleware._record_request("127.0.0.1", current_time - 30)
+        middleware._record_request("127.0.0.1", current_time)
 
         # Clean old requests
         middleware._clean_old_requests(current_time)
 
-        # Should only have recent requests
-        assert len(middleware.requests[ip]) == 2  # 30 seconds ago and now
+        # Only the active client keeps a bucket
+        assert len(middleware.limiter) == 1
+        assert middleware.limiter.peek("127.0.0.1", middleware.policy, current_time) < 3
@@ -0,0 +1,155 @@
+"""Tests for the async Redis token bucket, against a local stand-in."""
+
+import asyncio
+import math
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.rate_limit_redis
+import app.security
+from app.rate_limit import RateLimitPolicy
+from app.rate_limit_redis import RedisTokenBucket, add_redis_rate_limiter
+
+POLICY = RateLimitPolicy("default", capacity=100, per_minute=60)
+
+
+class FakeScriptRedis:
+    """Async stand-in that evaluates the bucket script's logic in Python."""
+
+    def __init__(self) -> None:
+        self.buckets: dict[str, list[float]] = {}
+        self.calls = 0
+        self.loaded = False
+
+    async def script_load(self, script: str) -> str:
+        self.loaded = True
+        return "sha"
+
+    async def evalsha(self, sha, numkeys, key, capacity, rate, now_ms, want):
+        self.calls += 1
+        if not self.loaded:
+            raise RuntimeError("NOSCRIPT No matching script")
+        await asyncio.sleep(0)  # yield like a network round-trip
+        tokens, ts = self.buckets.get(key, [float(capacity), now_ms])
+        if now_ms > ts:
+            tokens = min(capacity, tokens + (now_ms - ts) / 1000.0 * rate)
+            ts = now_ms
+        granted = max(0, min(want, math.floor(tokens)))
+        self.buckets[key] = [tokens - granted, ts]
+        return [granted, str(tokens - granted)]
+
+
+class GatedRedis(FakeScriptRedis):
+    """Holds every EVALSHA until ``gate`` is set."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.gate = asyncio.Event()
+
+    async def evalsha(self, *args):
+        await self.gate.wait()
+        return await super().evalsha(*args)
+
+
+class BrokenRedis:
+    async def script_load(self, script: str) -> str:
+        raise ConnectionError("down")
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_every_request_is_a_round_trip_without_leasing() -> None:
+    redis = FakeScriptRedis()
+    bucket = RedisTokenBucket(redis)
+
+    async def main():
+        return [await bucket.acquire("k", POLICY) for _ in range(120)]
+
+    decisions = _run(main())
+    assert sum(d.allowed for d in decisions) == 100
+    assert redis.calls == 120
+    assert decisions[-1].retry_after >= 1
+
+
+def test_leasing_cuts_round_trips_and_never_over_admits() -> None:
+    redis = FakeScriptRedis()
+    bucket = RedisTokenBucket(redis, lease_size=10, lease_ttl=60)
+
+    async def main():
+        return [await bucket.acquire("k", POLICY) for _ in range(200)]
+
+    decisions = _run(main())
+    assert sum(d.allowed for d in decisions) == 100
+    # 10 leases, then one denied fetch that is cached locally
+    assert redis.calls <= 12
+    assert all(d.limit == POLICY.capacity for d in decisions)
+
+
+def test_concurrent_requests_share_one_lease_fetch() -> None:
+    redis = FakeScriptRedis()
+    bucket = RedisTokenBucket(redis, lease_size=20, lease_ttl=60)
+
+    async def main():
+        return await asyncio.gather(*(bucket.acquire("k", POLICY) for _ in range(20)))
+
+    decisions = _run(main())
+    assert all(d.allowed for d in decisions)
+    assert redis.calls == 1
+
+
+def test_script_reloaded_after_noscript() -> None:
+    redis = FakeScriptRedis()
+    bucket = RedisTokenBucket(redis)
+    bucket._sha = "stale"
+    decision = _run(bucket.acquire("k", POLICY))
+    assert decision.allowed
+    assert redis.loaded
+
+
+def test_cancelled_leader_does_not_fail_waiters() -> None:
+    redis = GatedRedis()
+    bucket = RedisTokenBucket(redis, lease_size=10, lease_ttl=60)
+
+    async def main():
+        leader = asyncio.create_task(bucket.acquire("k", POLICY))
+        await asyncio.sleep(0.01)  # leader's fetch is now in flight
+        waiters = [asyncio.create_task(bucket.acquire("k", POLICY)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        leader.cancel()  # client disconnected
+        redis.gate.set()
+        return leader, await asyncio.gather(*waiters)
+
+    leader, decisions = _run(main())
+    assert leader.cancelled()
+    assert all(d.allowed for d in decisions)
+    assert bucket.stats()["errors"] == 0
+
+
+def test_fails_open_when_redis_is_down() -> None:
+    bucket = RedisTokenBucket(BrokenRedis(), lease_size=5)
+    decision = _run(bucket.acquire("k", POLICY))
+    assert decision.allowed
+    assert bucket.stats()["errors"] == 1
+
+
+def test_middleware_keys_unverified_tokens_by_ip(monkeypatch) -> None:
+    redis = FakeScriptRedis()
+    monkeypatch.setenv("ENABLE_RATE_LIMIT", "true")
+    monkeypatch.setenv("REDIS_URL", "redis://stand-in")
+    monkeypatch.setenv("RATE_LIMIT_CAPACITY", "5")
+    monkeypatch.setattr(app.rate_limit_redis, "_redis_client", lambda: redis)
+    monkeypatch.setattr(app.security, "api_key_matches", lambda key: False)
+    api = FastAPI()
+    api.get("/ping")(lambda: {"ok": True})
+    add_redis_rate_limiter(api)
+
+    with TestClient(api) as client:
+        codes = [
+            client.get("/ping", headers={"x-api-key": f"sk-fake-{i}"}).status_code
+            for i in range(8)
+        ]
+    assert codes == [200] * 5 + [429] * 3
+    assert list(redis.buckets) == ["klerno:rl:default:ip:testclient"]
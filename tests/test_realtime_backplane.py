@@ -0,0 +1,184 @@
+"""Tests for cross-worker realtime delivery through the pub/sub backplane."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from decimal import Decimal
+
+import pytest
+
+import realtime_websocket_server as rws
+from app import realtime_backplane, websocket_alerts
+
+
+class FakeSocket:
+    def __init__(self) -> None:
+        self.sent: list[dict] = []
+
+    async def accept(self) -> None:
+        return None
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(json.loads(text))
+
+    def of_type(self, kind: str) -> list[dict]:
+        return [m for m in self.sent if m["type"] == kind]
+
+
+class Worker:
+    """One simulated worker process: a manager on its own backplane."""
+
+    def __init__(self, hub: realtime_backplane.LocalHub) -> None:
+        self.backplane = realtime_backplane.LocalBackplane(
+            hub, batch_interval=0.001, presence_interval=0.05
+        )
+        self.manager = rws.ConnectionManager()
+        self.manager.attach_backplane(self.backplane)
+
+    async def connect(self, user_id: str, room: str | None = None) -> FakeSocket:
+        ws = FakeSocket()
+        cid = await self.manager.connect(ws, user_id)
+        if room:
+            await self.manager.join_room(cid, room)
+        return ws
+
+
+async def _settle(*workers: Worker) -> None:
+    await asyncio.sleep(0.02)
+    for w in workers:
+        await w.manager.flush(timeout=1)
+
+
+def _counts(worker: Worker) -> dict[str, int]:
+    return {
+        u["user_id"]: u["connection_count"] for u in worker.manager.get_active_users()
+    }
+
+
+@asynccontextmanager
+async def _cluster():
+    hub = realtime_backplane.LocalHub()
+    pair = (Worker(hub), Worker(hub))
+    for w in pair:
+        await w.backplane.start()
+    try:
+        yield pair
+    finally:
+        for w in pair:
+            await w.backplane.close()
+
+
+@pytest.mark.asyncio
+async def test_user_and_room_messages_reach_other_workers() -> None:
+    async with _cluster() as (a, b):
+        alice_a = await a.connect("alice", room="ops")
+        alice_b = await b.connect("alice")
+        bob_b = await b.connect("bob", room="ops")
+
+        await a.manager.send_to_user({"type": "note", "n": 1}, "alice")
+        await a.manager.broadcast_to_room(
+            {"type": "room_msg"}, "ops", exclude_user="alice"
+        )
+        await _settle(a, b)
+
+        assert alice_a.of_type("note") == [{"type": "note", "n": 1}]
+        assert alice_b.of_type("note") == [{"type": "note", "n": 1}]
+        assert bob_b.of_type("note") == []
+        assert len(bob_b.of_type("room_msg")) == 1
+        assert alice_a.of_type("room_msg") == []
+
+
+@pytest.mark.asyncio
+async def test_messages_are_batched_between_workers() -> None:
+    async with _cluster() as (a, b):
+        ws = await b.connect("carol")
+        await _settle(a, b)
+        sent_before = a.backplane.batches_sent
+
+        for n in range(50):
+            await a.manager.send_to_user({"type": "tick", "n": n}, "carol")
+        await _settle(a, b)
+
+        assert [m["n"] for m in ws.of_type("tick")] == list(range(50))
+        assert a.backplane.batches_sent - sent_before <= 2
+
+
+@pytest.mark.asyncio
+async def test_presence_is_aggregated_across_workers() -> None:
+    async with _cluster() as (a, b):
+        await a.connect("dave")
+        await b.connect("dave")
+        await b.connect("erin")
+        await _settle(a, b)
+
+        users = _counts(a)
+        assert users == {"dave": 2, "erin": 1}
+
+        await b.backplane.close()
+        await _settle(a)
+        users = _counts(a)
+        assert users == {"dave": 1}
+
+
+@pytest.mark.asyncio
+async def test_presence_of_silent_worker_expires() -> None:
+    hub = realtime_backplane.LocalHub()
+    a, b = Worker(hub), Worker(hub)
+    await b.connect("frank")
+    await b.backplane.flush()
+    # b crashes: its refresh loop stops without withdrawing presence
+    for task in b.backplane._tasks:
+        task.cancel()
+    assert a.backplane.presence() == {"frank": 1}
+    await asyncio.sleep(0.2)
+    assert a.backplane.presence() == {}
+
+
+@pytest.mark.asyncio
+async def test_risk_alert_reaches_user_on_another_worker(monkeypatch) -> None:
+    async with _cluster() as (a, b):
+        # The alert is raised on worker a; the user is connected to worker b
+        monkeypatch.setattr(realtime_backplane, "_backplane", a.backplane)
+        ws = await b.connect("grace")
+
+        await websocket_alerts.send_risk_alert(
+            "grace",
+            {"tx_id": "T1", "amount": Decimal("12.5")},
+            0.91,
+            "high",
+            ["review"],
+        )
+        await websocket_alerts.broadcast_system_alert("Maintenance", "soon")
+        await _settle(a, b)
+
+        (alert,) = ws.of_type("risk_alert")
+        assert alert["data"]["transaction"] == {"tx_id": "T1", "amount": "12.5"}
+        assert alert["data"]["risk_level"] == "high"
+        assert ws.of_type("system_alert")[0]["title"] == "Maintenance"
+
+
+@pytest.mark.asyncio
+async def test_publish_without_start_reaches_peers() -> None:
+    hub = realtime_backplane.LocalHub()
+    publisher = realtime_backplane.LocalBackplane(hub, batch_interval=0.001)
+    peer = realtime_backplane.LocalBackplane(hub)
+    received: list[dict] = []
+
+    async def collect(message: dict) -> None:
+        received.append(message)
+
+    peer.subscribe(collect)
+    try:
+        await publisher.publish({"op": "user", "user_id": "heidi", "message": {}})
+        await asyncio.sleep(0.02)
+        assert received == [{"op": "user", "user_id": "heidi", "message": {}}]
+    finally:
+        await publisher.close()
+        await peer.close()
+
+
+def test_backplane_transport_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        realtime_backplane.Backplane()  # type: ignore[abstract]
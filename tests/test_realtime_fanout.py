@@ -0,0 +1,166 @@
+"""Tests for the per-connection send queues of the realtime ConnectionManager."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+import realtime_websocket_server as rws
+
+
+class FakeSocket:
+    """WebSocket stand-in; ``stall`` makes every send hang, ``delay`` slows it.
+
+    With ``gate`` every send waits until the event is set.
+    """
+
+    def __init__(
+        self,
+        *,
+        stall: bool = False,
+        delay: float = 0.0,
+        gate: asyncio.Event | None = None,
+    ) -> None:
+        self.stall = stall
+        self.delay = delay
+        self.gate = gate
+        self.sent: list[str] = []
+        self.closed: int | None = None
+
+    async def accept(self) -> None:
+        return None
+
+    async def send_text(self, text: str) -> None:
+        if self.stall:
+            await asyncio.Event().wait()
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed = code
+
+    def ticks(self) -> list[int]:
+        return [m["n"] for m in map(json.loads, self.sent) if m.get("type") == "tick"]
+
+
+async def _connect(manager, sockets) -> list[str]:
+    return [await manager.connect(ws, f"u{i}") for i, ws in enumerate(sockets)]
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_stall_others() -> None:
+    manager = rws.ConnectionManager()
+    fast = [FakeSocket() for _ in range(3)]
+    stuck = FakeSocket(stall=True)
+    await _connect(manager, [stuck, *fast])
+
+    for n in range(5):
+        await manager.broadcast({"type": "tick", "n": n})
+    await asyncio.sleep(0.05)
+
+    for ws in fast:
+        assert ws.ticks() == [0, 1, 2, 3, 4]
+    # One encoded frame shared by every recipient
+    assert fast[0].sent[-1] is fast[1].sent[-1] is fast[2].sent[-1]
+    assert stuck.sent == []
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_keeps_newest_frames() -> None:
+    manager = rws.ConnectionManager(queue_size=2)
+    stuck = FakeSocket(stall=True)
+    (cid,) = await _connect(manager, [stuck])
+    await asyncio.sleep(0)
+
+    for n in range(6):
+        await manager.broadcast({"type": "tick", "n": n})
+        await asyncio.sleep(0)  # let writers run between broadcasts
+
+    outbox = manager.outboxes[cid]
+    # Frame 0 is in flight; 1-3 were dropped for the newest two
+    assert [json.loads(f)["n"] for f in outbox.frames] == [4, 5]
+    assert manager.queue_stats()["dropped"] == 3
+    assert cid in manager.active_connections
+
+
+@pytest.mark.asyncio
+async def test_disconnect_policy_closes_slow_consumer() -> None:
+    manager = rws.ConnectionManager(queue_size=2, slow_consumer=rws.DISCONNECT)
+    stuck, ok = FakeSocket(stall=True), FakeSocket()
+    slow_id, ok_id = await _connect(manager, [stuck, ok])
+    await asyncio.sleep(0)
+
+    for n in range(4):
+        await manager.broadcast({"type": "tick", "n": n})
+        await asyncio.sleep(0.001)  # the healthy client keeps up
+    await asyncio.sleep(0.01)
+
+    assert slow_id not in manager.active_connections
+    assert stuck.closed == 1013
+    assert ok_id in manager.active_connections
+    assert ok.ticks() == [0, 1, 2, 3]
+    # The remaining user heard that u0 left
+    presence = [m for m in map(json.loads, ok.sent) if m["type"] == "user_presence"]
+    assert [(m["user_id"], m["action"]) for m in presence] == [("u0", "left")]
+
+
+@pytest.mark.asyncio
+async def test_send_timeout_drops_client() -> None:
+    manager = rws.ConnectionManager(send_timeout=0.02)
+    stuck = FakeSocket(stall=True)
+    (cid,) = await _connect(manager, [stuck])
+    await manager.send_personal_message("hi", cid)
+    await asyncio.sleep(0.1)
+    assert cid not in manager.active_connections
+    assert manager.outboxes == {}
+
+
+@pytest.mark.asyncio
+async def test_rooms_forget_disconnected_connections() -> None:
+    manager = rws.ConnectionManager()
+    a, b = FakeSocket(), FakeSocket()
+    a_id, b_id = await _connect(manager, [a, b])
+    await manager.join_room(a_id, "r")
+    await manager.join_room(b_id, "r")
+    await manager.disconnect(a_id)
+    await manager.broadcast_to_room({"type": "tick", "n": 1}, "r")
+    await manager.flush(timeout=1)
+    assert manager.room_connections["r"] == {b_id}
+    assert b.ticks() == [1]
+
+
+@pytest.mark.asyncio
+async def test_broadcast_to_10k_connections_never_waits_on_sockets(
+    monkeypatch,
+) -> None:
+    """Broadcasting to 10k clients completes while 100 of them are blocked."""
+    manager = rws.ConnectionManager(queue_size=64)
+
+    async def no_presence(user_id: str, action: str) -> None:
+        return None
+
+    # Presence fan-out on every join would dominate setup (O(n^2) frames)
+    monkeypatch.setattr(manager, "broadcast_user_presence", no_presence)
+    gate = asyncio.Event()
+    sockets = [FakeSocket(gate=gate if i % 100 == 0 else None) for i in range(10_000)]
+    await _connect(manager, sockets)
+
+    async def broadcast_all() -> None:
+        for n in range(10):
+            await manager.broadcast({"type": "tick", "n": n, "pad": "x" * 256})
+
+    # Would hang (and time out) if an enqueue awaited a blocked socket
+    await asyncio.wait_for(broadcast_all(), timeout=60)
+    assert not any(ws.sent for ws in sockets[::100])
+
+    gate.set()
+    await manager.flush(timeout=60)
+    assert all(ws.ticks() == list(range(10)) for ws in sockets)
+    assert manager.queue_stats()["dropped"] == 0
+    for cid in list(manager.active_connections):
+        await manager.disconnect(cid)
@@ -0,0 +1,107 @@
+"""Tests for the coalesced performance-metric stream of the realtime demo app."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import realtime_integration
+import realtime_websocket_server as rws
+
+
+class FakeSocket:
+    def __init__(self) -> None:
+        self.sent: list[dict] = []
+
+    async def accept(self) -> None:
+        return None
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(json.loads(text))
+
+    def of_type(self, kind: str) -> list[dict]:
+        return [m for m in self.sent if m["type"] == kind]
+
+
+def test_aggregator_rolls_up_per_endpoint() -> None:
+    agg = rws.MetricsAggregator(reservoir=16, max_endpoints=2)
+    for i in range(100):
+        agg.record("GET", "/a", (i + 1) / 1000, 200 if i % 10 else 500)
+    agg.record("POST", "/b", 0.002, 201)
+    agg.record("GET", "/c", 0.004, 404)
+    agg.record("GET", "/d", 0.006, 404)
+
+    frame = agg.snapshot()
+    assert frame["type"] == "performance_summary"
+    assert frame["requests"] == 103
+    a, other, b = frame["endpoints"]  # busiest first
+    assert (a["endpoint"], a["count"]) == ("/a", 100)
+    assert a["status"] == {"5xx": 10, "2xx": 90}
+    assert a["avg_ms"] == 50.5
+    assert a["max_ms"] == 100.0
+    assert 1.0 <= a["p50_ms"] <= a["p95_ms"] <= 100.0
+    assert b["endpoint"] == "/b"
+    assert (other["endpoint"], other["count"]) == ("other", 2)
+    # Window resets after each snapshot
+    assert agg.snapshot() is None
+
+
+@pytest.mark.asyncio
+async def test_publish_reaches_only_room_members_and_sse() -> None:
+    manager = rws.ConnectionManager()
+    agg = rws.MetricsAggregator()
+    watcher, bystander = FakeSocket(), FakeSocket()
+    watcher_id = await manager.connect(watcher, "w")
+    await manager.connect(bystander, "b")
+    await manager.join_room(watcher_id, rws.METRICS_ROOM)
+    sse = agg.subscribe()
+
+    assert await agg.publish(manager) is None  # nothing recorded, nothing sent
+    for _ in range(50):
+        agg.record("GET", "/x", 0.01, 200)
+    await agg.publish(manager)
+    await manager.flush(timeout=1)
+
+    (summary,) = watcher.of_type("performance_summary")
+    assert summary["endpoints"][0]["count"] == 50
+    assert bystander.of_type("performance_summary") == []
+    assert json.loads(sse.get_nowait()) == summary
+    agg.unsubscribe(sse)
+
+
+@pytest.mark.asyncio
+async def test_run_publishes_once_per_interval() -> None:
+    manager = rws.ConnectionManager()
+    agg = rws.MetricsAggregator(interval=0.02)
+    sse = agg.subscribe()
+    task = asyncio.create_task(agg.run(manager))
+    try:
+        for _ in range(200):
+            agg.record("GET", "/x", 0.001, 200)
+        text = await asyncio.wait_for(sse.get(), 1)
+    finally:
+        task.cancel()
+    assert json.loads(text)["requests"] == 200
+    assert sse.empty()
+
+
+def test_middleware_records_instead_of_broadcasting(monkeypatch) -> None:
+    sent: list[dict] = []
+
+    async def broadcast(message: dict, exclude_user: str | None = None) -> None:
+        sent.append(message)
+
+    monkeypatch.setattr(realtime_integration.manager, "broadcast", broadcast)
+    monkeypatch.setattr(realtime_integration, "metrics", rws.MetricsAggregator())
+    client = TestClient(realtime_integration.app)
+    for room in ("r1", "r2", "r1"):
+        assert client.get(f"/api/realtime/rooms/{room}/members").status_code == 200
+
+    assert sent == []
+    frame = realtime_integration.metrics.snapshot()
+    (entry,) = frame["endpoints"]
+    assert entry["endpoint"] == "/api/realtime/rooms/{room_id}/members"
+    assert entry["count"] == 3
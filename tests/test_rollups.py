@@ -0,0 +1,120 @@
+import math
+from datetime import UTC, datetime, timedelta, timezone
+
+import pytest
+
+BASE = datetime(2025, 1, 1, 3, 17)
+
+
+def _tx(i: int) -> dict:
+    return {
+        "tx_id": f"tx{i}",
+        "timestamp": (BASE + timedelta(minutes=37 * i)).isoformat(),
+        "chain": "XRP",
+        "from_addr": ["rA", "rB", "", None][i % 4],
+        "to_addr": ["rX", "rY", "rA"][i % 3],
+        "amount": float(i % 17) * 3.5,
+        "symbol": "XRP",
+        "direction": "out",
+        "category": ["payment", "exchange", None][i % 3],
+        "risk_score": (i % 10) / 10,
+        "risk_flags": [],
+    }
+
+
+@pytest.fixture
+def rollup_store(fresh_store):
+    store = fresh_store
+    store.save_tagged_many(_tx(i) for i in range(300))
+    for i in range(300, 340):
+        store.save_tagged(_tx(i))
+    return store
+
+
+def _assert_matches_window(store, since: str) -> None:
+    rolled = store.rollup_aggregates(since)
+    raw = store.window_aggregates(
+        since, store.ROLLUP_RISK_LOW, store.ROLLUP_RISK_MEDIUM
+    )
+    for key in ("n", "high", "medium", "low"):
+        assert rolled["totals"][key] == raw["totals"][key]
+    assert math.isclose(rolled["totals"]["volume"], raw["totals"]["volume"])
+    assert math.isclose(rolled["totals"]["avg_risk"], raw["totals"]["avg_risk"])
+    assert rolled["categories"] == raw["categories"]
+    raw_daily = {r["day"]: r for r in raw["daily"]}
+    assert [r["day"] for r in rolled["daily"]] == sorted(raw_daily)
+    for r in rolled["daily"]:
+        assert r["n"] == raw_daily[r["day"]]["n"]
+        assert math.isclose(r["max_risk"], raw_daily[r["day"]]["max_risk"])
+    raw_hourly = {r["hour"]: r["n"] for r in raw["hourly"]}
+    assert {r["hour"]: r["n"] for r in rolled["hourly"]} == raw_hourly
+
+
+def test_incremental_rollups_match_raw_window(rollup_store) -> None:
+    store = rollup_store
+    # Start mid-hour and mid-day so the raw head and the rollups both count
+    for offset in (timedelta(0), timedelta(hours=20, minutes=41)):
+        _assert_matches_window(store, (BASE + offset).isoformat())
+
+
+def test_address_and_network_stats(rollup_store) -> None:
+    store = rollup_store
+    since = (BASE + timedelta(hours=30, minutes=5)).isoformat()
+    rows = [_tx(i) for i in range(340)]
+    rows = [r for r in rows if r["timestamp"] >= since]
+
+    risks: dict[str, list[float]] = {}
+    for r in rows:
+        for side in ("from_addr", "to_addr"):
+            if r[side]:
+                risks.setdefault(r[side], []).append(r["risk_score"])
+    stats = store.rollup_address_stats(since, limit=3)
+    assert stats["unique_addresses"] == len(risks)
+    expected = sorted(risks, key=lambda a: (-sum(risks[a]) / len(risks[a]), a))
+    assert [r["address"] for r in stats["top_risk_addresses"]] == expected[:3]
+    top = stats["top_risk_addresses"][0]
+    assert top["n"] == len(risks[top["address"]])
+
+    edges = {(r["from_addr"], r["to_addr"]) for r in rows if r["from_addr"]}
+    network = store.rollup_network_stats(since)
+    assert network["connections"] == len(edges)
+    assert network["senders"] == len({src for src, _ in edges})
+
+
+def test_backfill_rebuilds_after_raw_writes(rollup_store) -> None:
+    store = rollup_store
+    # A whole-hour start reads rollups only, so they show the stale count
+    since = BASE.replace(hour=0, minute=0).isoformat()
+    with store._connection() as con:
+        con.execute("DELETE FROM txs WHERE id % 2 = 0")
+        con.commit()
+    assert store.rollup_aggregates(since)["totals"]["n"] == 340
+
+    assert store.backfill_rollups() == 170
+    _assert_matches_window(store, since)
+
+
+def test_partial_buckets_use_normalized_bounds(rollup_store) -> None:
+    store = rollup_store
+    # Datetime rows inside the partial first hour and day of the window
+    head = BASE + timedelta(hours=30, minutes=5)
+    extra = [
+        {**_tx(340 + i), "timestamp": head + timedelta(minutes=m)}
+        for i, m in enumerate((0, 10, 20))
+    ]
+    store.save_tagged_many(extra)
+    # The same instant written with an offset and a space separator
+    since = str(head.replace(tzinfo=UTC).astimezone(timezone(timedelta(hours=-5))))
+    naive = head.isoformat()
+
+    _assert_matches_window(store, since)
+    assert store.rollup_aggregates(since) == store.rollup_aggregates(naive)
+    assert store.rollup_address_stats(since) == store.rollup_address_stats(naive)
+    assert store.rollup_network_stats(since) == store.rollup_network_stats(naive)
+    assert store.count_amount_outliers(since, 0.0, 1.0) == (
+        store.count_amount_outliers(naive, 0.0, 1.0)
+    )
+    window = store.window_aggregates(naive, 0.33, 0.66)["totals"]["n"]
+    assert store.rollup_aggregates(since)["totals"]["n"] == window
+    expected = sum(1 for i in range(340) if _tx(i)["timestamp"] >= naive) + 3
+    assert window == expected
@@ -0,0 +1,82 @@
+import time
+
+from app.ttl_cache import TTLCache
+
+
+def test_lru_eviction_and_counters() -> None:
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["size"] == 2
+
+
+def test_entries_expire() -> None:
+    cache = TTLCache(ttl=60)
+    cache.set("short", 1, ttl=0.01)
+    cache.set("long", 2)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+    assert cache.stats()["expirations"] == 1
+
+
+def test_tag_invalidation_is_precise() -> None:
+    cache = TTLCache()
+    cache.set("w1", [1], tags=["wallet:rA"])
+    cache.set("w2", [2], tags=["wallet:rB"])
+    cache.set("both", [3], tags=["wallet:rA", "wallet:rB"])
+
+    assert cache.invalidate_tags("wallet:rA") == 2
+    assert cache.get("w2") == [2]
+    assert "both" not in cache
+    assert cache.tags_with_prefix("wallet:") == ["wallet:rB"]
+
+
+def _tx(i: int, wallet: str, risk: float = 0.0) -> dict:
+    return {
+        "tx_id": f"tx{i}",
+        "timestamp": "2025-01-01T00:00:00",
+        "chain": "XRP",
+        "from_addr": wallet,
+        "to_addr": "rSink",
+        "amount": 1.0,
+        "symbol": "XRP",
+        "direction": "out",
+        "risk_score": risk,
+        "risk_flags": [],
+    }
+
+
+def test_store_invalidates_only_affected_wallets(fresh_store) -> None:
+    store = fresh_store
+    store.save_tagged(_tx(1, "rA"))
+    store.save_tagged(_tx(2, "rB", risk=0.9))
+
+    assert len(store.list_by_wallet("rA")) == 1
+    assert len(store.list_by_wallet("rB")) == 1
+    assert len(store.list_alerts(0.8)) == 1
+    hits = store.cache_stats()["hits"]
+    store.list_by_wallet("rA")
+    store.list_alerts(0.8)
+    assert store.cache_stats()["hits"] == hits + 2
+
+    # A low-risk write for rA leaves rB's list and the alert list cached.
+    store.save_tagged(_tx(3, "rA", risk=0.1))
+    hits = store.cache_stats()["hits"]
+    assert len(store.list_by_wallet("rB")) == 1
+    assert len(store.list_alerts(0.8)) == 1
+    assert store.cache_stats()["hits"] == hits + 2
+    assert len(store.list_by_wallet("rA")) == 2
+
+    store.save_tagged_many([_tx(4, "rC", risk=0.95)])
+    assert len(store.list_alerts(0.8)) == 2
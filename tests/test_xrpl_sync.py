@@ -0,0 +1,146 @@
+"""Tests for the resumable XRPL history sync (against a local JSON-RPC stand-in)."""
+
+from __future__ import annotations
+
+import pytest
+
+from app import store, xrpl_sync
+from integrations import http
+
+ACCOUNT = "rSyncAccount"
+
+
+class FakeLedger:
+    """Minimal ``account_tx`` implementation with rippled's paging semantics."""
+
+    def __init__(self) -> None:
+        self.txs: list[dict] = []
+        self.validated = 100
+
+    def add(self, count: int, per_ledger: int = 3) -> None:
+        """Append ``count`` txs in new ledgers after the last validated one."""
+        first = self.validated + 1
+        for j in range(count):
+            i = len(self.txs)
+            self.validated = first + j // per_ledger
+            self.txs.append(
+                {
+                    "tx": {
+                        "hash": f"H{i:04d}",
+                        "ledger_index": self.validated,
+                        "date": 700_000_000 + i * 60,
+                        "Account": ACCOUNT if i % 2 else "rOther",
+                        "Destination": "rOther" if i % 2 else ACCOUNT,
+                        "Amount": str(1_000_000 * (i + 1)),
+                        "Fee": "12",
+                    },
+                    "validated": True,
+                }
+            )
+
+    def __call__(self, body: dict) -> dict:
+        p = body["params"][0]
+        lo = p["ledger_index_min"] if p["ledger_index_min"] != -1 else 1
+        hi = p["ledger_index_max"] if p["ledger_index_max"] != -1 else self.validated
+        if lo > self.validated:
+            return {"result": {"status": "error", "error": "lgrIdxsInvalid"}}
+        window = [t for t in self.txs if lo <= t["tx"]["ledger_index"] <= hi]
+        start = (p.get("marker") or {}).get("seq", 0)
+        page = window[start : start + p["limit"]]
+        result = {
+            "account": p["account"],
+            "ledger_index_min": lo,
+            "ledger_index_max": hi,
+            "transactions": page,
+            "status": "success",
+        }
+        if start + p["limit"] < len(window):
+            result["marker"] = {
+                "ledger": page[-1]["tx"]["ledger_index"],
+                "seq": start + p["limit"],
+            }
+        return {"result": result}
+
+
+@pytest.fixture
+def ledger(mock_chain_server, fresh_store, monkeypatch):
+    monkeypatch.setenv("XRPL_RPC_URL", mock_chain_server.url)
+    fake = FakeLedger()
+    mock_chain_server.responses["account_tx"] = fake
+    return fake
+
+
+def _stored_hashes() -> list[str]:
+    with store._connection() as con:
+        cur = con.cursor()
+        cur.execute("SELECT tx_id FROM txs ORDER BY tx_id")
+        return [row[0] for row in cur.fetchall()]
+
+
+@pytest.mark.asyncio
+async def test_full_sync_follows_markers(ledger, mock_chain_server) -> None:
+    ledger.add(30)
+    try:
+        summary = await xrpl_sync.sync_account(ACCOUNT, page_size=7)
+    finally:
+        await http.aclose_client()
+
+    assert summary == {
+        "account": ACCOUNT,
+        "pages": 5,
+        "stored": 30,
+        "last_ledger": 110,
+        "complete": True,
+    }
+    assert _stored_hashes() == [f"H{i:04d}" for i in range(30)]
+    state = store.get_xrpl_sync_state(ACCOUNT)
+    assert state["last_ledger"] == 110
+    assert state["marker"] is None
+    assert state["tx_count"] == 30
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync_fetches_only_new_ledgers(
+    ledger, mock_chain_server
+) -> None:
+    ledger.add(9)
+    try:
+        await xrpl_sync.sync_account(ACCOUNT)
+        # Nothing new: the server rejects the empty range, sync is a no-op
+        idle = await xrpl_sync.sync_account(ACCOUNT)
+        ledger.add(6)
+        summary = await xrpl_sync.sync_account(ACCOUNT)
+    finally:
+        await http.aclose_client()
+
+    assert idle["stored"] == 0
+    assert summary["stored"] == 6
+    assert summary["last_ledger"] == 105
+    assert (
+        mock_chain_server.requests[-1]["body"]["params"][0]["ledger_index_min"] == 104
+    )
+    assert len(_stored_hashes()) == 15
+
+
+@pytest.mark.asyncio
+async def test_interrupted_sync_resumes_from_marker(ledger, mock_chain_server) -> None:
+    ledger.add(20)
+    try:
+        first = await xrpl_sync.sync_account(ACCOUNT, page_size=6, max_pages=2)
+        state = store.get_xrpl_sync_state(ACCOUNT)
+        ledger.add(3)  # new ledgers must not leak into the pinned run
+        second = await xrpl_sync.sync_account(ACCOUNT, page_size=6)
+        third = await xrpl_sync.sync_account(ACCOUNT, page_size=6)
+    finally:
+        await http.aclose_client()
+
+    assert first["complete"] is False
+    assert first["stored"] == 12
+    assert state["last_ledger"] is None
+    assert state["marker"] is not None
+    assert second["stored"] == 8
+    assert second["last_ledger"] == 107
+    assert third["stored"] == 3
+    hashes = _stored_hashes()
+    assert hashes == sorted(set(hashes))
+    assert len(hashes) == 23